@@ -1,15 +1,27 @@
 # -*- mode: python ; coding: utf-8 -*-
+import os
+
 from PyInstaller.utils.hooks import collect_all
 
+# CATHOLEADS_VARIANT=slim gera o exe sem openpyxl (sem exportação Excel, só JSON/CSV)
+variant = os.environ.get('CATHOLEADS_VARIANT', 'full')
+
+# pandas/numpy não são usados (o Excel sai direto pelo openpyxl); ficam fora do pacote
+excludes = ['pandas', 'numpy', 'tkinter']
+
 datas = []
 binaries = []
 hiddenimports = []
 tmp_ret = collect_all('playwright')
 datas += tmp_ret[0]; binaries += tmp_ret[1]; hiddenimports += tmp_ret[2]
-tmp_ret = collect_all('pandas')
-datas += tmp_ret[0]; binaries += tmp_ret[1]; hiddenimports += tmp_ret[2]
-tmp_ret = collect_all('openpyxl')
+# lxml: leitura do HTML arquivado (--reextract) e do perfil no --enrich
+tmp_ret = collect_all('lxml')
 datas += tmp_ret[0]; binaries += tmp_ret[1]; hiddenimports += tmp_ret[2]
+if variant == 'slim':
+    excludes.append('openpyxl')
+else:
+    tmp_ret = collect_all('openpyxl')
+    datas += tmp_ret[0]; binaries += tmp_ret[1]; hiddenimports += tmp_ret[2]
 
 
 a = Analysis(
@@ -21,7 +33,7 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=excludes,
     noarchive=False,
     optimize=0,
 )
@@ -2,7 +2,10 @@ param(
   [ValidateSet('onedir','onefile')]
   [string]$Mode = 'onedir',
   [ValidateSet('chromium','firefox','webkit','all')]
-  [string]$Browser = 'chromium'
+  [string]$Browser = 'chromium',
+  # slim: sem openpyxl (sem exportação Excel), para um exe menor e de partida mais rápida
+  [ValidateSet('full','slim')]
+  [string]$Variant = 'full'
 )
 
 $ErrorActionPreference = 'Stop'
@@ -21,7 +24,7 @@ if ($Browser -eq 'all') {
   python -m playwright install $Browser
 }
 
-Write-Host "==> Build do executável (PyInstaller: $Mode)" -ForegroundColor Cyan
+Write-Host "==> Build do executável (PyInstaller: $Mode, $Variant)" -ForegroundColor Cyan
 $pyiArgs = @(
   '--noconfirm',
   '--clean',
@@ -37,8 +40,13 @@ if ($Mode -eq 'onefile') {
 
 # Ajuda o PyInstaller a coletar recursos de libs comuns
 $pyiArgs += @('--collect-all', 'playwright')
-$pyiArgs += @('--collect-all', 'pandas')
-$pyiArgs += @('--collect-all', 'openpyxl')
+# pandas/numpy não são usados (o Excel sai direto pelo openpyxl); ficam fora do pacote
+$pyiArgs += @('--exclude-module', 'pandas', '--exclude-module', 'numpy', '--exclude-module', 'tkinter')
+if ($Variant -eq 'slim') {
+  $pyiArgs += @('--exclude-module', 'openpyxl')
+} else {
+  $pyiArgs += @('--collect-all', 'openpyxl')
+}
 
 $pyiArgs += 'src\\catho_leads.py'
 
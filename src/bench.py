@@ -0,0 +1,222 @@
+"""Benchmark offline: roda o fluxo real (catho_leads.py) contra o fixture_site local.
+
+Cada rodada sobe o site local, grava um config temporário e executa
+`catho_leads.py --config ...` num subprocesso com CATHOLEADS_HOME apontando para
+uma pasta temporária. O resultado vem do relatório da execução (output/reports)
+e dos contadores do site.
+
+    python src/bench.py --candidatos 300 --num 100 --latency-ms 50 --jitter-ms 20
+    python src/bench.py --set url_navigation=true --out bench.json --baseline bench_main.json
+    python src/bench.py --startup --repeat 5 [--exe dist\\CathoLeads\\CathoLeads.exe]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from fixture_site import FixtureSite
+
+
+SCRIPT = Path(__file__).resolve().parent / "catho_leads.py"
+
+
+def _run_measured(command: list[str], env: dict, timeout_s: float) -> tuple[int, str, str, float | None]:
+    """Roda o comando e devolve (returncode, stdout, stderr, pico de RSS em MB).
+
+    O pico vem do os.wait4 deste subprocesso (e dos filhos que ele esperou, como o
+    Chromium), não do acumulado de todos os filhos do benchmark; None no Windows.
+    """
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as out, tempfile.TemporaryFile("w+", encoding="utf-8") as err:
+        proc = subprocess.Popen(command, env=env, stdout=out, stderr=err)
+        peak_rss_mb = None
+        if hasattr(os, "wait4"):
+            limite = time.monotonic() + timeout_s
+            while True:
+                pid, status, uso = os.wait4(proc.pid, os.WNOHANG)
+                if pid:
+                    break
+                if time.monotonic() > limite:
+                    proc.kill()
+                    os.wait4(proc.pid, 0)
+                    proc.returncode = -9
+                    raise subprocess.TimeoutExpired(command, timeout_s)
+                time.sleep(0.05)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            # Linux informa em KB, macOS em bytes
+            peak_rss_mb = round(uso.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+        else:
+            proc.wait(timeout=timeout_s)
+        out.seek(0)
+        err.seek(0)
+        return proc.returncode, out.read(), err.read(), peak_rss_mb
+
+
+def _parse_value(texto: str):
+    try:
+        return json.loads(texto)
+    except ValueError:
+        return texto
+
+
+def _bench_config(site: FixtureSite, home: str, num_candidatos: int, overrides: dict | None) -> Path:
+    config = {
+        "url": f"{site.url}/login",
+        "username": "bench@example.com",
+        "password": "bench",
+        "search_url": f"{site.url}/busca",
+        "search_term": "python",
+        "num_candidatos": num_candidatos,
+        "headless": True,
+        "candidate_index": False,
+        **(overrides or {}),
+    }
+    config_file = Path(home) / "config.json"
+    config_file.write_text(json.dumps(config), encoding="utf-8")
+    return config_file
+
+
+def run_once(
+    candidatos: int = 200,
+    num_candidatos: int = 50,
+    per_page: int = 20,
+    latency_ms: float = 0,
+    jitter_ms: float = 0,
+    overrides: dict | None = None,
+    timeout_s: float = 600,
+) -> dict:
+    with FixtureSite(candidatos, per_page, latency_ms, jitter_ms) as site, tempfile.TemporaryDirectory() as home:
+        config_file = _bench_config(site, home, num_candidatos, overrides)
+
+        inicio = time.perf_counter()
+        returncode, stdout, stderr, peak_rss_mb = _run_measured(
+            [sys.executable, str(SCRIPT), "--config", str(config_file)],
+            env={**os.environ, "CATHOLEADS_HOME": home},
+            timeout_s=timeout_s,
+        )
+        wall_s = time.perf_counter() - inicio
+
+        reports = sorted((Path(home) / "output" / "reports").glob("run_*.json"))
+        report = json.loads(reports[-1].read_text(encoding="utf-8")) if reports else {}
+        if returncode != 0 or not report:
+            sys.stderr.write(stdout[-4000:] + stderr[-4000:])
+
+        return {
+            "returncode": returncode,
+            "wall_s": round(wall_s, 2),
+            "candidates": report.get("candidates", 0),
+            "candidates_per_minute": report.get("candidates_per_minute", 0.0),
+            "page_loads": site.stats["page_loads"],
+            "reveals": site.stats["reveals"],
+            "requests": site.stats["requests"],
+            "peak_rss_mb": peak_rss_mb,
+            "phases": report.get("phases", {}),
+        }
+
+
+def measure_startup(command: list[str] | None = None, overrides: dict | None = None, timeout_s: float = 120) -> float | None:
+    """Segundos do início do processo até o GET da página de login chegar ao site local.
+
+    Cobre import (ou o unpack do exe), leitura do config e abertura do Chromium;
+    o processo é encerrado assim que o login é pedido.
+    """
+    with FixtureSite(candidatos=20) as site, tempfile.TemporaryDirectory() as home:
+        config_file = _bench_config(site, home, 1, overrides)
+        inicio = time.perf_counter()
+        proc = subprocess.Popen(
+            [*(command or [sys.executable, str(SCRIPT)]), "--config", str(config_file)],
+            env={**os.environ, "CATHOLEADS_HOME": home},
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            while site.first_login_at is None and proc.poll() is None and time.perf_counter() - inicio < timeout_s:
+                time.sleep(0.005)
+        finally:
+            proc.kill()
+            proc.wait()
+        return round(site.first_login_at - inicio, 3) if site.first_login_at is not None else None
+
+
+def summarize(rodadas: list[dict]) -> dict:
+    cpm = sorted(r["candidates_per_minute"] for r in rodadas)
+    return {
+        "runs": len(rodadas),
+        "candidates_per_minute_median": cpm[len(cpm) // 2] if cpm else 0.0,
+        "candidates_per_minute_min": cpm[0] if cpm else 0.0,
+        "page_loads": max((r["page_loads"] for r in rodadas), default=0),
+        "peak_rss_mb": max((r["peak_rss_mb"] or 0 for r in rodadas), default=0) or None,
+        "rounds": rodadas,
+    }
+
+
+def check_regression(resultado: dict, baseline: dict, max_regression: float) -> str | None:
+    """Mensagem de erro se a mediana de currículos/min caiu mais que max_regression (fração)."""
+    antes = baseline.get("candidates_per_minute_median") or 0
+    agora = resultado.get("candidates_per_minute_median") or 0
+    if antes and agora < antes * (1 - max_regression):
+        return f"Regressão: {agora:.1f} currículos/min contra {antes:.1f} no baseline (limite {max_regression:.0%})"
+    return None
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark offline do CathoLeads contra o site local.")
+    parser.add_argument("--candidatos", type=int, default=200, help="Candidatos no site local.")
+    parser.add_argument("--num", type=int, default=50, help="num_candidatos a coletar.")
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--set", action="append", default=[], metavar="CHAVE=VALOR", help="Sobrescreve uma chave do config (valor em JSON).")
+    parser.add_argument("--out", help="Grava o resultado em JSON.")
+    parser.add_argument("--baseline", help="Resultado anterior (--out) para comparar.")
+    parser.add_argument("--max-regression", type=float, default=0.15, help="Queda máxima aceita em currículos/min (fração).")
+    parser.add_argument("--startup", action="store_true", help="Mede só o tempo até a página de login ser pedida.")
+    parser.add_argument("--exe", help="Com --startup: mede o executável (PyInstaller) em vez de python catho_leads.py.")
+    args = parser.parse_args(argv)
+
+    overrides = {}
+    for item in args.set:
+        chave, _, valor = item.partition("=")
+        overrides[chave] = _parse_value(valor)
+
+    if args.startup:
+        tempos = [measure_startup([args.exe] if args.exe else None, overrides) for _ in range(args.repeat)]
+        validos = sorted(t for t in tempos if t is not None)
+        resultado = {
+            "runs": len(tempos),
+            "startup_s_median": validos[len(validos) // 2] if validos else None,
+            "startup_s_min": validos[0] if validos else None,
+            "startup_s_max": validos[-1] if validos else None,
+            "rounds": tempos,
+        }
+        print(json.dumps(resultado, ensure_ascii=False, indent=2))
+        if args.out:
+            Path(args.out).write_text(json.dumps(resultado, ensure_ascii=False, indent=2), encoding="utf-8")
+        return 0 if len(validos) == len(tempos) else 1
+
+    rodadas = [
+        run_once(args.candidatos, args.num, args.per_page, args.latency_ms, args.jitter_ms, overrides)
+        for _ in range(args.repeat)
+    ]
+    resultado = summarize(rodadas)
+    texto = json.dumps(resultado, ensure_ascii=False, indent=2)
+    print(texto)
+    if args.out:
+        Path(args.out).write_text(texto, encoding="utf-8")
+
+    if any(r["returncode"] != 0 for r in rodadas):
+        return 1
+    if args.baseline:
+        erro = check_regression(resultado, json.loads(Path(args.baseline).read_text(encoding="utf-8")), args.max_regression)
+        if erro:
+            print(erro, file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
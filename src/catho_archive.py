@@ -0,0 +1,190 @@
+"""Arquivo do HTML das páginas de resultado e reextração offline.
+
+Com "archive_html": true cada página de resultados é salva (gzip) em
+output/candidates/archive/<execução>/, com um manifest.jsonl. Quando o site muda
+e algum campo volta vazio, basta ajustar a extração e rodar
+
+    python src/catho_leads.py --reextract            # arquivo mais recente
+    python src/catho_leads.py --reextract caminho\\do\\arquivo
+
+que refaz os registros a partir do HTML salvo, sem navegador, login nem cliques.
+A leitura do HTML usa lxml (requirements.txt).
+"""
+import gzip
+import json
+import re
+from datetime import datetime
+from pathlib import Path
+
+from typing import Iterable
+
+import lxml.html as lxml_html
+
+from catho_leads import EMAIL_PATTERN, EXPORT_FORMATS, OUTPUT_DIR, PHONE_PATTERN, export_results, log
+
+
+ARCHIVE_DIR = OUTPUT_DIR / "archive"
+REEXTRACT_DIR = OUTPUT_DIR / "reextract"
+
+# Mesma heurística do EXTRACT_ARTICLES_JS
+INFO_CLASS = "sc-eZkCL"
+_AGE_RE = re.compile(r"\d+ anos")
+_UPDATE_RE = re.compile(r"atualizad[oa][^\n]{0,40}", re.I)
+
+# Tags que quebram linha no innerText; o resto é concatenado
+_BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt", "footer", "form",
+    "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main", "nav", "ol", "p", "section",
+    "table", "tr", "ul",
+}
+_SKIP_TAGS = {"script", "style", "template", "noscript"}
+
+
+class HtmlArchive:
+    """Guarda o HTML de cada página de resultados para reextrair depois sem navegador."""
+
+    def __init__(self, run_id: str, root: Path = ARCHIVE_DIR):
+        self.dir = root / run_id
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.pages = 0
+
+    def save(self, html: str, pagina: int, url: str, busca: str = "") -> Path:
+        self.pages += 1
+        arquivo = self.dir / f"{self.pages:05d}.html.gz"
+        with gzip.open(arquivo, "wt", encoding="utf-8", compresslevel=6) as f:
+            f.write(html)
+        entrada = {
+            "file": arquivo.name,
+            "pagina": pagina,
+            "url": url,
+            "busca": busca,
+            "saved_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        with (self.dir / "manifest.jsonl").open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entrada, ensure_ascii=False) + "\n")
+        return arquivo
+
+
+def parse_html(html: str):
+    """Árvore lxml do HTML (documento vazio vira um <html> vazio)."""
+    return lxml_html.document_fromstring(html if html.strip() else "<html></html>")
+
+
+def _raw_text(node, cache: dict | None = None) -> str:
+    """Texto bruto do elemento; com `cache`, cada elemento é percorrido uma vez só."""
+    if cache is not None and node in cache:
+        return cache[node]
+    tag = node.tag
+    # Comentários/instruções do lxml têm tag não-string
+    if not isinstance(tag, str) or tag in _SKIP_TAGS:
+        texto = ""
+    else:
+        bloco = tag in _BLOCK_TAGS
+        partes = ["\n" if bloco else "", node.text or ""]
+        for child in node:
+            partes.append(_raw_text(child, cache))
+            partes.append(child.tail or "")
+        if bloco:
+            partes.append("\n")
+        texto = "".join(partes)
+    if cache is not None:
+        cache[node] = texto
+    return texto
+
+
+def inner_text(el, cache: dict | None = None) -> str:
+    """Aproxima o innerText: blocos em linhas separadas, scripts/estilos fora."""
+    linhas = (re.sub(r"[ \t\r\f\v]+", " ", linha).strip() for linha in _raw_text(el, cache).split("\n"))
+    return "\n".join(linha for linha in linhas if linha)
+
+
+def _info_element(art, cache: dict):
+    for p in art.iter("p"):
+        if INFO_CLASS in (p.get("class") or ""):
+            return p
+    # Sem a classe: o elemento mais interno cujo texto tem "NN anos"
+    tem_idade = {}
+    for el in art.iter():
+        if isinstance(el.tag, str):
+            tem_idade[el] = bool(_AGE_RE.search(inner_text(el, cache)))
+    for el in art.iter():
+        if tem_idade.get(el) and not any(tem_idade.get(c) for c in el):
+            return el
+    return None
+
+
+def parse_results_html(html: str) -> list[dict]:
+    """Registros dos cards `article` de uma página salva, no formato do EXTRACT_ARTICLES_JS.
+
+    Como a página é salva depois das revelações, telefone/e-mail já visíveis no
+    card também são lidos.
+    """
+    registros = []
+    for idx, art in enumerate(parse_html(html).iter("article")):
+        link = next((a for h2 in art.iter("h2") for a in h2.iter("a")), None)
+        if link is None:
+            registros.append({"idx": idx, "ok": True, "is_candidate": False})
+            continue
+
+        cache: dict = {}
+        texto = inner_text(art, cache)
+        info = _info_element(art, cache)
+        botoes = [inner_text(b, cache).lower() for b in art.iter("button")]
+        atualizado = _UPDATE_RE.search(texto)
+        telefone = re.search(PHONE_PATTERN, texto)
+        email = re.search(EMAIL_PATTERN, texto)
+        registros.append({
+            "idx": idx,
+            "ok": True,
+            "is_candidate": True,
+            "nome": inner_text(link, cache),
+            "href": (link.get("href") or "").strip(),
+            "info_basica": inner_text(info, cache) if info is not None else "",
+            "has_phone": any("ver telefone" in b for b in botoes),
+            "has_email": any("ver e-mail" in b for b in botoes),
+            "atualizado": atualizado.group(0).strip() if atualizado else "",
+            "telefone": telefone.group(0) if telefone else "",
+            "email": email.group(0) if email else "",
+        })
+    return registros
+
+
+def latest_archive(root: Path = ARCHIVE_DIR) -> Path | None:
+    execucoes = sorted(p for p in root.glob("*") if (p / "manifest.jsonl").exists()) if root.exists() else []
+    return execucoes[-1] if execucoes else None
+
+
+def reextract(archive_dir: Path, output_dir: Path = REEXTRACT_DIR, formats: Iterable[str] = EXPORT_FORMATS) -> int:
+    """Refaz os currículos a partir de um arquivo de HTML e exporta em output_dir; retorna o total."""
+    manifest = archive_dir / "manifest.jsonl"
+    if not manifest.exists():
+        raise ValueError(f"{archive_dir} não tem manifest.jsonl (não é um arquivo de HTML)")
+
+    jsonl_file = output_dir / "jsonl" / "curriculos_coletados.jsonl"
+    jsonl_file.parent.mkdir(parents=True, exist_ok=True)
+    vistos: set[str] = set()
+    paginas = total = 0
+    with manifest.open(encoding="utf-8") as m, jsonl_file.open("w", encoding="utf-8") as out:
+        for linha in m:
+            if not linha.strip():
+                continue
+            entrada = json.loads(linha)
+            with gzip.open(archive_dir / entrada["file"], "rt", encoding="utf-8") as f:
+                registros = parse_results_html(f.read())
+            paginas += 1
+            for registro in registros:
+                if not registro["is_candidate"] or not registro["nome"]:
+                    continue
+                chave = registro["href"] or registro["nome"]
+                if chave in vistos:
+                    continue
+                vistos.add(chave)
+                novo = {campo: registro[campo] for campo in ("nome", "info_basica", "telefone", "email", "href")}
+                if entrada.get("busca"):
+                    novo["busca"] = entrada["busca"]
+                out.write(json.dumps({**novo, "_chave": chave}, ensure_ascii=False) + "\n")
+                total += 1
+
+    log(f"Reextração: {paginas} páginas de {archive_dir}, {total} currículos")
+    export_results(jsonl_file, output_dir, formats)
+    return total
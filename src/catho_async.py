@@ -0,0 +1,595 @@
+"""Várias buscas em paralelo com playwright.async_api.
+
+Um único Chromium e uma única sessão logada (storage_state) são compartilhados
+por um pool de BrowserContexts. Cada consulta pega um contexto livre, coleta e
+devolve o contexto; os resultados são juntados sem repetir candidatos.
+"""
+import asyncio
+import logging
+import time
+from typing import Iterable
+
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError, async_playwright
+
+from catho_leads import (
+    CACHED_SELECTOR_TIMEOUT_MS,
+    COUNT_MATCHES_JS,
+    CandidateIndex,
+    DELTA_UNSORTED_MSG,
+    DeltaWatermark,
+    EMAIL_PATTERN,
+    EXTRACT_ARTICLES_JS,
+    MEMORY_JS,
+    NEXT_PAGE_SELECTORS,
+    PageRecycler,
+    PHONE_PATTERN,
+    REVEAL_WAIT_JS,
+    RateController,
+    ResourceBlocker,
+    ResultStream,
+    RunTimer,
+    SESSION_FILE,
+    SORT_BUTTON_SELECTORS,
+    SORT_OPTION_SELECTORS,
+    _load_selector_cache,
+    _remember_selector,
+    _selector_locator,
+    configure_playwright_browsers_path,
+    is_throttled,
+    launch_options,
+    log,
+    log_blocking_summary,
+    _log_reveal,
+    _update_snippet_text,
+    build_search_url,
+    candidate_record,
+    log_reveal_summary,
+    login_selectors,
+    looks_blocked,
+    query_param,
+    resource_blocker,
+    retry_after_s,
+    sorts_via_url,
+    span,
+    with_query_params,
+    write_storage_state,
+)
+
+
+# Opções do fluxo síncrono que o runner async (queries, daemon, sharding) não implementa
+UNSUPPORTED_ASYNC_OPTIONS = ("network_capture", "two_phase")
+
+
+def warn_unsupported_options(creds: dict, modo: str) -> None:
+    for opcao in UNSUPPORTED_ASYNC_OPTIONS:
+        if creds.get(opcao):
+            log(f"'{opcao}' não é usado no modo {modo}; a coleta segue pelo HTML, uma fase só", logging.WARNING)
+
+
+async def extract_article_fallback_async(curriculo, idx: int) -> dict:
+    """Versão async de catho_leads.extract_article_fallback (um locator por campo)."""
+    record = {"idx": idx, "ok": True, "is_candidate": False}
+    link = curriculo.locator('h2 a')
+    if await link.count() == 0:
+        return record
+    try:
+        nome = (await link.first.inner_text()).strip()
+    except Exception:
+        return record
+    try:
+        href = ((await link.first.get_attribute('href')) or '').strip()
+    except Exception:
+        href = ""
+
+    info_basica = ""
+    try:
+        for seletor in ('p.sc-eZkCL', 'xpath=.//p[contains(@class, "sc-eZkCL")]', 'text=/\\d+ anos/'):
+            info_elem = curriculo.locator(seletor).first
+            if await info_elem.count() > 0:
+                info_basica = (await info_elem.inner_text()).strip()
+                break
+    except Exception as e:
+        log(f"Erro info_basica {nome}: {e}")
+
+    try:
+        texto = await curriculo.inner_text()
+    except Exception:
+        texto = ""
+    record.update({
+        "is_candidate": True,
+        "nome": nome,
+        "href": href,
+        "info_basica": info_basica,
+        "has_phone": await curriculo.locator('button:has-text("Ver telefone")').count() > 0,
+        "has_email": await curriculo.locator('button:has-text("Ver e-mail")').count() > 0,
+        "atualizado": _update_snippet_text(texto),
+    })
+    return record
+
+
+def build_queries(creds: dict) -> list[dict]:
+    """Normaliza "queries" do config; cada item herda search_url/num_candidatos do topo.
+
+    Aceita tanto {"search_term": ..., "search_url": ..., "num_candidatos": ...}
+    quanto só a string do termo.
+    """
+    default_url = creds.get("search_url")
+    default_num = int(creds.get("num_candidatos", 10))
+
+    queries = []
+    for i, item in enumerate(creds.get("queries") or [], start=1):
+        if isinstance(item, str):
+            item = {"search_term": item}
+
+        search_url = item.get("search_url") or default_url
+        if not search_url:
+            raise ValueError(f"Consulta {i} sem 'search_url' e o config não tem um 'search_url' padrão.")
+
+        search_term = str(item.get("search_term", "")).strip()
+        search_url = build_search_url(search_url, search_term, creds)
+
+        num_candidatos = int(item.get("num_candidatos", default_num))
+        if num_candidatos <= 0:
+            raise ValueError(f"Consulta {i}: 'num_candidatos' deve ser um número maior que 0.")
+
+        queries.append({"search_term": search_term, "search_url": search_url, "num_candidatos": num_candidatos})
+    return queries
+
+
+async def _selector_is_valid_async(locator) -> bool:
+    """Versão async de catho_leads._selector_is_valid."""
+    try:
+        await locator.count()
+        return True
+    except Exception:
+        return False
+
+
+async def resolve_selector_async(page, selectors: Iterable[str], timeout_ms: int = 5000, cache_key: str | None = None):
+    """Versão async de catho_leads.resolve_selector (mesmo cache de seletores)."""
+    selectors = list(dict.fromkeys(selectors))
+
+    cached = _load_selector_cache().get(cache_key) if cache_key else None
+    if cached:
+        try:
+            locator = _selector_locator(page, cached).filter(visible=True).first
+            await locator.wait_for(state="visible", timeout=CACHED_SELECTOR_TIMEOUT_MS)
+            return locator, cached
+        except Exception:
+            log(f"Cached selector failed: {cached}", logging.DEBUG)
+
+    candidates = [(sel, _selector_locator(page, sel)) for sel in selectors]
+    for attempt in range(2):
+        if not candidates:
+            break
+        combined = candidates[0][1]
+        for _, locator in candidates[1:]:
+            combined = combined.or_(locator)
+        try:
+            await combined.filter(visible=True).first.wait_for(state="visible", timeout=timeout_ms)
+            break
+        except PlaywrightTimeoutError:
+            log(f"No selector visible after {timeout_ms} ms")
+            return None, None
+        except Exception as e:
+            # Um seletor inválido (ex.: vindo do config) derruba a disputa inteira; tenta sem ele
+            log(f"Selector race failed: {e}")
+            if attempt:
+                return None, None
+            candidates = [(sel, locator) for sel, locator in candidates if await _selector_is_valid_async(locator)]
+
+    for sel, locator in candidates:
+        try:
+            visivel = locator.filter(visible=True).first
+            if await visivel.is_visible():
+                _remember_selector(cache_key, sel)
+                return visivel, sel
+        except Exception:
+            continue
+    return None, None
+
+
+async def login_async(page, creds: dict) -> bool:
+    username_selectors, password_selectors, submit_selectors = login_selectors(creds)
+    await page.goto(creds["url"])
+    try:
+        await page.wait_for_load_state('domcontentloaded', timeout=6000)
+    except Exception:
+        pass
+    login_path = page.url.split("?")[0]
+
+    steps = [
+        ("username", username_selectors, creds["username"]),
+        ("password", password_selectors, creds["password"]),
+        ("submit", submit_selectors, None),
+    ]
+    for cache_key, selectors, value in steps:
+        locator, sel = await resolve_selector_async(page, selectors, cache_key=cache_key)
+        if locator is None:
+            log(f"Login: nenhum seletor de {cache_key} encontrado")
+            return False
+        if value is None:
+            await locator.click()
+        else:
+            await locator.fill(value)
+        log(f"Login: {cache_key} ok (selector: {sel})")
+
+    try:
+        await page.wait_for_url(lambda u: u.split("?")[0] != login_path, timeout=10000)
+    except Exception:
+        log("Página de login não redirecionou em 10 s; seguindo mesmo assim")
+    return True
+
+
+async def _session_is_valid_async(page, search_url: str, check_selector: str | None) -> bool:
+    try:
+        await page.goto(search_url, timeout=30000, wait_until='domcontentloaded')
+        if "signin" in page.url.lower():
+            return False
+        if await page.locator('input[type="password"]').count() > 0:
+            return False
+        if check_selector:
+            await page.locator(check_selector).first.wait_for(state="visible", timeout=5000)
+    except Exception:
+        return False
+    return True
+
+
+async def logged_in_state(browser, creds: dict, search_url: str) -> dict:
+    """Devolve o storage_state logado, reaproveitando o salvo enquanto for válido."""
+    reuse_session = bool(creds.get("reuse_session", True))
+
+    if reuse_session and SESSION_FILE.exists():
+        context = await browser.new_context(storage_state=str(SESSION_FILE))
+        try:
+            page = await context.new_page()
+            if await _session_is_valid_async(page, search_url, creds.get("session_check_selector")):
+                log("Sessão salva reaproveitada; login pulado")
+                return await context.storage_state()
+            log("Sessão salva expirada ou inválida; fazendo login completo")
+        finally:
+            await context.close()
+
+    context = await browser.new_context()
+    try:
+        page = await context.new_page()
+        if not await login_async(page, creds):
+            raise RuntimeError("Login não concluído; veja o log para o seletor que falhou.")
+        state = await context.storage_state()
+        if reuse_session:
+            write_storage_state(state, SESSION_FILE)
+        return state
+    finally:
+        await context.close()
+
+
+async def sort_by_update_date_async(page) -> bool:
+    """Versão async de catho_leads.sort_by_update_date; False se não conseguiu ordenar."""
+    try:
+        button, _ = await resolve_selector_async(page, SORT_BUTTON_SELECTORS, timeout_ms=3000, cache_key="sort_button")
+        if button is None:
+            log("Botão de ordenação não encontrado, continuando sem ordenação")
+            return False
+        await button.click()
+        option, _ = await resolve_selector_async(page, SORT_OPTION_SELECTORS, timeout_ms=3000, cache_key="sort_option")
+        if option is None:
+            log("Opção 'Data de Atualização' não encontrada, continuando sem ordenação")
+            return False
+        await option.click()
+    except Exception as e:
+        log(f"Erro ao ordenar por Data de Atualização: {e}")
+        return False
+    try:
+        await page.wait_for_load_state('networkidle', timeout=5000)
+    except Exception:
+        pass
+    return True
+
+
+async def _page_is_blocked_async(page) -> bool:
+    try:
+        return looks_blocked(page.url, await page.title())
+    except Exception:
+        return False
+
+
+async def timed_goto_async(page, url: str, pacer: RateController | None, tentativas: int = 3, **kwargs):
+    """Versão async de catho_leads.timed_goto."""
+    if pacer is None:
+        return await page.goto(url, **kwargs)
+    response = None
+    for tentativa in range(1, tentativas + 1):
+        await pacer.wait_async("navigate")
+        inicio = time.perf_counter()
+        try:
+            response = await page.goto(url, **kwargs)
+        except Exception:
+            pacer.record("navigate", None)
+            raise
+        status = response.status if response is not None else None
+        blocked = await _page_is_blocked_async(page)
+        pacer.record("navigate", (time.perf_counter() - inicio) * 1000, status, blocked, retry_after_s(response))
+        if not (blocked or is_throttled(status)):
+            break
+        log(f"Navegação para {url} barrada (status {status}, bloqueio {blocked}); tentativa {tentativa}/{tentativas}", logging.WARNING)
+    return response
+
+
+async def go_to_next_page_async(page, pacer: RateController | None = None) -> bool:
+    locator, _ = await resolve_selector_async(page, NEXT_PAGE_SELECTORS, timeout_ms=2000, cache_key="next_page")
+    if locator is None:
+        return False
+    if await locator.get_attribute("aria-disabled") == "true" or await locator.get_attribute("disabled") is not None:
+        return False
+    if pacer is not None:
+        await pacer.wait_async("navigate")
+    inicio = time.perf_counter()
+    status = None
+    try:
+        async with page.expect_navigation(wait_until="domcontentloaded", timeout=15000) as nav:
+            await locator.click()
+        response = await nav.value
+        status = response.status if response is not None else None
+    except Exception:
+        try:
+            await page.wait_for_load_state('networkidle', timeout=5000)
+        except Exception:
+            pass
+    if pacer is not None:
+        pacer.record("navigate", (time.perf_counter() - inicio) * 1000, status, await _page_is_blocked_async(page))
+    return True
+
+
+async def reveal_contact_async(
+    page, curriculo, idx: int, button_text: str, pattern: str, timeout_ms: int, pacer: RateController | None = None
+) -> tuple[str, float | None]:
+    """Versão async de catho_leads.reveal_contact: (valor, latência em ms), ou ("", None) em timeout."""
+    if pacer is not None:
+        await pacer.wait_async("reveal")
+    inicio = time.perf_counter()
+    before = await page.evaluate(COUNT_MATCHES_JS, pattern)
+    await curriculo.locator(f'button:has-text("{button_text}")').click()
+    try:
+        handle = await page.wait_for_function(
+            REVEAL_WAIT_JS,
+            arg={"idx": idx, "pattern": pattern, "before": before},
+            timeout=timeout_ms,
+        )
+    except PlaywrightTimeoutError:
+        if pacer is not None:
+            pacer.record("reveal", None)
+        return "", None
+    result = await handle.json_value()
+    latencia = (time.perf_counter() - inicio) * 1000
+    if pacer is not None:
+        pacer.record("reveal", latencia)
+    return result["value"].strip(), latencia
+
+
+async def collect_query(
+    context,
+    query: dict,
+    creds: dict,
+    stream: ResultStream,
+    index: CandidateIndex | None = None,
+    archive=None,
+    pacer: RateController | None = None,
+    recycler: PageRecycler | None = None,
+) -> int:
+    """Coleta uma consulta numa aba nova do contexto recebido e grava no stream.
+
+    `stream.vistos` é compartilhado entre as consultas: como tudo roda no mesmo
+    event loop, o teste-e-insere (e a escrita no JSONL) não precisa de lock.
+    Retorna quantos currículos esta consulta gravou.
+    """
+    vistos = stream.vistos
+    reveal_timeout_ms = int(creds.get("reveal_timeout_ms", 5000))
+    url_navigation = bool(creds.get("url_navigation", False))
+    page_param = str(creds.get("page_param", "page"))
+    num_candidatos = query["num_candidatos"]
+    delta = DeltaWatermark(query["search_url"]) if creds.get("delta_mode") else None
+
+    busca = query["search_term"] or query["search_url"]
+
+    coletados = 0
+    latencias_reveal: list[float] = []
+    paginas_na_aba = 0
+    lista_esgotada = False
+    page = await context.new_page()
+    try:
+        with span("navigate_search", busca=busca):
+            await timed_goto_async(page, query["search_url"], pacer, timeout=30000, wait_until='domcontentloaded')
+        if not sorts_via_url(creds):
+            with span("sort", busca=busca):
+                ordenado = await sort_by_update_date_async(page)
+            if not ordenado and delta is not None:
+                log(f"[{busca}] {DELTA_UNSORTED_MSG}", logging.WARNING)
+                delta = None
+
+        base_url = page.url
+        pagina_atual = int(query_param(base_url, page_param) or 1)
+
+        while coletados < num_candidatos:
+            with span("page_scan", busca=busca, pagina=pagina_atual):
+                try:
+                    await page.wait_for_selector('article', timeout=10000)
+                except PlaywrightTimeoutError:
+                    lista_esgotada = True
+                    break
+
+                artigos = page.locator('article')
+                try:
+                    registros = await page.eval_on_selector_all('article', EXTRACT_ARTICLES_JS)
+                except Exception as e:
+                    log(f"[{busca}] Extração em lote falhou, usando seletores individuais: {e}")
+                    registros = [{"idx": idx, "ok": False} for idx in range(await artigos.count())]
+                conhecidos = index.lookup_fresh(r.get("href", "") for r in registros) if index is not None else {}
+            log(f"[{busca}] Página {pagina_atual}: {len(registros)} artigos")
+
+            for registro in registros:
+                if coletados >= num_candidatos:
+                    break
+                if not registro.get("ok"):
+                    log(f"[{busca}] Artigo {registro['idx']} não pôde ser lido em lote ({registro.get('error', '')}); usando seletores")
+                    try:
+                        registro = await extract_article_fallback_async(artigos.nth(registro["idx"]), registro["idx"])
+                    except Exception:
+                        continue
+                if not registro.get("is_candidate") or not registro.get("nome"):
+                    continue
+                if delta is not None and not delta.is_new(registro):
+                    continue
+
+                chave = registro.get("href") or registro["nome"]
+                if chave in vistos:
+                    continue
+                vistos.add(chave)
+
+                idx = registro["idx"]
+                curriculo = artigos.nth(idx)
+                href = registro.get("href", "")
+                conhecido = conhecidos.get(href)
+                telefone = email = ""
+                try:
+                    if conhecido:
+                        telefone, email = conhecido["telefone"], conhecido["email"]
+                        index.reused += 1
+                        log(f"{registro['nome']} já conhecido; revelação pulada", logging.DEBUG)
+                    if not conhecido and registro.get("has_phone"):
+                        with span("reveal_phone", busca=busca):
+                            telefone, latencia = await reveal_contact_async(
+                                page, curriculo, idx, "Ver telefone", PHONE_PATTERN, reveal_timeout_ms, pacer
+                            )
+                        _log_reveal("Telefone", registro["nome"], latencia, reveal_timeout_ms, latencias_reveal)
+                    if not conhecido and registro.get("has_email"):
+                        with span("reveal_email", busca=busca):
+                            email, latencia = await reveal_contact_async(
+                                page, curriculo, idx, "Ver e-mail", EMAIL_PATTERN, reveal_timeout_ms, pacer
+                            )
+                        _log_reveal("E-mail", registro["nome"], latencia, reveal_timeout_ms, latencias_reveal)
+                except Exception as e:
+                    log(f"Erro ao revelar contato de {registro['nome']}: {e}")
+
+                novo = candidate_record(registro, telefone, email, busca=query["search_term"])
+                stream.append(novo, chave)
+                if index is not None:
+                    index.record(href, novo, revealed=bool(not conhecido and (telefone or email)))
+                coletados += 1
+
+            if archive is not None:
+                try:
+                    archive.save(await page.content(), pagina_atual, page.url, query["search_term"])
+                except Exception as e:
+                    log(f"[{busca}] Não foi possível arquivar a página {pagina_atual}: {e}")
+
+            if coletados >= num_candidatos:
+                break
+            if delta is not None and delta.passed:
+                log(f"[{query['search_term']}] Modo delta: marca d'água alcançada")
+                break
+
+            paginas_na_aba += 1
+            if recycler is not None:
+                try:
+                    heap = await page.evaluate(MEMORY_JS)
+                except Exception:
+                    heap = None
+                # Paginação por clique sem a página na URL: não há como voltar ao mesmo ponto
+                if recycler.observe(pagina_atual, heap, paginas_na_aba, busca=busca) and (url_navigation or page.url != base_url):
+                    # O contexto é do pool (compartilhado); aqui só a aba é trocada
+                    with span("recycle", busca=busca, pagina=pagina_atual):
+                        posicao = page.url
+                        await page.close()
+                        page = await context.new_page()
+                        if not url_navigation:
+                            await timed_goto_async(page, posicao, pacer, timeout=30000, wait_until='domcontentloaded')
+                    recycler.recycled(pagina_atual, busca)
+                    paginas_na_aba = 0
+
+            with span("paginate", busca=busca, pagina=pagina_atual + 1):
+                if url_navigation:
+                    pagina_atual += 1
+                    await timed_goto_async(
+                        page, with_query_params(base_url, {page_param: pagina_atual}), pacer, timeout=30000, wait_until='domcontentloaded'
+                    )
+                elif await go_to_next_page_async(page, pacer):
+                    pagina_atual += 1
+                else:
+                    lista_esgotada = True
+                    break
+    finally:
+        await page.close()
+
+    log_reveal_summary(latencias_reveal, f"[{busca}] ")
+    if delta is not None:
+        delta.save(exhausted=lista_esgotada)
+    return coletados
+
+
+async def run_queries(
+    creds: dict,
+    stream: ResultStream,
+    index: CandidateIndex | None = None,
+    timer: RunTimer | None = None,
+    archive=None,
+    pacer: RateController | None = None,
+    recycler: PageRecycler | None = None,
+    blocker: ResourceBlocker | None = None,
+) -> int:
+    queries = build_queries(creds)
+    if not queries:
+        return 0
+    warn_unsupported_options(creds, "de várias consultas")
+    concurrency = max(1, min(int(creds.get("concurrency", 3)), len(queries)))
+    log(f"{len(queries)} consultas, {concurrency} em paralelo")
+
+    configure_playwright_browsers_path()
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(**launch_options(creds))
+        if blocker is None:
+            blocker = resource_blocker(creds)
+        playwright_trace = timer is not None and bool(creds.get("playwright_trace", False))
+        contexts = []
+        try:
+            with span("login"):
+                state = await logged_in_state(browser, creds, queries[0]["search_url"])
+
+            pool: asyncio.Queue = asyncio.Queue()
+            for _ in range(concurrency):
+                context = await browser.new_context(storage_state=state)
+                if playwright_trace:
+                    await context.tracing.start(screenshots=True, snapshots=True)
+                await blocker.attach_async(context)
+                if pacer is not None:
+                    pacer.attach(context)
+                contexts.append(context)
+                pool.put_nowait(context)
+
+            async def run_one(query: dict) -> int:
+                context = await pool.get()
+                try:
+                    coletados = await collect_query(context, query, creds, stream, index, archive, pacer, recycler)
+                    log(f"Consulta '{query['search_term']}': {coletados} currículos")
+                    return coletados
+                except Exception as e:
+                    log(f"Erro na consulta '{query['search_term']}': {e}")
+                    return 0
+                finally:
+                    pool.put_nowait(context)
+
+            resultados = await asyncio.gather(*(run_one(q) for q in queries))
+        finally:
+            log_blocking_summary(blocker)
+            if playwright_trace:
+                # Um trace por contexto do pool
+                for i, context in enumerate(contexts, start=1):
+                    try:
+                        trace_file = timer.path(f"playwright_trace_ctx{i}", ".zip")
+                        trace_file.parent.mkdir(parents=True, exist_ok=True)
+                        await context.tracing.stop(path=str(trace_file))
+                        log(f"Trace do Playwright: {trace_file}")
+                    except Exception as e:
+                        log(f"Não foi possível gravar o trace do Playwright: {e}")
+            await browser.close()
+
+    return sum(resultados)
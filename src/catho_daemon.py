@@ -0,0 +1,297 @@
+"""Modo daemon: um Chromium e uma sessão logada ficam abertos e atendem buscas por HTTP local.
+
+    python src/catho_leads.py --daemon
+    curl -X POST http://127.0.0.1:8777/jobs -d "{\"search_term\": \"vendedor\", \"num_candidatos\": 20}"
+    curl http://127.0.0.1:8777/jobs/1
+
+As buscas entram numa fila e são atendidas por `concurrency` contextos já logados
+(mesmo storage_state). Cada job grava seu JSONL e exporta JSON/CSV/Excel em
+output/candidates/jobs/<id>/. Com "daemon_url" no config (ou --via-daemon), o
+catho_leads.py vira só um cliente que envia a busca e espera o resultado.
+"""
+import asyncio
+import json
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+from playwright.async_api import async_playwright
+
+from catho_async import _session_is_valid_async, build_queries, collect_query, logged_in_state, warn_unsupported_options
+from catho_leads import (
+    OUTPUT_DIR,
+    CandidateIndex,
+    ResourceBlocker,
+    ResultStream,
+    configure_playwright_browsers_path,
+    export_results,
+    launch_options,
+    log,
+    page_recycler,
+    rate_controller,
+    resource_blocker,
+)
+
+
+DEFAULT_DAEMON_URL = "http://127.0.0.1:8777"
+JOBS_DIR = OUTPUT_DIR / "jobs"
+
+# Campos do job que o cliente pode mandar; o resto vem do config do daemon
+JOB_FIELDS = ("search_term", "search_url", "num_candidatos")
+
+REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+class BrowserDaemon:
+    """Fila de jobs atendida por contextos logados de um único Chromium."""
+
+    def __init__(self, creds: dict):
+        self.creds = creds
+        self.jobs: dict[str, dict] = {}
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.index = CandidateIndex(ttl_days=float(creds.get("candidate_ttl_days", 30))) if creds.get("candidate_index", True) else None
+        # Prefixo da execução: depois de reiniciar, o job "1" não sobrescreve a pasta de antes
+        self._run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._next_id = 1
+        self._state: dict | None = None
+        self._browser = None
+        self._blocker: ResourceBlocker | None = None
+        # Um ritmo só para o daemon inteiro: todos os jobs batem no mesmo site
+        self.pacer = rate_controller(creds)
+        self.recycler = page_recycler(creds)
+
+    def submit(self, payload: dict) -> dict:
+        """Valida e enfileira um job; ValueError se a busca for inválida."""
+        item = {k: payload[k] for k in JOB_FIELDS if payload.get(k) not in (None, "")}
+        query = build_queries({**self.creds, "queries": [item]})[0]
+        job_id = f"{self._run_id}_{self._next_id}"
+        self._next_id += 1
+        while (JOBS_DIR / job_id).exists():
+            # Outro daemon iniciado no mesmo segundo já usou este id
+            job_id = f"{self._run_id}_{self._next_id}"
+            self._next_id += 1
+        job = {
+            "id": job_id,
+            "status": "queued",
+            **query,
+            "count": 0,
+            "error": None,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "started_at": None,
+            "finished_at": None,
+            "output": str(JOBS_DIR / job_id),
+        }
+        self.jobs[job_id] = job
+        self.queue.put_nowait(job)
+        log(f"Job {job_id} na fila: {query['search_term'] or query['search_url']} ({query['num_candidatos']} currículos)")
+        return job
+
+    async def _new_context(self):
+        context = await self._browser.new_context(storage_state=self._state)
+        await self._blocker.attach_async(context)
+        if self.pacer is not None:
+            self.pacer.attach(context)
+        return context
+
+    async def _refresh_login(self, query: dict) -> bool:
+        """Confere a sessão com uma aba nova; se caiu, faz login de novo. Retorna True se renovou."""
+        context = await self._new_context()
+        try:
+            page = await context.new_page()
+            if await _session_is_valid_async(page, query["search_url"], self.creds.get("session_check_selector")):
+                return False
+        finally:
+            await context.close()
+        log("Sessão do daemon expirou; fazendo login de novo")
+        self._state = await logged_in_state(self._browser, {**self.creds, "reuse_session": False}, query["search_url"])
+        return True
+
+    async def _run_job(self, context, job: dict):
+        job["status"] = "running"
+        job["started_at"] = datetime.now().isoformat(timespec="seconds")
+        saida = JOBS_DIR / job["id"]
+        stream = ResultStream(search_url=job["search_url"], path=saida / "curriculos.jsonl", checkpoint_file=saida / "checkpoint.json")
+        try:
+            query = {k: job[k] for k in JOB_FIELDS}
+            job["count"] = await collect_query(context, query, self.creds, stream, self.index, pacer=self.pacer, recycler=self.recycler)
+            if job["count"] == 0 and await self._refresh_login(query):
+                # Só troca depois que o novo existe: se a criação falhar, o worker segue com o antigo
+                novo = await self._new_context()
+                await context.close()
+                context = novo
+                job["count"] = await collect_query(context, query, self.creds, stream, self.index, pacer=self.pacer, recycler=self.recycler)
+            stream.finish()
+            job["status"] = "done"
+        except Exception as e:
+            job["status"] = "failed"
+            job["error"] = str(e)
+            log(f"Job {job['id']} falhou: {e}")
+        finally:
+            stream.close()
+            export_results(stream.path, saida, formats=self.creds.get("export_formats") or ["json", "csv", "excel"])
+            job["finished_at"] = datetime.now().isoformat(timespec="seconds")
+        log(f"Job {job['id']} {job['status']}: {job['count']} currículos em {saida}")
+        return context
+
+    async def _worker(self) -> None:
+        context = await self._new_context()
+        try:
+            while True:
+                job = await self.queue.get()
+                try:
+                    context = await self._run_job(context, job)
+                finally:
+                    self.queue.task_done()
+        finally:
+            await context.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                chave, _, valor = line.decode("latin-1").partition(":")
+                headers[chave.strip().lower()] = valor.strip()
+            body = await reader.readexactly(int(headers.get("content-length") or 0))
+            method, path = (request_line + ["", ""])[:2]
+            status, resposta = self.route(method, path.split("?")[0].rstrip("/"), body)
+        except Exception as e:
+            status, resposta = 400, {"error": str(e)}
+
+        data = json.dumps(resposta, ensure_ascii=False).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            "Connection: close\r\n\r\n".encode("latin-1") + data
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    def route(self, method: str, path: str, body: bytes) -> tuple[int, dict]:
+        if path == "/health" and method == "GET":
+            return 200, {
+                "status": "ok",
+                "queued": self.queue.qsize(),
+                "jobs": len(self.jobs),
+                "pacing": self.pacer.summary() if self.pacer is not None else None,
+                "memory": self.recycler.summary() if self.recycler is not None else None,
+            }
+        if path == "/jobs" and method == "GET":
+            return 200, {"jobs": list(self.jobs.values())}
+        if path == "/jobs" and method == "POST":
+            try:
+                return 202, self.submit(json.loads(body or b"{}"))
+            except ValueError as e:
+                return 400, {"error": str(e)}
+        if path.startswith("/jobs/"):
+            if method != "GET":
+                return 405, {"error": "use GET"}
+            job = self.jobs.get(path.rsplit("/", 1)[-1])
+            return (200, job) if job else (404, {"error": "job não encontrado"})
+        return 404, {"error": "rota não encontrada"}
+
+    async def serve(self, host: str, port: int) -> None:
+        configure_playwright_browsers_path()
+        async with async_playwright() as p:
+            self._browser = await p.chromium.launch(**launch_options(self.creds))
+            self._blocker = resource_blocker(self.creds)
+            try:
+                self._state = await logged_in_state(self._browser, self.creds, self.creds["search_url"])
+                workers = [asyncio.create_task(self._worker()) for _ in range(max(1, int(self.creds.get("concurrency", 1))))]
+                server = await asyncio.start_server(self._handle, host, port)
+                log(f"Daemon pronto em http://{host}:{port} ({len(workers)} contexto(s) logado(s))")
+                try:
+                    async with server:
+                        await server.serve_forever()
+                finally:
+                    for worker in workers:
+                        worker.cancel()
+            finally:
+                if self.index is not None:
+                    self.index.close()
+                await self._browser.close()
+
+
+def run_daemon(creds: dict, host: str = "127.0.0.1", port: int = 8777) -> None:
+    if not creds.get("search_url"):
+        raise ValueError("O daemon precisa de 'search_url' no config (usado para o login e como busca padrão).")
+    warn_unsupported_options(creds, "daemon")
+    try:
+        asyncio.run(BrowserDaemon(creds).serve(host, port))
+    except KeyboardInterrupt:
+        log("Daemon encerrado")
+
+
+# Quanto o cliente (--via-daemon) espera os jobs antes de desistir; "daemon_timeout_s" no config
+DAEMON_CLIENT_TIMEOUT_S = 3600
+
+
+def _request(daemon_url: str, path: str, payload: dict | None = None, timeout_s: float = 10) -> dict:
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    req = urllib.request.Request(daemon_url.rstrip("/") + path, data=data, method="POST" if data else "GET")
+    req.add_header("Content-Type", "application/json")
+    try:
+        with urllib.request.urlopen(req, timeout=timeout_s) as resp:
+            return json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        raise ValueError(json.loads(e.read() or b"{}").get("error", str(e))) from e
+    except (urllib.error.URLError, OSError) as e:
+        raise ConnectionError(f"Daemon em {daemon_url} não respondeu: {getattr(e, 'reason', e)}") from e
+
+
+def daemon_is_up(daemon_url: str) -> bool:
+    try:
+        return _request(daemon_url, "/health", timeout_s=2).get("status") == "ok"
+    except Exception:
+        return False
+
+
+def run_via_daemon(
+    daemon_url: str,
+    payloads: list[dict],
+    poll_s: float = 1.0,
+    timeout_s: float = DAEMON_CLIENT_TIMEOUT_S,
+) -> list[dict]:
+    """Cliente: envia as buscas ao daemon e espera todos os jobs terminarem.
+
+    ConnectionError se o daemon não aceitou nenhuma busca (dá para rodar localmente);
+    RuntimeError se ele caiu depois de aceitar alguma e TimeoutError se os jobs
+    não terminarem em timeout_s. Nesses dois casos os jobs podem seguir no daemon.
+    """
+    prazo = time.monotonic() + timeout_s
+    jobs: list[dict] = []
+
+    def perdidos(e: Exception) -> RuntimeError:
+        ids = ", ".join(j["id"] for j in jobs)
+        return RuntimeError(f"{e} com os jobs {ids} já enviados; confira em {daemon_url.rstrip('/')}/jobs antes de rodar de novo")
+
+    for payload in payloads:
+        try:
+            jobs.append(_request(daemon_url, "/jobs", payload))
+        except ConnectionError as e:
+            if not jobs:
+                raise
+            raise perdidos(e) from e
+    log(f"{len(jobs)} busca(s) enviada(s) ao daemon ({daemon_url}): jobs {', '.join(j['id'] for j in jobs)}")
+    for i, job in enumerate(jobs):
+        while job["status"] in ("queued", "running"):
+            if time.monotonic() >= prazo:
+                raise TimeoutError(
+                    f"Daemon não terminou o job {job['id']} em {timeout_s:.0f} s; "
+                    f"acompanhe em {daemon_url.rstrip('/')}/jobs/{job['id']}"
+                )
+            time.sleep(poll_s)
+            try:
+                job = _request(daemon_url, f"/jobs/{job['id']}")
+            except ConnectionError as e:
+                raise perdidos(e) from e
+        jobs[i] = job
+        if job["status"] == "failed":
+            log(f"Job {job['id']} falhou no daemon: {job['error']}")
+        else:
+            log(f"Job {job['id']} concluído: {job['count']} currículos em {job['output']}")
+    return jobs
@@ -0,0 +1,232 @@
+"""Enriquecimento: busca a página de perfil de cada currículo coletado por HTTP puro.
+
+Com "enrichment": {"enabled": true} (ou --enrich), depois da coleta cada registro
+do JSONL que tem o link do perfil (`h2 a`) ganha os campos da página do perfil
+(experiência, pretensão salarial, última atualização). As páginas são baixadas
+pelo APIRequestContext do Playwright com os cookies da sessão logada, sem abrir
+aba nem renderizar nada, com no máximo `concurrency` downloads ao mesmo tempo.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Iterable
+from urllib.parse import urljoin
+
+from playwright.async_api import async_playwright
+
+from catho_archive import inner_text, parse_html
+from catho_leads import (
+    SESSION_FILE,
+    STREAM_FILE,
+    RateController,
+    _normalize,
+    configure_playwright_browsers_path,
+    is_throttled,
+    iter_jsonl,
+    log,
+    looks_blocked,
+    retry_after_s,
+    span,
+)
+
+
+# Campo -> rótulos na página do perfil; o valor é o resto da linha (ou a linha seguinte)
+PROFILE_LABELS = {
+    "pretensao_salarial": ["Pretensão salarial", "Salário pretendido", "Pretensão"],
+    "ultima_atualizacao": ["Atualizado em", "Última atualização", "Currículo atualizado em"],
+}
+
+# Campo -> títulos de seção; o valor são as linhas até o próximo título conhecido
+PROFILE_SECTIONS = {
+    "experiencia": ["Experiência profissional", "Experiências profissionais", "Experiência"],
+}
+
+# Títulos que encerram uma seção mesmo sem virar campo
+SECTION_STOPS = [
+    "Formação", "Formação acadêmica", "Escolaridade", "Idiomas", "Cursos", "Objetivo",
+    "Informações adicionais", "Dados pessoais", "Habilidades",
+]
+
+MAX_SECTION_CHARS = 2000
+
+# Registros baixados por vez: o JSONL é lido e regravado em lotes, sem ficar inteiro na memória
+BATCH_SIZE = 500
+
+
+def _label_value(linhas: list[str], i: int, rotulo: str) -> str:
+    linha = linhas[i]
+    if ":" in linha:
+        valor = linha.split(":", 1)[1]
+    else:
+        valor = linha[len(rotulo):]
+    valor = valor.strip(" -–")
+    if not valor and i + 1 < len(linhas):
+        valor = linhas[i + 1]
+    return valor.strip()
+
+
+def parse_profile_html(html: str, labels: dict | None = None, sections: dict | None = None) -> dict:
+    """Campos da página de perfil, procurados pelo texto visível (não por classes CSS)."""
+    labels = PROFILE_LABELS if labels is None else labels
+    sections = PROFILE_SECTIONS if sections is None else sections
+    linhas = inner_text(parse_html(html)).split("\n")
+    normalizadas = [_normalize(linha).rstrip(" :") for linha in linhas]
+    titulos = {_normalize(t) for t in SECTION_STOPS}
+    titulos.update(_normalize(t) for rotulos in sections.values() for t in rotulos)
+
+    campos = {}
+    for campo, rotulos in labels.items():
+        for rotulo in rotulos:
+            alvo = _normalize(rotulo)
+            i = next((i for i, linha in enumerate(normalizadas) if linha.startswith(alvo)), None)
+            if i is not None:
+                campos[campo] = _label_value(linhas, i, rotulo)
+                break
+
+    for campo, rotulos in sections.items():
+        alvos = [_normalize(r) for r in rotulos]
+        inicio = next((i for i, linha in enumerate(normalizadas) if linha in alvos), None)
+        if inicio is None:
+            continue
+        itens = []
+        for linha, normalizada in zip(linhas[inicio + 1:], normalizadas[inicio + 1:]):
+            if normalizada in titulos:
+                break
+            itens.append(linha)
+        campos[campo] = " | ".join(itens)[:MAX_SECTION_CHARS]
+    return campos
+
+
+def profile_url(registro: dict, base_url: str) -> str | None:
+    """URL absoluta do perfil, a partir do href do card gravado no registro."""
+    href = registro.get("href") or ""
+    if not (href.startswith("/") or href.startswith("http")):
+        return None
+    return urljoin(base_url, href)
+
+
+async def _fetch_profile(request, url: str, timeout_ms: float, pacer: RateController | None, tentativas: int = 3) -> str | None:
+    for _ in range(tentativas):
+        if pacer is not None:
+            await pacer.wait_async("profile")
+        inicio = time.perf_counter()
+        try:
+            response = await request.get(url, timeout=timeout_ms)
+        except Exception as e:
+            if pacer is not None:
+                pacer.record("profile", None)
+            log(f"Perfil {url}: {e}", logging.DEBUG)
+            return None
+        latencia = (time.perf_counter() - inicio) * 1000
+        bloqueado = looks_blocked(response.url)
+        if pacer is not None:
+            pacer.record("profile", latencia, response.status, bloqueado, retry_after_s(response))
+        if is_throttled(response.status) or bloqueado:
+            continue
+        if not response.ok:
+            log(f"Perfil {url}: HTTP {response.status}", logging.DEBUG)
+            return None
+        return await response.text()
+    return None
+
+
+async def enrich_records(
+    registros: Iterable[dict],
+    base_url: str,
+    storage_state,
+    concurrency: int = 8,
+    timeout_ms: float = 15000,
+    pacer: RateController | None = None,
+    labels: dict | None = None,
+    sections: dict | None = None,
+    batch_size: int = BATCH_SIZE,
+    on_batch: Callable[[list[dict]], None] | None = None,
+) -> dict:
+    """Baixa os perfis em paralelo e junta os campos em cada registro (no lugar). Retorna contadores.
+
+    `registros` pode ser um gerador: é consumido em lotes de batch_size, e cada
+    lote pronto vai para on_batch antes do próximo ser lido.
+    """
+    limite = asyncio.Semaphore(max(1, concurrency))
+    stats = {"perfis": 0, "enriquecidos": 0, "falhas": 0, "login": 0}
+
+    async def enrich_one(request, registro: dict) -> None:
+        url = profile_url(registro, base_url)
+        if url is None:
+            return
+        stats["perfis"] += 1
+        async with limite:
+            with span("profile_fetch"):
+                html = await _fetch_profile(request, url, timeout_ms, pacer)
+        if html is None:
+            stats["falhas"] += 1
+            return
+        if 'type="password"' in html:
+            # Cookie expirado: o site devolveu a página de login em vez do perfil
+            stats["login"] += 1
+            stats["falhas"] += 1
+            return
+        campos = parse_profile_html(html, labels, sections)
+        if campos:
+            stats["enriquecidos"] += 1
+        for campo, valor in campos.items():
+            registro.setdefault(campo, valor)
+
+    configure_playwright_browsers_path()
+    async with async_playwright() as p:
+        request = await p.request.new_context(storage_state=storage_state)
+        try:
+            registros = iter(registros)
+            while lote := list(islice(registros, max(1, batch_size))):
+                await asyncio.gather(*(enrich_one(request, r) for r in lote))
+                if on_batch is not None:
+                    on_batch(lote)
+        finally:
+            await request.dispose()
+    return stats
+
+
+def enrich_jsonl(creds: dict, jsonl_file: Path = STREAM_FILE, storage_state=None, pacer: RateController | None = None) -> dict:
+    """Enriquece o JSONL da coleta no lugar (grava num temporário, lote a lote, e troca no fim)."""
+    enrichment = creds.get("enrichment") or {}
+    storage_state = storage_state or (str(SESSION_FILE) if SESSION_FILE.exists() else None)
+    if storage_state is None:
+        log("Enriquecimento pulado: sem sessão salva (ligue reuse_session)")
+        return {}
+    if not jsonl_file.exists():
+        return {}
+
+    base_url = creds.get("search_url") or creds.get("url") or ""
+    tmp = jsonl_file.with_suffix(".enrich.tmp")
+    inicio = time.perf_counter()
+    with span("enrich"), tmp.open("w", encoding="utf-8") as f:
+
+        def gravar(lote: list[dict]) -> None:
+            f.writelines(json.dumps(registro, ensure_ascii=False) + "\n" for registro in lote)
+
+        stats = asyncio.run(enrich_records(
+            iter_jsonl(jsonl_file),
+            base_url,
+            storage_state,
+            concurrency=int(enrichment.get("concurrency", 8)),
+            timeout_ms=float(enrichment.get("timeout_ms", 15000)),
+            pacer=pacer,
+            labels={**PROFILE_LABELS, **(enrichment.get("labels") or {})},
+            sections={**PROFILE_SECTIONS, **(enrichment.get("sections") or {})},
+            batch_size=int(enrichment.get("batch_size", BATCH_SIZE)),
+            on_batch=gravar,
+        ))
+    os.replace(tmp, jsonl_file)
+
+    duracao = time.perf_counter() - inicio
+    log(
+        f"Enriquecimento: {stats['enriquecidos']}/{stats['perfis']} perfis em {duracao:.1f} s "
+        f"({stats['perfis'] / duracao if duracao else 0:.1f}/s), {stats['falhas']} falhas"
+    )
+    if stats["login"]:
+        log(f"Enriquecimento: {stats['login']} perfis voltaram a página de login (sessão expirada?)")
+    return stats
@@ -1,30 +1,266 @@
+import argparse
+import atexit
 import json
+import logging
+import math
 import os
+import queue
+import re
 import shutil
 import sys
+import textwrap
+import time
+import unicodedata
+from contextlib import contextmanager, nullcontext
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
-from typing import Iterable
-from datetime import datetime
+from typing import Iterable, Iterator
+from datetime import date, datetime, timedelta
 from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
-from playwright.sync_api import sync_playwright
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError, sync_playwright
 
 
 APP_ROOT = Path(sys.executable).resolve().parent if getattr(sys, "frozen", False) else Path(__file__).resolve().parent.parent
+# CATHOLEADS_HOME troca a pasta base (output/, cache, sessão); o benchmark usa para não sujar a real
+if os.environ.get("CATHOLEADS_HOME"):
+    APP_ROOT = Path(os.environ["CATHOLEADS_HOME"]).resolve()
 
 LOG_FILE = APP_ROOT / "output" / "logs" / "catho_leads.log"
 
 
-def log(msg: str) -> None:
-    ts = datetime.now().isoformat(sep=" ", timespec="seconds")
-    line = f"[{ts}] {msg}\n"
+_logger = logging.getLogger("catho_leads")
+_log_listener: QueueListener | None = None
+
+
+class _TextFormatter(logging.Formatter):
+    """`[data hora] mensagem`, com o nível na frente só quando não é INFO."""
+
+    def __init__(self):
+        super().__init__("[%(asctime)s] %(message)s", "%Y-%m-%d %H:%M:%S")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        if record.levelno != logging.INFO:
+            ts, _, rest = line.partition("] ")
+            line = f"{ts}] {record.levelname}: {rest}"
+        return line
+
+
+class _JsonLinesFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(
+            {
+                "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+                "level": record.levelname,
+                "msg": record.getMessage(),
+            },
+            ensure_ascii=False,
+        )
+
+
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+
+
+class _SizeAndDayRotatingHandler(RotatingFileHandler):
+    """Gira o log por tamanho (maxBytes) e, se `daily`, também na virada do dia."""
+
+    def __init__(self, filename: Path, max_bytes: int, backup_count: int, daily: bool):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+        self.daily = daily
+        try:
+            self._day = date.fromtimestamp(os.path.getmtime(filename))
+        except OSError:
+            self._day = date.today()
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.daily and date.today() != self._day:
+            return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self) -> None:
+        super().doRollover()
+        self._day = date.today()
+
+
+def setup_logging(
+    level: str | int = "INFO",
+    json_lines: bool = False,
+    max_bytes: int = 10 * 1024 * 1024,
+    backup_count: int = 5,
+    daily: bool = True,
+    console: bool = True,
+) -> None:
+    """Liga o log: `log()` só põe a linha numa fila e uma thread escreve no arquivo
+    (handle aberto o tempo todo, com rotação) e no console.
+
+    Um nível desconhecido (ex.: erro de digitação em log_level) vira INFO, com aviso.
+    """
+    global _log_listener
+    shutdown_logging()
+
+    invalido = None
+    if isinstance(level, str):
+        level = level.strip().upper()
+        if level not in LOG_LEVELS:
+            invalido, level = level, "INFO"
+
+    handlers: list[logging.Handler] = []
     try:
         LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
-        with LOG_FILE.open("a", encoding="utf-8") as f:
-            f.write(line)
+        file_handler = _SizeAndDayRotatingHandler(LOG_FILE, max_bytes, backup_count, daily)
+        file_handler.setFormatter(_JsonLinesFormatter() if json_lines else _TextFormatter())
+        handlers.append(file_handler)
     except Exception:
         pass
-    print(line, end="")
+    if console:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(_TextFormatter())
+        handlers.append(console_handler)
+
+    fila: queue.SimpleQueue = queue.SimpleQueue()
+    _logger.handlers[:] = [QueueHandler(fila)]
+    _logger.setLevel(level)
+    _logger.propagate = False
+    _log_listener = QueueListener(fila, *handlers)
+    _log_listener.start()
+    if invalido is not None:
+        log(f"log_level '{invalido}' desconhecido (use {', '.join(LOG_LEVELS)}); usando INFO", logging.WARNING)
+
+
+def shutdown_logging() -> None:
+    """Esvazia a fila e fecha o arquivo de log."""
+    global _log_listener
+    if _log_listener is None:
+        return
+    _log_listener.stop()
+    for handler in _log_listener.handlers:
+        handler.close()
+    _log_listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+def log(msg: str, level: int = logging.INFO) -> None:
+    if _log_listener is None:
+        setup_logging()
+    _logger.log(level, msg)
+
+
+REPORT_DIR = APP_ROOT / "output" / "reports"
+
+
+def _percentile(valores: list[float], p: float) -> float:
+    """Percentil pelo método nearest-rank (valores já ordenados)."""
+    if not valores:
+        return 0.0
+    return valores[max(0, math.ceil(p / 100 * len(valores)) - 1)]
+
+
+class RunTimer:
+    """Spans de tempo por fase (login, sort, page_scan, reveal_phone...) de uma execução.
+
+    Gera o relatório JSON (totais e p50/p95 por fase, currículos por minuto) e,
+    se pedido, um trace no formato do Chrome (abre em chrome://tracing ou no Perfetto).
+    """
+
+    def __init__(self):
+        self.started_at = datetime.now()
+        self.run_id = self.started_at.strftime("%Y%m%d_%H%M%S")
+        self._t0 = time.perf_counter()
+        self.spans: list[dict] = []
+
+    @contextmanager
+    def span(self, name: str, **args):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            fim = time.perf_counter()
+            self.spans.append({
+                "name": name,
+                "start_ms": (inicio - self._t0) * 1000,
+                "dur_ms": (fim - inicio) * 1000,
+                "args": args,
+            })
+
+    def path(self, prefix: str, suffix: str) -> Path:
+        return REPORT_DIR / f"{prefix}_{self.run_id}{suffix}"
+
+    def phases(self) -> dict[str, dict]:
+        duracoes: dict[str, list[float]] = {}
+        for s in self.spans:
+            duracoes.setdefault(s["name"], []).append(s["dur_ms"])
+        resumo = {}
+        for name, valores in duracoes.items():
+            valores.sort()
+            resumo[name] = {
+                "count": len(valores),
+                "total_ms": round(sum(valores), 1),
+                "p50_ms": round(_percentile(valores, 50), 1),
+                "p95_ms": round(_percentile(valores, 95), 1),
+                "max_ms": round(valores[-1], 1),
+            }
+        return resumo
+
+    def report(self, candidatos: int, **extra) -> dict:
+        duracao_s = time.perf_counter() - self._t0
+        return {
+            "run_id": self.run_id,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+            "duration_s": round(duracao_s, 2),
+            "candidates": candidatos,
+            "candidates_per_minute": round(candidatos / (duracao_s / 60), 2) if duracao_s > 0 else 0.0,
+            **extra,
+            "phases": self.phases(),
+        }
+
+    def chrome_trace(self) -> dict:
+        # Spans de consultas paralelas (arg "busca") vão para linhas (tid) separadas
+        tids: dict[str, int] = {}
+        eventos = []
+        for s in self.spans:
+            tid = tids.setdefault(str(s["args"].get("busca", "")), len(tids) + 1)
+            eventos.append({
+                "name": s["name"],
+                "ph": "X",
+                "ts": round(s["start_ms"] * 1000),
+                "dur": round(s["dur_ms"] * 1000),
+                "pid": 1,
+                "tid": tid,
+                "args": s["args"],
+            })
+        return {"traceEvents": eventos, "displayTimeUnit": "ms"}
+
+    def save(self, candidatos: int, chrome_trace: bool = False, **extra) -> dict:
+        report = self.report(candidatos, **extra)
+        REPORT_DIR.mkdir(parents=True, exist_ok=True)
+        report_file = self.path("run", ".json")
+        report_file.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        log(f"Relatório da execução: {report_file} ({report['candidates_per_minute']} currículos/min)")
+        if chrome_trace:
+            trace_file = self.path("trace", ".json")
+            trace_file.write_text(json.dumps(self.chrome_trace(), ensure_ascii=False), encoding="utf-8")
+            log(f"Trace (chrome://tracing / Perfetto): {trace_file}")
+        return report
+
+
+_run_timer: RunTimer | None = None
+
+
+def start_run_timer() -> RunTimer:
+    global _run_timer
+    _run_timer = RunTimer()
+    return _run_timer
+
+
+def span(name: str, **args):
+    """Mede um trecho na execução atual; sem RunTimer ativo não faz nada."""
+    if _run_timer is None:
+        return nullcontext()
+    return _run_timer.span(name, **args)
 
 
 def _default_config_candidates() -> list[Path]:
@@ -83,6 +319,17 @@ def load_creds(path: str | Path | None = None) -> dict:
     raise FileNotFoundError("Config não encontrado. Procurei em: " + ", ".join(str(c.resolve()) for c in candidates))
 
 
+def launch_options(creds: dict) -> dict:
+    """Opções do chromium.launch; o perfil "fast" ou o "pacing" ligado tiram o slow_mo (atraso fixo entre ações)."""
+    fast = str(creds.get("profile", "")).lower() == "fast"
+    paced = bool((creds.get("pacing") or {}).get("enabled", True))
+    opcoes = {"headless": bool(creds.get("headless", True)), "slow_mo": 0 if fast or paced else 50}
+    if float((creds.get("recycle") or {}).get("max_heap_mb", 512)):
+        # Sem a flag o performance.memory vem arredondado em degraus grandes
+        opcoes["args"] = ["--enable-precise-memory-info"]
+    return opcoes
+
+
 def configure_playwright_browsers_path() -> None:
     if os.environ.get("PLAYWRIGHT_BROWSERS_PATH"):
         return
@@ -92,109 +339,829 @@ def configure_playwright_browsers_path() -> None:
         os.environ["PLAYWRIGHT_BROWSERS_PATH"] = str(bundled)
 
 
-def try_selectors(page, selectors: Iterable[str], fill_value: str | None = None, click: bool = False) -> tuple[bool, str | None]:
-    for sel in selectors:
-        log(f"Trying selector: {sel}")
+SELECTOR_CACHE_FILE = APP_ROOT / "output" / "cache" / "selectors.json"
+
+# Quanto esperar pelo seletor que venceu na última execução antes de disputar a lista toda
+CACHED_SELECTOR_TIMEOUT_MS = 1500
+
+_selector_cache: dict[str, str] | None = None
+
+
+def _load_selector_cache() -> dict[str, str]:
+    global _selector_cache
+    if _selector_cache is None:
         try:
-            if sel.startswith("label="):
-                locator = page.get_by_label(sel.split("=", 1)[1])
-            elif sel.startswith("xpath=") or sel.startswith("//"):
-                xpath = sel if sel.startswith("xpath=") else f"xpath={sel}"
-                locator = page.locator(xpath)
-            else:
-                locator = page.locator(sel)
+            _selector_cache = json.loads(SELECTOR_CACHE_FILE.read_text(encoding="utf-8"))
+        except Exception:
+            _selector_cache = {}
+    return _selector_cache
+
+
+def _remember_selector(cache_key: str | None, sel: str | None) -> None:
+    if not cache_key:
+        return
+    cache = _load_selector_cache()
+    if cache.get(cache_key) == sel:
+        return
+    if sel is None:
+        cache.pop(cache_key, None)
+    else:
+        cache[cache_key] = sel
+    try:
+        SELECTOR_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        SELECTOR_CACHE_FILE.write_text(json.dumps(cache, ensure_ascii=False, indent=2), encoding="utf-8")
+    except Exception:
+        pass
 
-            locator.wait_for(state="visible", timeout=5000)
 
-            if fill_value is not None:
-                locator.fill(fill_value)
-                log(f"Filled selector: {sel}")
-            if click:
-                locator.click()
-                log(f"Clicked selector: {sel}")
+def _selector_locator(page, sel: str):
+    if sel.startswith("label="):
+        return page.get_by_label(sel.split("=", 1)[1])
+    if sel.startswith("xpath=") or sel.startswith("//"):
+        xpath = sel if sel.startswith("xpath=") else f"xpath={sel}"
+        return page.locator(xpath)
+    return page.locator(sel)
 
-            log(f"Selector succeeded: {sel}")
-            return True, sel
-        except Exception as e:
-            log(f"Selector failed: {sel} -> {e}")
-            continue
-    log("No selector matched from provided list.")
-    return False, None
 
+def _selector_is_valid(locator) -> bool:
+    try:
+        locator.count()
+        return True
+    except Exception:
+        return False
 
-def with_search_term(search_url: str, search_term: str) -> str:
+
+def resolve_selector(page, selectors: Iterable[str], timeout_ms: int = 5000, cache_key: str | None = None):
+    """Devolve (locator, seletor) do primeiro candidato visível, ou (None, None).
+
+    Todos os candidatos disputam ao mesmo tempo (um único wait sobre o locator
+    combinado com or_); quando mais de um está visível vale a ordem da lista.
+    Só elementos visíveis contam: um match oculto que vem antes no DOM (ex.: o
+    mesmo botão no menu mobile) não prende a espera. O vencedor fica salvo por cache_key e é tentado primeiro na próxima vez.
+    """
+    with span("selector", cache_key=cache_key or ""):
+        selectors = list(dict.fromkeys(selectors))
+
+        cached = _load_selector_cache().get(cache_key) if cache_key else None
+        if cached:
+            try:
+                locator = _selector_locator(page, cached).filter(visible=True).first
+                locator.wait_for(state="visible", timeout=CACHED_SELECTOR_TIMEOUT_MS)
+                log(f"Selector from cache: {cached}", logging.DEBUG)
+                return locator, cached
+            except Exception:
+                log(f"Cached selector failed: {cached}", logging.DEBUG)
+
+        candidates = [(sel, _selector_locator(page, sel)) for sel in selectors]
+        for attempt in range(2):
+            if not candidates:
+                break
+            log(f"Racing {len(candidates)} selectors", logging.DEBUG)
+            combined = candidates[0][1]
+            for _, locator in candidates[1:]:
+                combined = combined.or_(locator)
+            try:
+                combined.filter(visible=True).first.wait_for(state="visible", timeout=timeout_ms)
+                break
+            except PlaywrightTimeoutError:
+                log(f"No selector visible after {timeout_ms} ms")
+                return None, None
+            except Exception as e:
+                # Um seletor inválido (ex.: vindo do config) derruba a disputa inteira; tenta sem ele
+                log(f"Selector race failed: {e}")
+                if attempt:
+                    return None, None
+                candidates = [(sel, locator) for sel, locator in candidates if _selector_is_valid(locator)]
+
+        for sel, locator in candidates:
+            try:
+                visivel = locator.filter(visible=True).first
+                if visivel.is_visible():
+                    _remember_selector(cache_key, sel)
+                    return visivel, sel
+            except Exception:
+                continue
+        return None, None
+
+
+def try_selectors(
+    page,
+    selectors: Iterable[str],
+    fill_value: str | None = None,
+    click: bool = False,
+    timeout_ms: int = 5000,
+    cache_key: str | None = None,
+) -> tuple[bool, str | None]:
+    locator, sel = resolve_selector(page, selectors, timeout_ms=timeout_ms, cache_key=cache_key)
+    if locator is None:
+        log("No selector matched from provided list.")
+        return False, None
+
+    try:
+        if fill_value is not None:
+            locator.fill(fill_value)
+            log(f"Filled selector: {sel}")
+        if click:
+            locator.click()
+            log(f"Clicked selector: {sel}")
+    except Exception as e:
+        log(f"Selector failed: {sel} -> {e}")
+        _remember_selector(cache_key, None)
+        return False, None
+
+    log(f"Selector succeeded: {sel}")
+    return True, sel
+
+
+def with_query_params(search_url: str, params: dict[str, str | int]) -> str:
+    """Troca (ou acrescenta) parâmetros da query mantendo a ordem e os filtros existentes."""
     parts = urlsplit(search_url)
     query_pairs = parse_qsl(parts.query, keep_blank_values=True)
 
-    replaced = False
+    pending = dict(params)
     new_pairs: list[tuple[str, str]] = []
     for key, value in query_pairs:
-        if key == "q" and not replaced:
-            new_pairs.append((key, search_term))
-            replaced = True
+        if key in pending:
+            new_pairs.append((key, str(pending.pop(key))))
         else:
             new_pairs.append((key, value))
 
-    if not replaced:
-        new_pairs.append(("q", search_term))
+    new_pairs.extend((key, str(value)) for key, value in pending.items())
 
     new_query = urlencode(new_pairs, doseq=True, safe="[]")
     return urlunsplit((parts.scheme, parts.netloc, parts.path, new_query, parts.fragment))
 
 
-def main():
-    ensure_default_config_file()
-    creds = load_creds()
-    url = creds.get("url")
-    username = creds.get("username")
-    password = creds.get("password")
-    search_url = creds.get("search_url")
-    search_term = str(creds.get("search_term", "")).strip()
-    num_candidatos = int(creds.get("num_candidatos", 10))
-    headless = bool(creds.get("headless", True))
+def with_search_term(search_url: str, search_term: str) -> str:
+    return with_query_params(search_url, {"q": search_term})
+
+
+def sorts_via_url(creds: dict) -> bool:
+    """A ordenação vem dos sort_params na URL só com url_navigation; senão é pelo menu."""
+    return bool(creds.get("url_navigation", False)) and bool(creds.get("sort_params"))
 
-    if not url:
-        raise ValueError("Arquivo de configuração deve conter 'url' com a página de login.")
-    if not username or not password:
-        raise ValueError("Arquivo de configuração deve conter 'username' e 'password'.")
-    if not search_url:
-        raise ValueError("Arquivo de configuração deve conter 'search_url' com a página de busca.")
-    if num_candidatos <= 0:
-        raise ValueError("'num_candidatos' deve ser um número maior que 0.")
 
+def build_search_url(search_url: str, search_term: str, creds: dict) -> str:
+    """URL da busca com o termo (q) e, quando a ordenação é pela URL, os sort_params."""
     if search_term:
         search_url = with_search_term(search_url, search_term)
-        log(f"Termo de busca aplicado (q): {search_term}")
+    if sorts_via_url(creds):
+        search_url = with_query_params(search_url, creds["sort_params"])
+    return search_url
 
-    username_selectors = [
-        "xpath=/html/body/div[3]/div/main/div/div/div/div/article/div[1]/form/div[1]/div/input",
-        "input[type=\"email\"]",
-        "input[name*=\"email\"]",
-        "input[name*=\"user\"]",
-        "input[placeholder*=\"email\"]",
-        "label=E-mail",
-        "label=Email",
-        "xpath=//input[@type=\"email\"]",
-        "xpath=//input[contains(@name, 'email')]",
-    ]
 
-    password_selectors = [
-        "xpath=/html/body/div[3]/div/main/div/div/div/div/article/div[1]/form/div[2]/div/input",
-        "input[type=\"password\"]",
-        "input[name*=\"pass\"]",
-        "input[placeholder*=\"senha\"]",
-        "label=Senha",
-        "xpath=//input[@type=\"password\"]",
-        "xpath=//input[contains(@name, 'pass')]",
-    ]
+def query_param(url: str, key: str) -> str | None:
+    for k, value in parse_qsl(urlsplit(url).query, keep_blank_values=True):
+        if k == key:
+            return value
+    return None
 
-    submit_selectors = [
-        "xpath=/html/body/div[3]/div/main/div/div/div/div/article/div[1]/form/button",
-        "button[type=\"submit\"]",
-        "button:has-text(\"Entrar\")",
-        "button:has-text(\"Login\")",
-        "xpath=//button[contains(., 'Entrar') or contains(., 'Login')]",
-    ]
+
+def start_prefetch(tab, url: str, pacer: "RateController | None" = None) -> None:
+    """Dispara a navegação da aba de pré-carregamento sem esperar a página carregar."""
+    try:
+        if pacer is not None:
+            pacer.wait("navigate")
+        tab.goto(url, wait_until="commit", timeout=30000)
+        log(f"Pré-carregando: {url}")
+    except Exception as e:
+        log(f"Pré-carregamento falhou ({url}): {e}")
+
+
+def finish_prefetch(tab, timeout_ms: int = 10000, pacer: "RateController | None" = None) -> bool:
+    """Espera a aba pré-carregada mostrar os cards; False se a página não tiver resultados.
+
+    Para o RateController a latência é só o que ainda faltou esperar aqui.
+    """
+    inicio = time.perf_counter()
+    try:
+        tab.wait_for_selector('article', timeout=timeout_ms)
+        ok = True
+    except Exception:
+        ok = False
+    if pacer is not None:
+        blocked = page_is_blocked(tab)
+        if ok or blocked:
+            pacer.record("navigate", (time.perf_counter() - inicio) * 1000, blocked=blocked)
+    return ok
+
+
+# Extrai todos os cards da página em uma única chamada ao browser. Cada item
+# retorna {idx, ok, is_candidate, nome, href, info_basica, has_phone, has_email,
+# atualizado};
+# artigos que lançarem erro voltam com ok=false e são tratados pelo fallback.
+EXTRACT_ARTICLES_JS = r"""
+(articles) => articles.map((art, idx) => {
+    try {
+        const link = art.querySelector('h2 a');
+        if (!link) {
+            return { idx, ok: true, is_candidate: false };
+        }
+
+        let info = art.querySelector('p.sc-eZkCL') || art.querySelector('p[class*="sc-eZkCL"]');
+        if (!info) {
+            const anos = /\d+ anos/;
+            const matches = Array.from(art.querySelectorAll('*')).filter((el) => anos.test(el.innerText || ''));
+            info = matches.find((el) => !Array.from(el.children).some((c) => anos.test(c.innerText || ''))) || null;
+        }
+
+        const hasButton = (text) => Array.from(art.querySelectorAll('button'))
+            .some((b) => (b.innerText || '').toLowerCase().includes(text));
+        const atualizado = (art.innerText || '').match(/atualizad[oa][^\n]{0,40}/i);
+
+        return {
+            idx,
+            ok: true,
+            is_candidate: true,
+            nome: (link.innerText || '').trim(),
+            href: (link.getAttribute('href') || '').trim(),
+            info_basica: info ? (info.innerText || '').trim() : '',
+            has_phone: hasButton('ver telefone'),
+            has_email: hasButton('ver e-mail'),
+            atualizado: atualizado ? atualizado[0].trim() : '',
+        };
+    } catch (e) {
+        return { idx, ok: false, error: String(e) };
+    }
+})
+"""
+
+
+def extract_page_records(page) -> list[dict]:
+    try:
+        return page.eval_on_selector_all("article", EXTRACT_ARTICLES_JS)
+    except Exception as e:
+        log(f"Extração em lote falhou, usando seletores individuais: {e}")
+        total = page.locator("article").count()
+        return [{"idx": idx, "ok": False} for idx in range(total)]
+
+
+def _update_snippet_text(texto: str) -> str:
+    m = re.search(r"atualizad[oa][^\n]{0,40}", texto or "", re.I)
+    return m.group(0).strip() if m else ""
+
+
+def _update_snippet(curriculo) -> str:
+    try:
+        return _update_snippet_text(curriculo.inner_text())
+    except Exception:
+        return ""
+
+
+def extract_article_fallback(curriculo, idx: int) -> dict:
+    """Extrai um card pelo caminho antigo (um locator por campo)."""
+    record = {"idx": idx, "ok": True, "is_candidate": False}
+
+    if curriculo.locator('h2 a').count() == 0:
+        return record
+
+    try:
+        nome = curriculo.locator('h2 a').inner_text().strip()
+    except Exception:
+        return record
+
+    href = ""
+    try:
+        href = (curriculo.locator('h2 a').get_attribute('href') or '').strip()
+    except Exception:
+        href = ""
+
+    info_basica = ""
+    try:
+        # Primeiro tentar o seletor original
+        info_elem = curriculo.locator('p.sc-eZkCL')
+        if info_elem.count() > 0:
+            info_basica = info_elem.inner_text().strip()
+        else:
+            # Tentar xpath
+            info_elem = curriculo.locator('xpath=.//p[contains(@class, "sc-eZkCL")]')
+            if info_elem.count() > 0:
+                info_basica = info_elem.inner_text().strip()
+            else:
+                # Tentar procurar por texto que contenha "anos"
+                info_elem = curriculo.locator('text=/\\d+ anos/').first
+                if info_elem.count() > 0:
+                    info_basica = info_elem.inner_text().strip()
+    except Exception as e:
+        log(f"Erro info_basica {nome}: {e}")
+
+    record.update({
+        "is_candidate": True,
+        "nome": nome,
+        "href": href,
+        "info_basica": info_basica,
+        "has_phone": curriculo.locator('button:has-text("Ver telefone")').count() > 0,
+        "has_email": curriculo.locator('button:has-text("Ver e-mail")').count() > 0,
+        "atualizado": _update_snippet(curriculo),
+    })
+    return record
+
+
+PHONE_PATTERN = r"\(\d{2}\) \d{4,5}-\d{4}"
+EMAIL_PATTERN = r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}"
+
+# Resolve assim que o contato aparece: primeiro dentro do próprio artigo; se o site
+# renderizar fora do card (popover), só aceita um match novo na página, nunca um
+# contato que já estava visível de outro candidato.
+REVEAL_WAIT_JS = r"""
+({ idx, pattern, before }) => {
+    const art = document.querySelectorAll('article')[idx];
+    const local = art ? (art.innerText || '').match(new RegExp(pattern)) : null;
+    if (local) {
+        return { scope: 'article', value: local[0] };
+    }
+    const all = (document.body.innerText || '').match(new RegExp(pattern, 'g')) || [];
+    if (all.length > before) {
+        return { scope: 'page', value: all[all.length - 1] };
+    }
+    return null;
+}
+"""
+
+COUNT_MATCHES_JS = "(pattern) => ((document.body.innerText || '').match(new RegExp(pattern, 'g')) || []).length"
+
+
+def reveal_contact(
+    page,
+    curriculo,
+    idx: int,
+    button_text: str,
+    pattern: str,
+    timeout_ms: int,
+    capture: "NetworkCapture | None" = None,
+    field: str = "",
+) -> tuple[str, float | None]:
+    """Clica no botão de revelar e espera o contato aparecer.
+
+    Com captura de rede ativa, o valor vem do JSON do endpoint de revelação e o
+    DOM só é consultado se a resposta não trouxer o contato.
+    Retorna (valor, latência em ms); em timeout retorna ("", None).
+    """
+    before = page.evaluate(COUNT_MATCHES_JS, pattern)
+    start = time.perf_counter()
+    button = curriculo.locator(f'button:has-text("{button_text}")')
+    if capture is not None:
+        value = capture.reveal_via_network(page, button, field, timeout_ms)
+        if value:
+            return value, (time.perf_counter() - start) * 1000
+    else:
+        button.click()
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    try:
+        handle = page.wait_for_function(
+            REVEAL_WAIT_JS,
+            arg={"idx": idx, "pattern": pattern, "before": before},
+            timeout=max(timeout_ms - elapsed_ms, 1),
+        )
+    except Exception:
+        return "", None
+    result = handle.json_value()
+    return result["value"].strip(), (time.perf_counter() - start) * 1000
+
+
+# Modo "network_capture": em vez de depender das classes styled-components do
+# card, lê os JSON que o próprio site baixa (listagem e revelação de contato).
+# As chaves abaixo são as procuradas nos payloads e podem ser sobrescritas por
+# "network_capture_fields" no config; os padrões de URL por "network_capture_patterns".
+CAPTURE_FIELD_KEYS = {
+    "nome": ["nome", "name", "nomeCompleto"],
+    "href": ["url", "link", "href", "urlCurriculo", "perfilUrl"],
+    "id": ["id", "curriculoId", "candidatoId"],
+    "idade": ["idade", "age"],
+    "cidade": ["cidade", "city"],
+    "estado": ["uf", "estado", "state"],
+    "telefone": ["telefone", "celular", "phone"],
+    "email": ["email", "e-mail", "mail"],
+    "atualizado": ["dataAtualizacao", "atualizadoEm", "updatedAt", "dataUltimaAtualizacao"],
+}
+
+CAPTURE_URL_PATTERNS = {
+    "reveal": ["telefone", "phone", "email", "contato", "contact"],
+    "search": ["curriculos/busca", "search", "curriculos"],
+}
+
+# A busca também chega no HTML do documento (__NEXT_DATA__); a revelação só por XHR/fetch
+CAPTURE_RESOURCE_TYPES = {
+    "reveal": ("xhr", "fetch"),
+    "search": ("xhr", "fetch", "document"),
+}
+
+NEXT_DATA_RE = re.compile(r'<script[^>]+id="__NEXT_DATA__"[^>]*>(.*?)</script>', re.S)
+
+
+def _first_value(item: dict, keys: Iterable[str]) -> str:
+    for key in keys:
+        value = item.get(key)
+        if value not in (None, "") and not isinstance(value, (dict, list)):
+            return str(value).strip()
+    return ""
+
+
+def _href_key(href: str) -> str:
+    return urlsplit(href).path.rstrip("/")
+
+
+def candidate_from_json(item: dict, field_keys: dict = CAPTURE_FIELD_KEYS) -> dict:
+    idade = _first_value(item, field_keys["idade"])
+    if idade.isdigit():
+        idade = f"{idade} anos"
+    local = " - ".join(v for v in (_first_value(item, field_keys["cidade"]), _first_value(item, field_keys["estado"])) if v)
+    contatos = find_contacts(item, field_keys)
+    return {
+        "nome": _first_value(item, field_keys["nome"]),
+        "href": _first_value(item, field_keys["href"]),
+        "id": _first_value(item, field_keys["id"]),
+        "info_basica": ", ".join(v for v in (idade, local) if v),
+        "telefone": contatos["telefone"],
+        "email": contatos["email"],
+        "atualizado": _first_value(item, field_keys["atualizado"]),
+    }
+
+
+def find_candidate_dicts(payload, field_keys: dict = CAPTURE_FIELD_KEYS) -> list[dict]:
+    """Percorre o JSON e devolve, em ordem, os objetos que parecem um candidato (nome + link ou id)."""
+    found = []
+    stack = [payload]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            nome = _first_value(node, field_keys["nome"])
+            ref = _first_value(node, field_keys["href"]) or _first_value(node, field_keys["id"])
+            if nome and ref:
+                found.append(candidate_from_json(node, field_keys))
+                continue
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+    return found
+
+
+def find_contacts(payload, field_keys: dict = CAPTURE_FIELD_KEYS) -> dict:
+    """Procura telefone e e-mail em qualquer nível do JSON (pelas chaves ou pelo formato)."""
+    contatos = {"telefone": "", "email": ""}
+    stack = [payload]
+    while stack and not (contatos["telefone"] and contatos["email"]):
+        node = stack.pop()
+        if isinstance(node, dict):
+            for campo in ("telefone", "email"):
+                if not contatos[campo]:
+                    contatos[campo] = _first_value(node, field_keys[campo])
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+        elif isinstance(node, str):
+            if not contatos["telefone"] and (m := re.search(PHONE_PATTERN, node)):
+                contatos["telefone"] = m.group(0)
+            if not contatos["email"] and (m := re.search(EMAIL_PATTERN, node)):
+                contatos["email"] = m.group(0)
+    return contatos
+
+
+class NetworkCapture:
+    """Indexa os candidatos vindos das respostas de rede da busca e lê os contatos revelados."""
+
+    def __init__(self, patterns: dict | None = None, field_keys: dict | None = None, dump_file: Path | None = None):
+        self.patterns = {**CAPTURE_URL_PATTERNS, **(patterns or {})}
+        self.field_keys = {**CAPTURE_FIELD_KEYS, **(field_keys or {})}
+        self.dump_file = dump_file
+        self.by_path: dict[str, dict] = {}
+        self.by_id: dict[str, dict] = {}
+        self._pending: list = []
+        if dump_file is not None:
+            dump_file.parent.mkdir(parents=True, exist_ok=True)
+            dump_file.write_text("", encoding="utf-8")
+
+    def attach(self, page) -> None:
+        page.on("response", self._on_response)
+
+    def _kind(self, url: str, resource_type: str = "xhr") -> str | None:
+        """'reveal', 'search' ou None pelos segmentos do caminho da URL (não pela query nem por substring)."""
+        segmentos = [s for s in urlsplit(url).path.lower().split("/") if s]
+        palavras = [set(re.split(r"[-_.]", s)) | {s} for s in segmentos]
+        for kind in ("reveal", "search"):
+            if resource_type not in CAPTURE_RESOURCE_TYPES[kind]:
+                continue
+            for pattern in self.patterns.get(kind, []):
+                partes = [p for p in pattern.lower().split("/") if p]
+                if partes and any(
+                    all(parte in palavras[i + j] for j, parte in enumerate(partes))
+                    for i in range(len(segmentos) - len(partes) + 1)
+                ):
+                    return kind
+        return None
+
+    def _response_kind(self, response) -> str | None:
+        try:
+            return self._kind(response.url, response.request.resource_type)
+        except Exception:
+            return None
+
+    def _on_response(self, response) -> None:
+        # Só enfileira: o corpo é lido em drain(), fora do callback do Playwright
+        if self._response_kind(response) == "search":
+            self._pending.append(response)
+
+    def read_json(self, response):
+        try:
+            content_type = response.headers.get("content-type") or ""
+            if "json" in content_type:
+                return response.json()
+            if "html" in content_type:
+                m = NEXT_DATA_RE.search(response.text())
+                return json.loads(m.group(1)) if m else None
+        except Exception:
+            return None
+        return None
+
+    def _dump(self, kind: str, url: str, payload) -> None:
+        if self.dump_file is None:
+            return
+        try:
+            with self.dump_file.open("a", encoding="utf-8") as f:
+                f.write(json.dumps({"kind": kind, "url": url, "payload": payload}, ensure_ascii=False) + "\n")
+        except Exception:
+            pass
+
+    def drain(self) -> int:
+        """Lê as respostas de busca pendentes e indexa os candidatos. Retorna quantos entraram no índice."""
+        pending, self._pending = self._pending, []
+        novos = 0
+        for response in pending:
+            payload = self.read_json(response)
+            if payload is None:
+                continue
+            self._dump("search", response.url, payload)
+            for cand in find_candidate_dicts(payload, self.field_keys):
+                if cand["href"]:
+                    self.by_path[_href_key(cand["href"])] = cand
+                if cand["id"]:
+                    self.by_id[cand["id"]] = cand
+                novos += 1
+        return novos
+
+    def lookup(self, href: str) -> dict | None:
+        if not href:
+            return None
+        path = _href_key(href)
+        if path in self.by_path:
+            return self.by_path[path]
+        for segment in path.split("/"):
+            if segment and segment in self.by_id:
+                return self.by_id[segment]
+        return None
+
+    def reveal_via_network(self, page, button, field: str, timeout_ms: int) -> str:
+        """Clica no botão esperando a resposta do endpoint de revelação; devolve o contato do JSON."""
+        try:
+            with page.expect_response(lambda r: self._response_kind(r) == "reveal", timeout=timeout_ms) as info:
+                button.click()
+        except Exception:
+            return ""
+        payload = self.read_json(info.value)
+        if payload is None:
+            return ""
+        self._dump("reveal", info.value.url, payload)
+        return find_contacts(payload, self.field_keys).get(field, "")
+
+
+def merge_capture_record(registro: dict, capturado: dict | None) -> dict:
+    """Campos vindos da rede têm prioridade; o DOM preenche o que faltar."""
+    if not capturado:
+        return registro
+    merged = dict(registro)
+    for campo in ("nome", "info_basica", "telefone", "email", "atualizado"):
+        if capturado.get(campo):
+            merged[campo] = capturado[campo]
+    return merged
+
+
+def reveal_and_store(
+    page,
+    curriculo,
+    registro: dict,
+    chave: str,
+    conhecido: dict | None,
+    stream: "ResultStream",
+    index: "CandidateIndex | None",
+    capture: "NetworkCapture | None",
+    reveal_timeout_ms: int,
+    latencias: list[float],
+    pacer: "RateController | None" = None,
+) -> dict:
+    """Revela telefone/e-mail de um card (se ainda não conhecidos) e grava o currículo."""
+    idx = registro["idx"]
+    nome = registro["nome"]
+    href = registro.get("href", "")
+
+    if conhecido:
+        # Contato revelado numa execução anterior (dentro do TTL)
+        registro = merge_capture_record(registro, {"telefone": conhecido["telefone"], "email": conhecido["email"]})
+        index.reused += 1
+        log(f"{nome} já conhecido; revelação pulada", logging.DEBUG)
+
+    # Tentar coletar telefone
+    telefone = registro.get("telefone", "")
+    try:
+        if not conhecido and not telefone and registro.get("has_phone"):
+            if pacer is not None:
+                pacer.wait("reveal")
+            with span("reveal_phone"):
+                telefone, latencia = reveal_contact(
+                    page, curriculo, idx, "Ver telefone", PHONE_PATTERN, reveal_timeout_ms, capture, "telefone"
+                )
+            if pacer is not None:
+                pacer.record("reveal", latencia)
+            _log_reveal("Telefone", nome, latencia, reveal_timeout_ms, latencias)
+    except Exception as e:
+        log(f"Erro telefone {nome}: {e}")
+
+    # Tentar coletar email
+    email = registro.get("email", "")
+    try:
+        if not conhecido and not email and registro.get("has_email"):
+            if pacer is not None:
+                pacer.wait("reveal")
+            with span("reveal_email"):
+                email, latencia = reveal_contact(
+                    page, curriculo, idx, "Ver e-mail", EMAIL_PATTERN, reveal_timeout_ms, capture, "email"
+                )
+            if pacer is not None:
+                pacer.record("reveal", latencia)
+            _log_reveal("E-mail", nome, latencia, reveal_timeout_ms, latencias)
+    except Exception as e:
+        log(f"Erro email {nome}: {e}")
+
+    novo = candidate_record(registro, telefone, email)
+    stream.vistos.add(chave)
+    stream.append(novo, chave)
+    if index is not None:
+        index.record(href, novo, revealed=bool(not conhecido and (telefone or email)))
+    log(f"Currículo {stream.count}: {nome}")
+    return novo
+
+
+_AGE_RE = re.compile(r"(\d{1,2})\s+anos", re.I)
+
+
+def _normalize(texto: str) -> str:
+    sem_acento = unicodedata.normalize("NFKD", texto or "").encode("ascii", "ignore").decode("ascii")
+    return sem_acento.lower()
+
+
+def rank_candidates(candidatos: list[dict], ranking: dict) -> list[dict]:
+    """Filtra e ordena os candidatos da fase 1 (lista barata) antes de revelar contatos.
+
+    `ranking` aceita idade_min/idade_max (idade lida de info_basica; quem não
+    tem idade visível passa), cidades (info_basica precisa citar uma delas) e
+    palavras_chave (+1 ponto por palavra encontrada em nome/info_basica). Empates
+    mantêm a ordem da lista, ou seja, a de atualização mais recente.
+    """
+    idade_min = ranking.get("idade_min")
+    idade_max = ranking.get("idade_max")
+    cidades = [_normalize(c) for c in ranking.get("cidades") or []]
+    palavras = [_normalize(p) for p in ranking.get("palavras_chave") or []]
+
+    pontuados = []
+    for ordem, candidato in enumerate(candidatos):
+        info = _normalize(candidato.get("info_basica", ""))
+        if m := _AGE_RE.search(info):
+            idade = int(m.group(1))
+            if idade_min is not None and idade < idade_min:
+                continue
+            if idade_max is not None and idade > idade_max:
+                continue
+        if cidades and not any(c in info for c in cidades):
+            continue
+        texto = f"{_normalize(candidato.get('nome', ''))} {info}"
+        pontos = sum(1 for p in palavras if p in texto)
+        pontuados.append((-pontos, ordem, candidato))
+
+    pontuados.sort(key=lambda item: item[:2])
+    return [candidato for _, _, candidato in pontuados]
+
+
+def candidate_record(registro: dict, telefone: str, email: str, **extra) -> dict:
+    """Currículo gravado no JSONL a partir do registro extraído do card."""
+    return {
+        'nome': registro["nome"],
+        'info_basica': registro.get("info_basica", ""),
+        'telefone': telefone,
+        'email': email,
+        'href': registro.get("href", ""),
+        **extra,
+    }
+
+
+def _log_reveal(label: str, nome: str, latencia: float | None, timeout_ms: int, latencias: list[float]) -> None:
+    if latencia is None:
+        log(f"{label} de {nome} não apareceu em {timeout_ms} ms")
+        return
+    latencias.append(latencia)
+    log(f"{label} de {nome} revelado em {latencia:.0f} ms", logging.DEBUG)
+
+
+def log_reveal_summary(latencias: list[float], prefixo: str = "") -> None:
+    if latencias:
+        log(
+            f"{prefixo}Revelações de contato: {len(latencias)}, "
+            f"média {sum(latencias) / len(latencias):.0f} ms, "
+            f"máx {max(latencias):.0f} ms"
+        )
+
+
+SORT_BUTTON_SELECTORS = [
+    'button[aria-label="open menu"]',
+    '.Dropdown__DropInput-sc-xoew8d-0',
+    'button:has-text("Relevância")',
+    '#dropdown-204762'
+]
+
+SORT_OPTION_SELECTORS = [
+    'text=Data de Atualização',
+    'text=/Data de Atualização/',
+    'li:has-text("Data de Atualização")',
+    'button:has-text("Data de Atualização")'
+]
+
+NEXT_PAGE_SELECTORS = [
+    'a[rel="next"]',
+    'button:has-text("Próxima")',
+    'a:has-text("Próxima")',
+    'button[aria-label*="Próxima"]',
+    'a[aria-label*="Próxima"]',
+]
+
+
+def sort_by_update_date(page) -> bool:
+    """Ordena a lista por Data de Atualização pelo menu; False se não conseguiu."""
+    try:
+        log("Ordenando por Data de Atualização...")
+        # Clicar no botão de ordenação (Relevância)
+        sort_button, sort_sel = resolve_selector(page, SORT_BUTTON_SELECTORS, timeout_ms=3000, cache_key="sort_button")
+        if sort_button:
+            log(f"Botão de ordenação encontrado com seletor: {sort_sel}")
+            sort_button.click()
+
+            # Selecionar "Data de Atualização" (a disputa de seletores já espera o menu abrir)
+            option_found, opt_sel = try_selectors(page, SORT_OPTION_SELECTORS, click=True, timeout_ms=3000, cache_key="sort_option")
+            if option_found:
+                log(f"Opção 'Data de Atualização' selecionada com seletor: {opt_sel}")
+                # Aguardar a página recarregar com a nova ordenação (pode ser AJAX)
+                try:
+                    page.wait_for_load_state('networkidle', timeout=5000)
+                except Exception:
+                    log("Página não recarregou completamente, mas ordenação pode ter sido aplicada via AJAX")
+                log("Ordenação por Data de Atualização aplicada com sucesso!")
+                return True
+            log("Opção 'Data de Atualização' não encontrada, continuando sem ordenação")
+        else:
+            log("Botão de ordenação não encontrado, continuando sem ordenação")
+
+    except Exception as e:
+        log(f"Erro ao ordenar por Data de Atualização: {e}")
+    return False
+
+
+DELTA_UNSORTED_MSG = "Modo delta desligado nesta execução: sem a ordenação por data a marca d'água não vale"
+
+
+USERNAME_SELECTORS = [
+    "xpath=/html/body/div[3]/div/main/div/div/div/div/article/div[1]/form/div[1]/div/input",
+    "input[type=\"email\"]",
+    "input[name*=\"email\"]",
+    "input[name*=\"user\"]",
+    "input[placeholder*=\"email\"]",
+    "label=E-mail",
+    "label=Email",
+    "xpath=//input[@type=\"email\"]",
+    "xpath=//input[contains(@name, 'email')]",
+]
+
+PASSWORD_SELECTORS = [
+    "xpath=/html/body/div[3]/div/main/div/div/div/div/article/div[1]/form/div[2]/div/input",
+    "input[type=\"password\"]",
+    "input[name*=\"pass\"]",
+    "input[placeholder*=\"senha\"]",
+    "label=Senha",
+    "xpath=//input[@type=\"password\"]",
+    "xpath=//input[contains(@name, 'pass')]",
+]
+
+SUBMIT_SELECTORS = [
+    "xpath=/html/body/div[3]/div/main/div/div/div/div/article/div[1]/form/button",
+    "button[type=\"submit\"]",
+    "button:has-text(\"Entrar\")",
+    "button:has-text(\"Login\")",
+    "xpath=//button[contains(., 'Entrar') or contains(., 'Login')]",
+]
+
+
+def login_selectors(creds: dict) -> tuple[list[str], list[str], list[str]]:
+    """Seletores de login, com os do config (se houver) tentados antes dos padrões."""
+    username_selectors = list(USERNAME_SELECTORS)
+    password_selectors = list(PASSWORD_SELECTORS)
+    submit_selectors = list(SUBMIT_SELECTORS)
 
     if isinstance(creds.get("username_selector"), list):
         username_selectors = creds.get("username_selector") + username_selectors
@@ -203,148 +1170,1341 @@ def main():
     if isinstance(creds.get("submit_selector"), list):
         submit_selectors = creds.get("submit_selector") + submit_selectors
 
-    configure_playwright_browsers_path()
+    return username_selectors, password_selectors, submit_selectors
+
+
+SESSION_FILE = APP_ROOT / "output" / "session" / "storage_state.json"
+
+
+def login(
+    page,
+    url: str,
+    username: str,
+    password: str,
+    username_selectors: list[str],
+    password_selectors: list[str],
+    submit_selectors: list[str],
+) -> bool:
+    page.goto(url)
+    try:
+        page.wait_for_load_state('domcontentloaded', timeout=6000)
+    except Exception:
+        pass
+
+    # Tentativa rápida de aguardar requisições principais assentarem (sem atrasar muito)
+    try:
+        page.wait_for_load_state('networkidle', timeout=2000)
+    except Exception:
+        pass
+
+    ok_user, user_sel = try_selectors(page, username_selectors, fill_value=username, cache_key="username")
+    ok_pass, pass_sel = try_selectors(page, password_selectors, fill_value=password, cache_key="password")
+    ok_submit, submit_sel = try_selectors(page, submit_selectors, click=True, cache_key="submit")
+
+    log(f"username filled: {ok_user} (selector: {user_sel})")
+    log(f"password filled: {ok_pass} (selector: {pass_sel})")
+    log(f"submit clicked: {ok_submit} (selector: {submit_sel})")
+
+    # Aguardar um tempo para a página processar o login
+    try:
+        page.wait_for_load_state('domcontentloaded', timeout=10000)
+    except Exception as e:
+        log(f"Wait for load state failed: {e}")
+
+    if not (ok_user and ok_pass and ok_submit):
+        try:
+            screenshot_dir = APP_ROOT / 'output' / 'screenshots'
+            screenshot_dir.mkdir(parents=True, exist_ok=True)
+            page.screenshot(path=str(screenshot_dir / 'playwright_debug.png'))
+        except Exception:
+            pass
+        return False
+
+    # Em vez de um sleep fixo, esperar o site sair da página de login
+    login_path = urlsplit(url).path
+    try:
+        page.wait_for_url(lambda u: urlsplit(u).path != login_path, timeout=10000)
+    except Exception:
+        log("Página de login não redirecionou em 10 s; seguindo mesmo assim")
+    return True
+
+
+def session_is_valid(page, search_url: str, check_selector: str | None = None) -> bool:
+    """Abre a busca com a sessão carregada e confere que o site não pediu login de novo."""
+    try:
+        page.goto(search_url, timeout=30000, wait_until='domcontentloaded')
+    except Exception as e:
+        log(f"Erro ao validar sessão salva: {e}")
+        return False
+
+    if "signin" in page.url.lower():
+        return False
+    try:
+        if page.locator('input[type="password"]').count() > 0:
+            return False
+        if check_selector:
+            page.locator(check_selector).first.wait_for(state="visible", timeout=5000)
+    except Exception:
+        return False
+    return True
+
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=headless, slow_mo=50)
-        page = browser.new_page()
+def write_storage_state(state: dict, state_file: Path = SESSION_FILE) -> None:
+    """Grava o storage_state num temporário e troca de uma vez: quem lê nunca vê o arquivo pela metade."""
+    state_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp = state_file.with_name(f"{state_file.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(state, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, state_file)
 
-        page.goto(url)
+
+def save_session(context, state_file: Path = SESSION_FILE) -> None:
+    try:
+        write_storage_state(context.storage_state(), state_file)
+        log(f"Sessão salva em {state_file}")
+    except Exception as e:
+        log(f"Não foi possível salvar a sessão: {e}")
+
+
+# Bloqueio de recursos: o scraper só precisa do texto e de alguns botões, então
+# imagens, mídia, fontes e scripts de anúncio/analytics não precisam ser baixados.
+BLOCKED_RESOURCE_TYPES = ["image", "media", "font"]
+
+BLOCKED_DOMAINS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "connect.facebook.net",
+    "hotjar.com",
+    "clarity.ms",
+    "criteo.com",
+    "criteo.net",
+    "nr-data.net",
+    "taboola.com",
+]
+
+# Tamanho médio observado por tipo de recurso (aprendido com o que carrega)
+# para estimar quantos bytes o bloqueio economizou.
+RESOURCE_SIZE_FILE = APP_ROOT / "output" / "cache" / "resource_sizes.json"
+
+# Estimativa inicial (bytes por requisição, ordem de grandeza de páginas web
+# comuns) para os tipos que ainda não foram vistos carregando: com o bloqueio
+# sempre ligado uma imagem bloqueada nunca chega a ser medida.
+DEFAULT_RESOURCE_SIZES = {
+    "image": 50_000,
+    "media": 500_000,
+    "font": 40_000,
+    "stylesheet": 30_000,
+    "script": 60_000,
+    "xhr": 5_000,
+    "fetch": 5_000,
+    "other": 10_000,
+}
+
+
+class ResourceBlocker:
+    """Filtro de requisições via route no contexto, com contagem do que foi bloqueado."""
+
+    def __init__(self, resource_types: Iterable[str] | None = None, domains: Iterable[str] | None = None):
+        self.resource_types = set(BLOCKED_RESOURCE_TYPES if resource_types is None else resource_types)
+        self.domains = [d.lower().lstrip(".") for d in (BLOCKED_DOMAINS if domains is None else domains)]
+        self.blocked: dict[str, int] = {}
+        self.loaded_bytes = 0
+        self.loaded_requests = 0
+        self._sizes = self._load_sizes()
+
+    @staticmethod
+    def _load_sizes() -> dict:
+        try:
+            return json.loads(RESOURCE_SIZE_FILE.read_text(encoding="utf-8"))
+        except Exception:
+            return {}
+
+    def should_block(self, resource_type: str, url: str) -> str | None:
+        """Motivo do bloqueio (tipo do recurso ou domínio), ou None para deixar passar."""
+        if resource_type in self.resource_types:
+            return resource_type
+        host = (urlsplit(url).hostname or "").lower()
+        for domain in self.domains:
+            if host == domain or host.endswith("." + domain):
+                return domain
+        return None
+
+    def _count(self, request) -> bool:
+        reason = self.should_block(request.resource_type, request.url)
+        if reason is None:
+            return False
+        key = f"{request.resource_type}:{reason}"
+        self.blocked[key] = self.blocked.get(key, 0) + 1
+        return True
+
+    def _handle(self, route) -> None:
+        if self._count(route.request):
+            route.abort()
+        else:
+            route.continue_()
+
+    async def _handle_async(self, route) -> None:
+        if self._count(route.request):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def _on_response(self, response) -> None:
         try:
-            page.wait_for_load_state('domcontentloaded', timeout=6000)
+            size = int(response.headers.get("content-length") or 0)
+        except ValueError:
+            size = 0
+        self.loaded_requests += 1
+        self.loaded_bytes += size
+        if size:
+            stats = self._sizes.setdefault(response.request.resource_type, {"count": 0, "bytes": 0})
+            stats["count"] += 1
+            stats["bytes"] += size
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.resource_types or self.domains)
+
+    def attach(self, context) -> None:
+        if self.enabled:
+            context.route("**/*", self._handle)
+        context.on("response", self._on_response)
+
+    async def attach_async(self, context) -> None:
+        if self.enabled:
+            await context.route("**/*", self._handle_async)
+        context.on("response", self._on_response)
+
+    def average_size(self, resource_type: str) -> tuple[int, str]:
+        """(bytes médios, origem): "learned" se já foi medido, senão "default"."""
+        stats = self._sizes.get(resource_type)
+        if stats and stats["count"]:
+            return stats["bytes"] // stats["count"], "learned"
+        return DEFAULT_RESOURCE_SIZES.get(resource_type, DEFAULT_RESOURCE_SIZES["other"]), "default"
+
+    def summary(self) -> dict:
+        saved_bytes = 0
+        estimates: dict[str, dict] = {}
+        for key, count in self.blocked.items():
+            resource_type = key.split(":", 1)[0]
+            media, origem = self.average_size(resource_type)
+            estimates[resource_type] = {"avg_bytes": media, "source": origem}
+            saved_bytes += count * media
+        return {
+            "enabled": self.enabled,
+            "blocked_requests": sum(self.blocked.values()),
+            "blocked_by_reason": dict(sorted(self.blocked.items(), key=lambda kv: -kv[1])),
+            "estimated_saved_bytes": saved_bytes,
+            "size_estimates": estimates,
+            "loaded_requests": self.loaded_requests,
+            "loaded_bytes": self.loaded_bytes,
+        }
+
+    def save_sizes(self) -> None:
+        try:
+            RESOURCE_SIZE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            RESOURCE_SIZE_FILE.write_text(json.dumps(self._sizes, indent=2), encoding="utf-8")
         except Exception:
             pass
 
-        # Tentativa rápida de aguardar requisições principais assentarem (sem atrasar muito)
+
+def resource_blocker(creds: dict) -> ResourceBlocker:
+    """ResourceBlocker do config; com block_resources desligado ele só observa os tamanhos."""
+    block_resources = bool(creds.get("block_resources", False))
+    return ResourceBlocker(
+        resource_types=creds.get("blocked_resource_types") if block_resources else [],
+        domains=creds.get("blocked_domains") if block_resources else [],
+    )
+
+
+def log_blocking_summary(blocker: ResourceBlocker) -> None:
+    resumo = blocker.summary()
+    motivos = ", ".join(f"{k} {v}" for k, v in list(resumo["blocked_by_reason"].items())[:6])
+    economia = resumo["estimated_saved_bytes"]
+    estimativa = f", ~{economia / 1_000_000:.1f} MB economizados (estimativa)" if economia else ""
+    log(
+        f"Bloqueio de recursos: {resumo['blocked_requests']} requisições bloqueadas{estimativa}; "
+        f"{resumo['loaded_requests']} carregadas ({resumo['loaded_bytes'] / 1_000_000:.1f} MB)"
+        + (f" [{motivos}]" if motivos else "")
+    )
+    blocker.save_sizes()
+
+
+# Sinais de que o site começou a barrar a coleta (URL, título ou corpo da página)
+BLOCK_MARKERS = ("captcha", "recaptcha", "hcaptcha", "acesso bloqueado", "acesso negado", "too many requests", "muitas requisições")
+
+PACING_KINDS = ("navigate", "reveal", "profile")
+
+
+def is_throttled(status: int | None) -> bool:
+    return status == 429 or (status or 0) >= 500
+
+
+def looks_blocked(*textos: str) -> bool:
+    """True se algum texto (URL, título...) tem cara de captcha ou página de bloqueio."""
+    return any(marker in (texto or "").lower() for texto in textos for marker in BLOCK_MARKERS)
+
+
+class _TokenBucket:
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def reserve(self, now: float) -> float:
+        """Pega uma ficha (o saldo pode ficar negativo) e devolve quantos segundos esperar por ela."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+
+# Segundo nível dos sufixos de país (catho.com.br, exemplo.co.uk)
+_SECOND_LEVEL_SUFFIXES = {"com", "net", "org", "gov", "edu", "co", "ac"}
+
+
+def site_domain(host: str) -> str:
+    """Domínio registrável do host: api.catho.com.br e www.catho.com.br viram catho.com.br."""
+    host = (host or "").lower().rstrip(".")
+    partes = host.split(".")
+    if len(partes) <= 2 or host.replace(".", "").isdigit():
+        return host
+    tamanho = 3 if len(partes[-1]) == 2 and partes[-2] in _SECOND_LEVEL_SUFFIXES else 2
+    return ".".join(partes[-tamanho:])
+
+
+class RateController:
+    """Ritmo central das navegações e revelações: token bucket por tipo, AIMD e backoff.
+
+    Cada tipo ("navigate", "reveal", "profile") tem uma taxa em ações/s. Resposta rápida soma
+    `increase` à taxa; resposta lenta (acima de `slow_ms`) multiplica por
+    `decrease`. HTTP 429/5xx ou página de captcha/bloqueio derrubam a taxa de todos
+    os tipos e pausam tudo por um backoff exponencial com jitter (ou pelo
+    Retry-After, se vier), que volta a zero no primeiro sucesso. Com `host`, só os
+    XHR do mesmo domínio (o da busca, subdomínios inclusos) contam; anúncios e
+    analytics de terceiros não.
+    """
+
+    def __init__(
+        self,
+        rates: dict[str, float] | None = None,
+        max_rates: dict[str, float] | None = None,
+        min_rate: float = 0.1,
+        burst: float = 2,
+        increase: float = 0.1,
+        decrease: float = 0.5,
+        slow_ms: float = 4000,
+        backoff_base_s: float = 2,
+        backoff_max_s: float = 120,
+        clock=time.monotonic,
+        sleep=time.sleep,
+        seed: int | None = None,
+        host: str | None = None,
+    ):
+        import random
+
+        rates = {"navigate": 0.5, "reveal": 2.0, "profile": 5.0, **(rates or {})}
+        self.max_rates = {"navigate": 2.0, "reveal": 10.0, "profile": 20.0, **(max_rates or {})}
+        self.min_rate = min_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.slow_ms = slow_ms
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+        self._clock = clock
+        self._sleep = sleep
+        self._rng = random.Random(seed)
+        self.domain = site_domain(host) if host else None
+        agora = clock()
+        self.buckets = {kind: _TokenBucket(rate, burst, agora) for kind, rate in rates.items()}
+        self.paused_until = 0.0
+        self.strikes = 0
+        self.waited_s = 0.0
+        self.penalties: dict[str, int] = {}
+
+    def delay(self, kind: str) -> float:
+        """Reserva a próxima ação do tipo e devolve quanto esperar antes dela (sem dormir)."""
+        agora = self._clock()
+        espera = self.buckets[kind].reserve(agora)
+        return max(espera, self.paused_until - agora)
+
+    def wait(self, kind: str) -> float:
+        espera = self.delay(kind)
+        if espera > 0:
+            self.waited_s += espera
+            with span("pacing_wait", kind=kind):
+                self._sleep(espera)
+        return espera
+
+    async def wait_async(self, kind: str) -> float:
+        import asyncio
+
+        espera = self.delay(kind)
+        if espera > 0:
+            self.waited_s += espera
+            with span("pacing_wait", kind=kind):
+                await asyncio.sleep(espera)
+        return espera
+
+    def record(
+        self,
+        kind: str,
+        latency_ms: float | None = None,
+        status: int | None = None,
+        blocked: bool = False,
+        retry_after: float | None = None,
+    ) -> None:
+        """Ajusta a taxa depois de uma ação; latency_ms None quer dizer timeout."""
+        if blocked or is_throttled(status):
+            self.penalize("bloqueio" if blocked else f"http_{status}", retry_after)
+            return
+        bucket = self.buckets[kind]
+        if latency_ms is None or latency_ms > self.slow_ms:
+            bucket.rate = max(self.min_rate, bucket.rate * self.decrease)
+            self.penalties["lento"] = self.penalties.get("lento", 0) + 1
+            return
+        bucket.rate = min(self.max_rates.get(kind, bucket.rate), bucket.rate + self.increase)
+        self.strikes = 0
+
+    def penalize(self, reason: str, retry_after: float | None = None) -> float:
+        """Derruba todas as taxas e pausa; devolve a pausa em segundos."""
+        self.strikes += 1
+        self.penalties[reason] = self.penalties.get(reason, 0) + 1
+        for bucket in self.buckets.values():
+            bucket.rate = max(self.min_rate, bucket.rate * self.decrease)
+        teto = min(self.backoff_max_s, self.backoff_base_s * 2 ** (self.strikes - 1))
+        # Metade fixa + metade aleatória: workers que levaram 429 juntos não voltam juntos
+        pausa = teto / 2 + self._rng.uniform(0, teto / 2)
+        if retry_after:
+            pausa = max(pausa, min(retry_after, self.backoff_max_s))
+        self.paused_until = max(self.paused_until, self._clock() + pausa)
+        log(f"Ritmo: {reason}; pausando {pausa:.1f} s e reduzindo para {self.rates_summary()}", logging.WARNING)
+        return pausa
+
+    def _on_response(self, response) -> None:
+        # Documentos já são avaliados em timed_goto; aqui entram os XHR (ex.: revelação)
         try:
-            page.wait_for_load_state('networkidle', timeout=2000)
+            if self.domain:
+                origem = (urlsplit(response.url).hostname or "").lower()
+                if origem != self.domain and not origem.endswith("." + self.domain):
+                    return
+            if response.request.resource_type in ("xhr", "fetch") and is_throttled(response.status):
+                self.penalize(f"http_{response.status}", retry_after_s(response))
         except Exception:
             pass
 
-        ok_user, user_sel = try_selectors(page, username_selectors, fill_value=username)
-        ok_pass, pass_sel = try_selectors(page, password_selectors, fill_value=password)
-        ok_submit, submit_sel = try_selectors(page, submit_selectors, click=True)
+    def attach(self, context) -> None:
+        """Observa os XHR do contexto (vale para a API sync e para a async)."""
+        context.on("response", self._on_response)
+
+    def rates_summary(self) -> str:
+        return ", ".join(f"{kind} {bucket.rate:.2f}/s" for kind, bucket in self.buckets.items())
+
+    def summary(self) -> dict:
+        return {
+            "rates_per_s": {kind: round(bucket.rate, 3) for kind, bucket in self.buckets.items()},
+            "waited_s": round(self.waited_s, 2),
+            "penalties": dict(self.penalties),
+        }
+
+
+def rate_controller(creds: dict, share: int = 1) -> RateController | None:
+    """RateController a partir de "pacing" no config; None se "enabled" for false.
+
+    Com `share` > 1 (vários processos contra o mesmo site) cada um fica com 1/share das taxas.
+    """
+    pacing = creds.get("pacing") or {}
+    if not pacing.get("enabled", True):
+        return None
+    pacer = RateController(
+        rates={kind: float(pacing[f"{kind}_per_s"]) for kind in PACING_KINDS if f"{kind}_per_s" in pacing},
+        max_rates={kind: float(pacing[f"max_{kind}_per_s"]) for kind in PACING_KINDS if f"max_{kind}_per_s" in pacing},
+        min_rate=float(pacing.get("min_per_s", 0.1)),
+        slow_ms=float(pacing.get("slow_ms", 4000)),
+        backoff_max_s=float(pacing.get("backoff_max_s", 120)),
+        host=urlsplit(creds.get("search_url") or creds.get("url") or "").hostname,
+    )
+    if share > 1:
+        for bucket in pacer.buckets.values():
+            bucket.rate /= share
+        pacer.max_rates = {kind: rate / share for kind, rate in pacer.max_rates.items()}
+        pacer.min_rate /= share
+    return pacer
+
+
+def page_is_blocked(page) -> bool:
+    try:
+        return looks_blocked(page.url, page.title())
+    except Exception:
+        return False
+
+
+def retry_after_s(response) -> float | None:
+    """Retry-After em segundos (só o formato numérico), ou None."""
+    try:
+        valor = (response.headers.get("retry-after") or "").strip()
+    except Exception:
+        return None
+    return float(valor) if valor.isdigit() else None
 
-        log(f"username filled: {ok_user} (selector: {user_sel})")
-        log(f"password filled: {ok_pass} (selector: {pass_sel})")
-        log(f"submit clicked: {ok_submit} (selector: {submit_sel})")
 
-        # Aguardar um tempo para a página processar o login
+def timed_goto(page, url: str, pacer: RateController | None, tentativas: int = 3, **kwargs):
+    """page.goto passando pelo RateController: espera a vez, mede e informa status/bloqueio.
+
+    Se o site responder 429/5xx ou mostrar captcha, tenta de novo depois do backoff.
+    """
+    if pacer is None:
+        return page.goto(url, **kwargs)
+    response = None
+    for tentativa in range(1, tentativas + 1):
+        pacer.wait("navigate")
+        inicio = time.perf_counter()
         try:
-            page.wait_for_load_state('domcontentloaded', timeout=10000)
-        except Exception as e:
-            log(f"Wait for load state failed: {e}")
+            response = page.goto(url, **kwargs)
+        except Exception:
+            pacer.record("navigate", None)
+            raise
+        status = response.status if response is not None else None
+        blocked = page_is_blocked(page)
+        pacer.record("navigate", (time.perf_counter() - inicio) * 1000, status, blocked, retry_after_s(response))
+        if not (blocked or is_throttled(status)):
+            break
+        log(f"Navegação para {url} barrada (status {status}, bloqueio {blocked}); tentativa {tentativa}/{tentativas}", logging.WARNING)
+    return response
+
+
+# Heap JS do renderer da aba; só o Chromium expõe performance.memory
+MEMORY_JS = "() => (performance.memory ? performance.memory.usedJSHeapSize : null)"
 
-        if not (ok_user and ok_pass and ok_submit):
+# Pontos da curva de memória que vão para o relatório
+MEMORY_TREND_POINTS = 50
+# Acima disso as amostras são rareadas pela metade (o daemon roda indefinidamente)
+MEMORY_SAMPLES_MAX = 5000
+
+
+def read_heap_bytes(page) -> int | None:
+    try:
+        return page.evaluate(MEMORY_JS)
+    except Exception:
+        return None
+
+
+class PageRecycler:
+    """Decide quando trocar aba/contexto numa execução longa e guarda a curva de memória.
+
+    A memória do renderer cresce a cada página e revelação; passado `every_pages`
+    páginas na mesma aba ou `max_heap_mb` de heap JS, quem chama abre uma aba (ou
+    contexto) nova com o mesmo storage_state e continua da mesma página.
+    0 desliga o respectivo limite.
+    """
+
+    def __init__(self, every_pages: int = 50, max_heap_mb: float = 512):
+        self.every_pages = every_pages
+        self.max_heap_mb = max_heap_mb
+        self.samples: list[dict] = []
+        self.pages = 0
+        self.recycles = 0
+        self._t0 = time.perf_counter()
+
+    def observe(self, pagina: int, heap_bytes: int | None, pages_since: int, busca: str = "") -> bool:
+        """Registra a memória depois de uma página; True se já passou da hora de reciclar."""
+        heap_mb = round(heap_bytes / 1_048_576, 1) if heap_bytes else None
+        amostra = {"t_s": round(time.perf_counter() - self._t0, 1), "pagina": pagina, "heap_mb": heap_mb}
+        if busca:
+            amostra["busca"] = busca
+        self.pages += 1
+        self.samples.append(amostra)
+        if len(self.samples) > MEMORY_SAMPLES_MAX:
+            self.samples = self._thin(2)
+        if self.every_pages and pages_since >= self.every_pages:
+            return True
+        return bool(self.max_heap_mb and heap_mb is not None and heap_mb >= self.max_heap_mb)
+
+    def recycled(self, pagina: int, busca: str = "") -> None:
+        self.recycles += 1
+        self.samples[-1]["recycled"] = True
+        heap_mb = self.samples[-1]["heap_mb"]
+        prefixo = f"[{busca}] " if busca else ""
+        log(f"{prefixo}Reciclagem na página {pagina}" + (f" (heap {heap_mb} MB)" if heap_mb is not None else ""))
+
+    def _thin(self, passo: int) -> list[dict]:
+        """Uma amostra a cada `passo`, sempre com as reciclagens e a última."""
+        ultimo = len(self.samples) - 1
+        return [s for i, s in enumerate(self.samples) if i % passo == 0 or s.get("recycled") or i == ultimo]
+
+    def summary(self) -> dict:
+        heaps = [s["heap_mb"] for s in self.samples if s["heap_mb"] is not None]
+        return {
+            "every_pages": self.every_pages,
+            "max_heap_mb": self.max_heap_mb,
+            "recycles": self.recycles,
+            "pages": self.pages,
+            "heap_mb_first": heaps[0] if heaps else None,
+            "heap_mb_last": heaps[-1] if heaps else None,
+            "heap_mb_peak": max(heaps) if heaps else None,
+            "trend": self._thin(max(1, math.ceil(len(self.samples) / MEMORY_TREND_POINTS))),
+        }
+
+
+def page_recycler(creds: dict) -> PageRecycler | None:
+    """PageRecycler a partir de "recycle" no config; None com os dois limites em 0."""
+    recycle = creds.get("recycle") or {}
+    every_pages = int(recycle.get("every_pages", 50))
+    max_heap_mb = float(recycle.get("max_heap_mb", 512))
+    if not every_pages and not max_heap_mb:
+        return None
+    return PageRecycler(every_pages, max_heap_mb)
+
+
+OUTPUT_DIR = APP_ROOT / "output" / "candidates"
+
+OUTPUT_FIELDS = ['nome', 'info_basica', 'telefone', 'email']
+
+EXPORT_FORMATS = ("json", "csv", "excel")
+
+STREAM_FILE = OUTPUT_DIR / "jsonl" / "curriculos_coletados.jsonl"
+
+CHECKPOINT_FILE = OUTPUT_DIR / "checkpoint.json"
+
+
+def iter_jsonl(path: Path) -> Iterator[dict]:
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
             try:
-                screenshot_dir = APP_ROOT / 'output' / 'screenshots'
-                screenshot_dir.mkdir(parents=True, exist_ok=True)
-                page.screenshot(path=str(screenshot_dir / 'playwright_debug.png'))
-            except Exception:
-                pass
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # Última linha cortada por uma queda no meio da escrita
+                continue
+
+
+def _public_fields(registro: dict) -> dict:
+    return {k: v for k, v in registro.items() if not k.startswith("_")}
+
+
+class ResultStream:
+    """Grava cada currículo no JSONL assim que é coletado e mantém o checkpoint para --resume.
+
+    Cada linha leva também a chave de deduplicação ("_chave"), que não vai para
+    os arquivos exportados; assim o JSONL sozinho basta para retomar sem repetir.
+    O checkpoint guarda só a busca e a página (gravado uma vez por página); as
+    chaves já vistas são refeitas do JSONL no --resume.
+    """
+
+    def __init__(
+        self,
+        search_url: str = "",
+        resume: bool = False,
+        path: Path = STREAM_FILE,
+        checkpoint_file: Path = CHECKPOINT_FILE,
+    ):
+        self.path = path
+        self.checkpoint_file = checkpoint_file
+        self.search_url = search_url
+        self.count = 0
+        self.vistos: set[str] = set()
+        self.pagina: int | None = None
+        self.page_url: str | None = None
+        self.completed = False
+        self.resumed = resume and self._restore()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if resume and not self.resumed and path.exists() and path.stat().st_size:
+            # --resume pedido mas sem checkpoint utilizável: guarda o JSONL antigo em vez de truncar
+            guardado = path.with_name(f"{path.stem}.anterior_{datetime.now():%Y%m%d_%H%M%S}{path.suffix}")
+            os.replace(path, guardado)
+            log(f"Não deu para retomar; o JSONL anterior foi guardado em {guardado}", logging.WARNING)
+        self._file = path.open("a" if self.resumed else "w", encoding="utf-8")
+
+    def _restore(self) -> bool:
+        try:
+            data = json.loads(self.checkpoint_file.read_text(encoding="utf-8"))
+        except Exception:
+            log("Nenhum checkpoint para retomar; começando do zero")
+            return False
+        if data.get("search_url") != self.search_url:
+            log("Checkpoint é de outra busca; começando do zero")
+            return False
+
+        self.pagina = data.get("pagina")
+        self.page_url = data.get("page_url")
+        if self.path.exists():
+            raw = self.path.read_bytes()
+            if raw and not raw.endswith(b"\n"):
+                self.path.write_bytes(raw[:raw.rfind(b"\n") + 1])
+            for registro in iter_jsonl(self.path):
+                self.count += 1
+                if registro.get("_chave"):
+                    self.vistos.add(registro["_chave"])
+        log(f"Retomando do checkpoint: página {self.pagina}, {self.count} currículos já coletados")
+        return True
+
+    def append(self, registro: dict, chave: str) -> None:
+        self._file.write(json.dumps({**registro, "_chave": chave}, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.count += 1
+
+    def checkpoint(self, pagina: int, page_url: str) -> None:
+        data = {
+            "search_url": self.search_url,
+            "pagina": pagina,
+            "page_url": page_url,
+            "coletados": self.count,
+            "atualizado_em": datetime.now().isoformat(timespec="seconds"),
+        }
+        try:
+            self.checkpoint_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.checkpoint_file.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, self.checkpoint_file)
+        except Exception as e:
+            log(f"Não foi possível gravar o checkpoint: {e}")
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+    def finish(self) -> None:
+        """Coleta terminou normalmente: o checkpoint não é mais necessário."""
+        self.close()
+        self.completed = True
+        self.checkpoint_file.unlink(missing_ok=True)
+
+
+def export_results(
+    jsonl_file: Path = STREAM_FILE,
+    output_dir: Path = OUTPUT_DIR,
+    formats: Iterable[str] = EXPORT_FORMATS,
+) -> None:
+    """Gera JSON, CSV e/ou Excel lendo o JSONL linha a linha (memória constante).
+
+    Cada formato só importa o que precisa quando está ligado (csv, openpyxl).
+    """
+    formats = [f for f in (str(f).lower() for f in formats) if f in EXPORT_FORMATS]
+
+    # Primeira passada: colunas (campos extras, ex.: 'busca', vão depois dos padrões)
+    fieldnames = list(OUTPUT_FIELDS)
+    total = 0
+    if jsonl_file.exists():
+        for registro in iter_jsonl(jsonl_file):
+            total += 1
+            fieldnames.extend(k for k in _public_fields(registro) if k not in fieldnames)
+
+    def registros() -> Iterator[dict]:
+        if total:
+            for registro in iter_jsonl(jsonl_file):
+                yield _public_fields(registro)
+
+    salvos = []
+
+    # Salvar dados em JSON
+    if "json" in formats:
+        (output_dir / "json").mkdir(parents=True, exist_ok=True)
+        json_file = output_dir / "json" / 'curriculos_coletados.json'
+        with open(json_file, 'w', encoding='utf-8') as f:
+            # Mesmo formato de json.dump(lista, indent=2), escrito item a item
+            f.write("[")
+            for i, registro in enumerate(registros()):
+                f.write(",\n" if i else "\n")
+                f.write(textwrap.indent(json.dumps(registro, ensure_ascii=False, indent=2), "  "))
+            f.write("\n]" if total else "]")
+        salvos.append("JSON")
+
+    # Também salvar em CSV para facilitar análise
+    if "csv" in formats:
+        import csv
+
+        (output_dir / "csv").mkdir(parents=True, exist_ok=True)
+        csv_file = output_dir / "csv" / 'curriculos_coletados.csv'
+        with open(csv_file, 'w', newline='', encoding='utf-8') as f:
+            if total:
+                writer = csv.DictWriter(f, fieldnames=fieldnames)
+                writer.writeheader()
+                writer.writerows(registros())
+        salvos.append("CSV")
+
+    # Salvar em Excel para melhor visualização (write_only: linhas vão direto para o disco)
+    if "excel" in formats:
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            log("openpyxl não está disponível (build sem Excel); exportação Excel pulada")
         else:
-            # Aguardar mais tempo para garantir que o login foi processado
-            import time
-            log("Aguardando 5 segundos para completar o login...")
-            time.sleep(5)
-            
-            # Navegar para a página de busca após login bem-sucedido
-            log(f"Navegando para: {search_url}")
-            try:
-                page.goto(search_url, timeout=30000, wait_until='load')
-            except Exception as e:
-                log(f"Erro ao navegar para search_url: {e}")
-            
-            try:
-                page.wait_for_load_state('domcontentloaded', timeout=10000)
-            except Exception:
-                pass
-            
-            log("Página de busca carregada com sucesso!")
-            
-            # Ordenar por Data de Atualização antes de coletar
+            (output_dir / "excel").mkdir(parents=True, exist_ok=True)
+            excel_file = output_dir / "excel" / 'curriculos_coletados.xlsx'
+            if total:
+                wb = Workbook(write_only=True)
+                ws = wb.create_sheet("Sheet1")
+                ws.append(fieldnames)
+                for registro in registros():
+                    ws.append([registro.get(campo, "") for campo in fieldnames])
+                wb.save(excel_file)
+            salvos.append("Excel")
+
+    log(f"Coletados {total} currículos e salvos em {', '.join(salvos) or 'nenhum formato'}")
+
+
+CANDIDATE_DB = APP_ROOT / "output" / "cache" / "candidatos.sqlite3"
+
+
+class CandidateIndex:
+    """Índice local (SQLite) dos candidatos já coletados em execuções anteriores.
+
+    A chave é o href do perfil. Enquanto o contato salvo tiver menos de
+    `ttl_days`, o candidato é reaproveitado sem clicar em "Ver telefone"/"Ver e-mail".
+    """
+
+    def __init__(self, path: Path = CANDIDATE_DB, ttl_days: float = 30):
+        import sqlite3
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = timedelta(days=ttl_days)
+        self.conn = sqlite3.connect(str(path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS candidatos (
+                href TEXT PRIMARY KEY,
+                nome TEXT,
+                info_basica TEXT,
+                telefone TEXT,
+                email TEXT,
+                first_seen TEXT NOT NULL,
+                last_seen TEXT NOT NULL,
+                revealed_at TEXT
+            )
+            """
+        )
+        self.conn.commit()
+        self.reused = 0
+
+    def lookup_fresh(self, hrefs: Iterable[str]) -> dict[str, dict]:
+        """Candidatos da lista com contato revelado dentro do TTL, numa única consulta."""
+        hrefs = [h for h in dict.fromkeys(hrefs) if h]
+        if not hrefs:
+            return {}
+        limite = (datetime.now() - self.ttl).isoformat(timespec="seconds")
+        placeholders = ",".join("?" * len(hrefs))
+        rows = self.conn.execute(
+            f"SELECT href, nome, info_basica, telefone, email FROM candidatos "
+            f"WHERE revealed_at >= ? AND href IN ({placeholders})",
+            [limite, *hrefs],
+        )
+        return {
+            row[0]: {"nome": row[1], "info_basica": row[2], "telefone": row[3], "email": row[4]}
+            for row in rows
+        }
+
+    def record(self, href: str, registro: dict, revealed: bool) -> None:
+        """Grava/atualiza o candidato; revealed=True renova a data do contato."""
+        if not href:
+            return
+        agora = datetime.now().isoformat(timespec="seconds")
+        self.conn.execute(
+            """
+            INSERT INTO candidatos (href, nome, info_basica, telefone, email, first_seen, last_seen, revealed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(href) DO UPDATE SET
+                nome = excluded.nome,
+                info_basica = excluded.info_basica,
+                telefone = CASE WHEN excluded.revealed_at IS NULL THEN candidatos.telefone ELSE excluded.telefone END,
+                email = CASE WHEN excluded.revealed_at IS NULL THEN candidatos.email ELSE excluded.email END,
+                last_seen = excluded.last_seen,
+                revealed_at = COALESCE(excluded.revealed_at, candidatos.revealed_at)
+            """,
+            (
+                href,
+                registro.get("nome", ""),
+                registro.get("info_basica", ""),
+                registro.get("telefone", ""),
+                registro.get("email", ""),
+                agora,
+                agora,
+                agora if revealed else None,
+            ),
+        )
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+WATERMARK_FILE = APP_ROOT / "output" / "cache" / "watermarks.json"
+
+# Quantos candidatos do topo da lista formam a marca d'água de uma busca
+WATERMARK_SIZE = 10
+
+_DATE_RE = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{2,4})")
+_DAYS_AGO_RE = re.compile(r"h[áa]\s+(\d+)\s+dias?", re.I)
+
+
+def parse_update_date(texto: str, hoje: date | None = None) -> str:
+    """Converte o texto de atualização do card/JSON em AAAA-MM-DD ("" se não reconhecer)."""
+    if not texto:
+        return ""
+    hoje = hoje or date.today()
+    if m := re.match(r"(\d{4})-(\d{2})-(\d{2})", texto):
+        return m.group(0)
+    if m := _DATE_RE.search(texto):
+        dia, mes, ano = (int(g) for g in m.groups())
+        if ano < 100:
+            ano += 2000
+        try:
+            return date(ano, mes, dia).isoformat()
+        except ValueError:
+            return ""
+    lowered = texto.lower()
+    if "hoje" in lowered:
+        return hoje.isoformat()
+    if "ontem" in lowered:
+        return (hoje - timedelta(days=1)).isoformat()
+    if m := _DAYS_AGO_RE.search(texto):
+        return (hoje - timedelta(days=int(m.group(1)))).isoformat()
+    return ""
+
+
+class DeltaWatermark:
+    """Modo delta: onde a execução anterior desta busca parou de ter novidades.
+
+    Com a lista ordenada por Data de Atualização, a marca d'água é o topo da
+    lista da última execução (hrefs) e a data de atualização mais recente vista.
+    Um card com data anterior a essa, ou a partir do segundo href da marca
+    (um só pode ser alguém que atualizou o perfil e subiu), indica que dali em
+    diante tudo já foi coletado. Um href da marca ainda é coletado quando é o
+    primeiro encontrado ou tem data mais nova que a da marca (perfil atualizado).
+    """
+
+    def __init__(self, query_key: str, store_file: Path = WATERMARK_FILE, size: int = WATERMARK_SIZE):
+        self.query_key = query_key
+        self.store_file = store_file
+        self.size = size
+        try:
+            anterior = json.loads(store_file.read_text(encoding="utf-8")).get(query_key) or {}
+        except Exception:
+            anterior = {}
+        self.previous_hrefs: set[str] = set(anterior.get("hrefs") or [])
+        self.previous_date: str = anterior.get("atualizado_em") or ""
+        self.top_hrefs: list[str] = []
+        self.newest_date = ""
+        self.hits = 0
+        self.passed = False
+
+    def is_new(self, registro: dict) -> bool:
+        """Chamado para cada card, na ordem da lista; False para o que já está abaixo da marca."""
+        href = registro.get("href", "")
+        atualizado = parse_update_date(registro.get("atualizado", ""))
+
+        if href and len(self.top_hrefs) < self.size and href not in self.top_hrefs:
+            self.top_hrefs.append(href)
+        if atualizado > self.newest_date:
+            self.newest_date = atualizado
+
+        if self.passed:
+            return False
+        if atualizado and self.previous_date and atualizado < self.previous_date:
+            self.passed = True
+            return False
+        if href in self.previous_hrefs:
+            self.hits += 1
+            if self.hits >= min(2, len(self.previous_hrefs)):
+                self.passed = True
+            atualizou = bool(atualizado and self.previous_date and atualizado > self.previous_date)
+            return atualizou or self.hits == 1
+        return True
+
+    def save(self, exhausted: bool = False) -> None:
+        """Grava a marca nova, só se esta execução chegou à anterior (ou ao fim da lista).
+
+        Parar antes (num_candidatos) deixaria um buraco entre as duas marcas que
+        nunca seria coletado; nesse caso a marca anterior continua valendo.
+        """
+        if not self.top_hrefs:
+            return
+        if self.previous_hrefs and not (self.passed or exhausted):
+            log("Modo delta: a coleta parou antes da marca d'água anterior; ela foi mantida")
+            return
+        try:
+            dados = json.loads(self.store_file.read_text(encoding="utf-8"))
+        except Exception:
+            dados = {}
+        dados[self.query_key] = {
+            "hrefs": self.top_hrefs,
+            "atualizado_em": max(self.newest_date, self.previous_date),
+            "salvo_em": datetime.now().isoformat(timespec="seconds"),
+        }
+        try:
+            self.store_file.parent.mkdir(parents=True, exist_ok=True)
+            self.store_file.write_text(json.dumps(dados, ensure_ascii=False, indent=2), encoding="utf-8")
+        except Exception as e:
+            log(f"Não foi possível salvar a marca d'água: {e}")
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Coleta currículos na busca da Catho.")
+    parser.add_argument("--config", help="Caminho do config (padrão: config/config.user.json ou config/config.json).")
+    parser.add_argument(
+        "--block-resources",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Bloqueia imagens, fontes, mídia e domínios de anúncio/analytics (sobrescreve 'block_resources' do config).",
+    )
+    parser.add_argument(
+        "--delta",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Só coleta o que é novo/atualizado desde a última execução desta busca (sobrescreve 'delta_mode' do config).",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continua a coleta interrompida a partir do checkpoint (mesma busca), sem repetir currículos já gravados.",
+    )
+    parser.add_argument(
+        "--chrome-trace",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Grava também os spans da execução no formato do Chrome/Perfetto em output/reports (sobrescreve 'chrome_trace').",
+    )
+    parser.add_argument(
+        "--playwright-trace",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Grava um trace do Playwright (screenshots + snapshots do DOM) em output/reports (sobrescreve 'playwright_trace').",
+    )
+    parser.add_argument(
+        "--enrich",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Depois da coleta, busca a página de perfil de cada currículo por HTTP e junta os campos (sobrescreve 'enrichment.enabled').",
+    )
+    parser.add_argument(
+        "--log-level",
+        choices=LOG_LEVELS,
+        type=str.upper,
+        help="Nível do log (sobrescreve 'log_level'); DEBUG mostra cada seletor e cada candidato.",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Sobe o daemon: Chromium e sessão ficam abertos e recebem buscas por HTTP em 'daemon_url'.",
+    )
+    parser.add_argument(
+        "--via-daemon",
+        action="store_true",
+        help="Envia a busca do config para o daemon e espera o resultado (roda localmente se ele não responder).",
+    )
+    parser.add_argument(
+        "--shard",
+        action="store_true",
+        help="Divide a busca em unidades ('sharding': locations x search_terms), sobe os workers e junta o resultado.",
+    )
+    parser.add_argument("--shard-worker", action="store_true", help="Só atende unidades da fila de sharding (pode rodar em outra máquina).")
+    parser.add_argument("--shard-merge", action="store_true", help="Só junta as unidades de sharding já concluídas e exporta.")
+    parser.add_argument("--shard-clear", action="store_true", help="Esvazia a fila de sharding e apaga os arquivos das unidades.")
+    parser.add_argument(
+        "--reextract",
+        nargs="?",
+        const="",
+        metavar="PASTA",
+        help="Refaz os currículos a partir do HTML arquivado ('archive_html'), sem navegador; sem PASTA usa o arquivo mais recente.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
+    if args.config is None:
+        ensure_default_config_file()
+    creds = load_creds(args.config)
+    if args.block_resources is not None:
+        creds["block_resources"] = args.block_resources
+    if args.delta is not None:
+        creds["delta_mode"] = args.delta
+    if args.chrome_trace is not None:
+        creds["chrome_trace"] = args.chrome_trace
+    if args.playwright_trace is not None:
+        creds["playwright_trace"] = args.playwright_trace
+    if args.log_level is not None:
+        creds["log_level"] = args.log_level
+    if args.enrich is not None:
+        creds["enrichment"] = {**(creds.get("enrichment") or {}), "enabled": args.enrich}
+    setup_logging(
+        level=str(creds.get("log_level", "INFO")),
+        json_lines=str(creds.get("log_format", "text")).lower() == "json",
+        max_bytes=int(float(creds.get("log_max_mb", 10)) * 1024 * 1024),
+        backup_count=int(creds.get("log_backup_count", 5)),
+        daily=bool(creds.get("log_rotate_daily", True)),
+    )
+    url = creds.get("url")
+    username = creds.get("username")
+    password = creds.get("password")
+    search_url = creds.get("search_url")
+    search_term = str(creds.get("search_term", "")).strip()
+    num_candidatos = int(creds.get("num_candidatos", 10))
+    headless = bool(creds.get("headless", True))
+    reveal_timeout_ms = int(creds.get("reveal_timeout_ms", 5000))
+    network_capture = bool(creds.get("network_capture", False))
+    reuse_session = bool(creds.get("reuse_session", True))
+    session_check_selector = creds.get("session_check_selector")
+    block_resources = bool(creds.get("block_resources", False))
+    use_candidate_index = bool(creds.get("candidate_index", True))
+    candidate_ttl_days = float(creds.get("candidate_ttl_days", 30))
+    delta_mode = bool(creds.get("delta_mode", False))
+    two_phase = bool(creds.get("two_phase", False))
+    ranking = creds.get("ranking") or {}
+    scan_limit = int(ranking.get("scan_limit", num_candidatos * 5))
+    url_navigation = bool(creds.get("url_navigation", False))
+    page_param = str(creds.get("page_param", "page"))
+    ordenar_pelo_menu = not sorts_via_url(creds)
+    chrome_trace = bool(creds.get("chrome_trace", False))
+    export_formats = creds.get("export_formats") or list(EXPORT_FORMATS)
+    archive_html = bool(creds.get("archive_html", False))
+    playwright_trace = bool(creds.get("playwright_trace", False))
+    pacer = rate_controller(creds)
+    recycler = page_recycler(creds)
+    # Com bloqueio desligado o filtro só observa: aprende o tamanho médio dos
+    # recursos para estimar a economia nas execuções com bloqueio.
+    blocker = resource_blocker(creds)
+    enrich = bool((creds.get("enrichment") or {}).get("enabled", False))
+
+    if args.reextract is not None:
+        from catho_archive import latest_archive, reextract
+
+        pasta = Path(args.reextract) if args.reextract else latest_archive()
+        if pasta is None:
+            raise ValueError("Nenhum HTML arquivado encontrado; rode antes com 'archive_html': true.")
+        reextract(pasta, formats=export_formats)
+        return
+
+    if not url:
+        raise ValueError("Arquivo de configuração deve conter 'url' com a página de login.")
+    if not username or not password:
+        raise ValueError("Arquivo de configuração deve conter 'username' e 'password'.")
+
+    if args.shard or args.shard_worker or args.shard_merge or args.shard_clear:
+        # Várias unidades (local x termo) numa fila SQLite atendida por vários processos (ver catho_shard.py).
+        # Vem antes do cliente do daemon: um worker com 'daemon_url' no config não pode mandar a busca para lá.
+        import catho_shard
+
+        if args.shard_clear:
+            catho_shard.clear_queue(creds)
+        elif args.shard_worker:
+            catho_shard.run_worker(creds)
+        elif args.shard_merge:
+            catho_shard.merge_units(creds)
+            export_results(formats=creds.get("export_formats") or list(EXPORT_FORMATS))
+        else:
+            catho_shard.run_sharded(creds, args.config, resume=args.resume)
+        return
+
+    if args.daemon:
+        from catho_daemon import DEFAULT_DAEMON_URL, run_daemon
+
+        endereco = urlsplit(creds.get("daemon_url") or DEFAULT_DAEMON_URL)
+        run_daemon(creds, endereco.hostname or "127.0.0.1", endereco.port or 8777)
+        return
+
+    if args.via_daemon:
+        # Cliente fino: o daemon já tem o Chromium aberto e a sessão logada
+        from catho_daemon import DAEMON_CLIENT_TIMEOUT_S, DEFAULT_DAEMON_URL, daemon_is_up, run_via_daemon
+
+        ignoradas = [
+            nome for nome, ativa in (
+                ("--resume", args.resume),
+                ("--delta", args.delta is not None),
+                ("--enrich", args.enrich is not None),
+                ("network_capture", creds.get("network_capture")),
+                ("two_phase", creds.get("two_phase")),
+            ) if ativa
+        ]
+        if ignoradas:
+            log(f"Com --via-daemon vale o config do daemon; ignorado aqui: {', '.join(ignoradas)}", logging.WARNING)
+
+        daemon_url = creds.get("daemon_url") or DEFAULT_DAEMON_URL
+        if daemon_is_up(daemon_url):
+            itens = creds.get("queries") or [{"search_term": search_term, "search_url": search_url, "num_candidatos": num_candidatos}]
             try:
-                log("Ordenando por Data de Atualização...")
-                # Clicar no botão de ordenação (Relevância)
-                sort_button_selectors = [
-                    'button[aria-label="open menu"]',
-                    '.Dropdown__DropInput-sc-xoew8d-0',
-                    'button:has-text("Relevância")',
-                    '#dropdown-204762'
-                ]
-                
-                sort_button = None
-                for sel in sort_button_selectors:
-                    try:
-                        locator = page.locator(sel).first
-                        locator.wait_for(state="visible", timeout=3000)
-                        sort_button = locator
-                        log(f"Botão de ordenação encontrado com seletor: {sel}")
-                        break
-                    except Exception:
-                        continue
-                
-                if sort_button:
-                    sort_button.click()
-                    page.wait_for_timeout(1000)  # Aguardar o menu aparecer
-                    
-                    # Selecionar "Data de Atualização"
-                    update_options = [
-                        'text=Data de Atualização',
-                        'text=/Data de Atualização/',
-                        'li:has-text("Data de Atualização")',
-                        'button:has-text("Data de Atualização")'
-                    ]
-                    
-                    option_found = False
-                    for opt_sel in update_options:
+                run_via_daemon(
+                    daemon_url,
+                    [{"search_term": i} if isinstance(i, str) else i for i in itens],
+                    timeout_s=float(creds.get("daemon_timeout_s", DAEMON_CLIENT_TIMEOUT_S)),
+                )
+                return
+            except ConnectionError as e:
+                # Nenhuma busca chegou ao daemon: rodar localmente não repete nada
+                log(f"{e}; rodando localmente")
+            except (TimeoutError, RuntimeError) as e:
+                # Os jobs seguem no daemon; rodar localmente repetiria a coleta
+                log(str(e))
+                raise SystemExit(1)
+        else:
+            log(f"Daemon não respondeu em {daemon_url}; rodando localmente")
+
+    timer = start_run_timer()
+    archive = None
+    if archive_html:
+        from catho_archive import HtmlArchive
+
+        archive = HtmlArchive(timer.run_id)
+        log(f"HTML das páginas de resultado será arquivado em {archive.dir}")
+
+    def save_report(stream: ResultStream, **extra) -> None:
+        try:
+            timer.save(
+                stream.count,
+                chrome_trace=chrome_trace,
+                completed=stream.completed,
+                headless=headless,
+                block_resources=block_resources,
+                blocking=blocker.summary(),
+                network_capture=network_capture,
+                pacing=pacer.summary() if pacer is not None else None,
+                memory=recycler.summary() if recycler is not None else None,
+                **extra,
+            )
+        except Exception as e:
+            log(f"Não foi possível gravar o relatório da execução: {e}")
+
+    if creds.get("queries"):
+        # Várias consultas: runner async com um pool de contextos (ver catho_async.py)
+        import asyncio
+        from catho_async import run_queries
+
+        if args.resume:
+            log("--resume não se aplica ao modo de várias consultas; começando do zero")
+        stream = ResultStream()
+        index = CandidateIndex(ttl_days=float(creds.get("candidate_ttl_days", 30))) if creds.get("candidate_index", True) else None
+        try:
+            asyncio.run(run_queries(creds, stream, index, timer, archive, pacer, recycler, blocker))
+            stream.completed = True
+            stream.close()
+            if enrich and stream.count:
+                from catho_enrich import enrich_jsonl
+
+                enrich_jsonl(creds, pacer=pacer)
+        finally:
+            if index is not None:
+                index.close()
+            stream.close()
+            if stream.count or stream.completed:
+                with span("export"):
+                    export_results(formats=export_formats)
+            save_report(stream, mode="queries", queries=len(creds["queries"]), concurrency=int(creds.get("concurrency", 3)))
+        return
+
+    if not search_url:
+        raise ValueError("Arquivo de configuração deve conter 'search_url' com a página de busca.")
+    if num_candidatos <= 0:
+        raise ValueError("'num_candidatos' deve ser um número maior que 0.")
+
+    search_url = build_search_url(search_url, search_term, creds)
+    if search_term:
+        log(f"Termo de busca aplicado (q): {search_term}")
+    if not ordenar_pelo_menu:
+        log(f"Ordenação aplicada pela URL: {creds['sort_params']}")
+
+    username_selectors, password_selectors, submit_selectors = login_selectors(creds)
+
+    configure_playwright_browsers_path()
+
+    stream = ResultStream(search_url=search_url, resume=args.resume)
+    index = CandidateIndex(ttl_days=candidate_ttl_days) if use_candidate_index else None
+    delta = DeltaWatermark(search_url) if delta_mode else None
+    # storage_state do fim da coleta, para o enriquecimento reaproveitar os cookies
+    sessao = None
+    if delta is not None:
+        if delta.previous_hrefs or delta.previous_date:
+            log(f"Modo delta: marca d'água anterior com {len(delta.previous_hrefs)} candidatos (atualização {delta.previous_date or '?'})")
+        else:
+            log("Modo delta: primeira execução desta busca, coletando normalmente")
+    try:
+        with sync_playwright() as p:
+            browser = p.chromium.launch(**launch_options(creds))
+
+            capture = None
+            if network_capture:
+                capture = NetworkCapture(
+                    patterns=creds.get("network_capture_patterns"),
+                    field_keys=creds.get("network_capture_fields"),
+                    dump_file=APP_ROOT / "output" / "network" / "respostas.jsonl",
+                )
+                log("Captura de rede ativada")
+
+            def open_page(storage_state: str | dict | None = None):
+                ctx = browser.new_context(storage_state=storage_state)
+                if playwright_trace:
+                    ctx.tracing.start(screenshots=True, snapshots=True)
+                blocker.attach(ctx)
+                if pacer is not None:
+                    pacer.attach(ctx)
+                pg = ctx.new_page()
+                if capture is not None:
+                    capture.attach(pg)
+                return ctx, pg
+
+            logged_in = False
+            if reuse_session and SESSION_FILE.exists():
+                context, page = open_page(str(SESSION_FILE))
+                with span("session_check"):
+                    valido = session_is_valid(page, search_url, session_check_selector)
+                if valido:
+                    log("Sessão salva reaproveitada; login pulado")
+                    logged_in = True
+                else:
+                    log("Sessão salva expirada ou inválida; fazendo login completo")
+                    context.close()
+
+            if not logged_in:
+                context, page = open_page()
+                with span("login"):
+                    logged_in = login(page, url, username, password, username_selectors, password_selectors, submit_selectors)
+
+                if logged_in:
+                    if reuse_session:
+                        save_session(context)
+
+                    # Navegar para a página de busca após login bem-sucedido
+                    log(f"Navegando para: {search_url}")
+                    with span("navigate_search"):
                         try:
-                            option = page.locator(opt_sel).first
-                            option.wait_for(state="visible", timeout=3000)
-                            option.click()
-                            log(f"Opção 'Data de Atualização' selecionada com seletor: {opt_sel}")
-                            option_found = True
-                            break
-                        except Exception:
-                            continue
-                    
-                    if option_found:
-                        # Aguardar a página recarregar com a nova ordenação (pode ser AJAX)
+                            timed_goto(page, search_url, pacer, timeout=30000, wait_until='load')
+                        except Exception as e:
+                            log(f"Erro ao navegar para search_url: {e}")
+
                         try:
-                            page.wait_for_load_state('networkidle', timeout=5000)
+                            page.wait_for_load_state('domcontentloaded', timeout=10000)
                         except Exception:
-                            log("Página não recarregou completamente, mas ordenação pode ter sido aplicada via AJAX")
-                        log("Ordenação por Data de Atualização aplicada com sucesso!")
-                    else:
-                        log("Opção 'Data de Atualização' não encontrada, continuando sem ordenação")
-                else:
-                    log("Botão de ordenação não encontrado, continuando sem ordenação")
-                
-            except Exception as e:
-                log(f"Erro ao ordenar por Data de Atualização: {e}")
+                            pass
+
+            if logged_in:
+                log("Página de busca carregada com sucesso!")
             
-            # Coletar dados dos currículos
-            try:
-                def go_to_next_page() -> bool:
-                    next_selectors = [
-                        'a[rel="next"]',
-                        'button:has-text("Próxima")',
-                        'a:has-text("Próxima")',
-                        'button[aria-label*="Próxima"]',
-                        'a[aria-label*="Próxima"]',
-                    ]
-
-                    for sel in next_selectors:
-                        try:
-                            locator = page.locator(sel).first
-                            if locator.count() == 0:
-                                continue
-                            locator.wait_for(state="visible", timeout=2000)
+                # Ordenar por Data de Atualização antes de coletar
+                if ordenar_pelo_menu:
+                    with span("sort"):
+                        ordenado = sort_by_update_date(page)
+                    if not ordenado and delta is not None:
+                        # Fora de ordem, parar na marca d'água perderia candidatos e a marca nova sairia errada
+                        log(DELTA_UNSORTED_MSG, logging.WARNING)
+                        delta = None
+
+                # Coletar dados dos currículos
+                try:
+                    def go_to_next_page() -> bool:
+                        locator, sel = resolve_selector(page, NEXT_PAGE_SELECTORS, timeout_ms=2000, cache_key="next_page")
+                        if locator is None:
+                            return False
 
+                        try:
                             aria_disabled = locator.get_attribute("aria-disabled")
                             disabled = locator.get_attribute("disabled")
                             if aria_disabled == "true" or disabled is not None:
-                                continue
+                                return False
 
                             try:
                                 locator.scroll_into_view_if_needed()
@@ -352,190 +2512,315 @@ def main():
                                 pass
 
                             log(f"Indo para próxima página (seletor: {sel})")
+                            if pacer is not None:
+                                pacer.wait("navigate")
+                            inicio = time.perf_counter()
+                            status = None
                             try:
-                                with page.expect_navigation(wait_until="domcontentloaded", timeout=15000):
+                                with page.expect_navigation(wait_until="domcontentloaded", timeout=15000) as nav:
                                     locator.click()
+                                status = nav.value.status if nav.value is not None else None
                             except Exception:
+                                # Paginação via AJAX: sem navegação, espera a rede assentar
                                 locator.click()
                                 try:
                                     page.wait_for_load_state('networkidle', timeout=5000)
                                 except Exception:
                                     pass
-                                page.wait_for_timeout(1000)
+                            if pacer is not None:
+                                pacer.record("navigate", (time.perf_counter() - inicio) * 1000, status, page_is_blocked(page))
                             return True
                         except Exception:
-                            continue
-
-                    return False
-
-                dados_coletados = []
-                vistos: set[str] = set()
-                pagina_atual = 1
-
-                while len(dados_coletados) < num_candidatos:
-                    # Aguardar que os currículos carreguem
-                    page.wait_for_selector('article', timeout=10000)
-                    artigos = page.locator('article')
-                    total_artigos = artigos.count()
-                    log(f"Página {pagina_atual}: encontrados {total_artigos} artigos")
+                            return False
+
+                    # Em duas fases a fase 1 usa uma cópia: só entra em stream.vistos quem
+                    # tiver o contato revelado (senão o checkpoint pularia quem nem foi revelado)
+                    vistos = set(stream.vistos) if two_phase else stream.vistos
+                    latencias_reveal: list[float] = []
+                    fase1: list[dict] = []
+                    pagina_atual = 1
+
+                    def meta_atingida() -> bool:
+                        if two_phase:
+                            return len(fase1) >= scan_limit
+                        return stream.count >= num_candidatos
+
+                    # Paginação pela URL: a próxima página carrega numa segunda aba
+                    # enquanto a atual é processada, e as abas trocam de papel.
+                    prefetch_page = None
+                    base_url = page.url
+                    if url_navigation:
+                        pagina_atual = int(query_param(base_url, page_param) or 1)
+                        prefetch_page = context.new_page()
+                        if capture is not None:
+                            capture.attach(prefetch_page)
+
+                    # --resume: voltar para a página onde a execução anterior parou
+                    if stream.resumed and stream.pagina and not two_phase:
+                        destino = None
+                        if url_navigation:
+                            destino = with_query_params(base_url, {page_param: stream.pagina})
+                        elif stream.page_url and stream.page_url != page.url:
+                            destino = stream.page_url
+                        if destino:
+                            log(f"Retomando na página {stream.pagina}: {destino}")
+                            timed_goto(page, destino, pacer, timeout=30000, wait_until='domcontentloaded')
+                            pagina_atual = stream.pagina
+
+                    primeira_pagina = pagina_atual
+                    paginas_no_contexto = 0
+                    lista_esgotada = False
+                    stream.checkpoint(pagina_atual, page.url)
+                    while not meta_atingida():
+                        with span("page_scan", pagina=pagina_atual):
+                            # Aguardar que os currículos carreguem
+                            page.wait_for_selector('article', timeout=10000)
+                            if prefetch_page is not None:
+                                start_prefetch(prefetch_page, with_query_params(base_url, {page_param: pagina_atual + 1}), pacer)
+                            artigos = page.locator('article')
+                            if capture is not None:
+                                log(f"Captura de rede: {capture.drain()} candidatos lidos das respostas da busca")
+                            registros = extract_page_records(page)
+                            conhecidos = index.lookup_fresh(r.get("href", "") for r in registros) if index is not None else {}
+                        log(f"Página {pagina_atual}: encontrados {len(registros)} artigos")
+
+                        coletados_nesta_pagina = 0
+
+                        for registro in registros:
+                            if meta_atingida():
+                                break
+
+                            idx = registro["idx"]
+                            curriculo = artigos.nth(idx)
+
+                            if not registro.get("ok"):
+                                log(f"Artigo {idx} não pôde ser lido em lote ({registro.get('error', '')}); usando seletores")
+                                try:
+                                    registro = extract_article_fallback(curriculo, idx)
+                                except Exception:
+                                    continue
 
-                    coletados_nesta_pagina = 0
+                            # Verificar se é um currículo (tem h2 com link)
+                            if not registro.get("is_candidate") or not registro.get("nome"):
+                                continue
 
-                    for idx in range(total_artigos):
-                        if len(dados_coletados) >= num_candidatos:
-                            break
+                            if capture is not None:
+                                registro = merge_capture_record(registro, capture.lookup(registro.get("href", "")))
 
-                        curriculo = artigos.nth(idx)
+                            if delta is not None and not delta.is_new(registro):
+                                continue
 
-                        # Verificar se é um currículo (tem h2 com link)
-                        if curriculo.locator('h2 a').count() == 0:
-                            continue
+                            nome = registro["nome"]
+                            href = registro.get("href", "")
 
-                        try:
-                            nome = curriculo.locator('h2 a').inner_text().strip()
-                        except Exception:
-                            continue
+                            chave = href or nome
+                            if chave in vistos:
+                                continue
+                            vistos.add(chave)
 
-                        href = ""
-                        try:
-                            href = (curriculo.locator('h2 a').get_attribute('href') or '').strip()
-                        except Exception:
-                            href = ""
+                            try:
+                                info_basica = registro.get("info_basica", "")
 
-                        chave = href or nome
-                        if chave in vistos:
-                            continue
-                        vistos.add(chave)
+                                log(f"Debug - Nome: {nome}, Info básica: '{info_basica}'", logging.DEBUG)
 
-                        try:
-                            # Tentar diferentes seletores para info_basica
-                            info_basica = ""
-                            try:
-                                # Primeiro tentar o seletor original
-                                info_elem = curriculo.locator('p.sc-eZkCL')
-                                if info_elem.count() > 0:
-                                    info_basica = info_elem.inner_text().strip()
-                                else:
-                                    # Tentar xpath
-                                    info_elem = curriculo.locator('xpath=.//p[contains(@class, "sc-eZkCL")]')
-                                    if info_elem.count() > 0:
-                                        info_basica = info_elem.inner_text().strip()
-                                    else:
-                                        # Tentar procurar por texto que contenha "anos"
-                                        info_elem = curriculo.locator('text=/\\d+ anos/').first
-                                        if info_elem.count() > 0:
-                                            info_basica = info_elem.inner_text().strip()
-                            except Exception as e:
-                                log(f"Erro info_basica {nome}: {e}")
+                                if two_phase:
+                                    # Fase 1: só os campos baratos; a revelação vem depois do ranking
+                                    fase1.append({**registro, "chave": chave, "pagina": pagina_atual, "page_url": page.url})
+                                    coletados_nesta_pagina += 1
+                                    continue
 
-                            log(f"Debug - Nome: {nome}, Info básica: '{info_basica}'")
+                                with span("candidate"):
+                                    reveal_and_store(
+                                        page, curriculo, registro, chave, conhecidos.get(href),
+                                        stream=stream, index=index, capture=capture,
+                                        reveal_timeout_ms=reveal_timeout_ms, latencias=latencias_reveal, pacer=pacer,
+                                    )
+                                coletados_nesta_pagina += 1
 
-                            # Tentar coletar telefone
-                            telefone = ""
-                            try:
-                                botao_telefone = curriculo.locator('button:has-text("Ver telefone")')
-                                if botao_telefone.count() > 0:
-                                    botao_telefone.click()
-                                    # Aguardar um pouco para o conteúdo aparecer
-                                    page.wait_for_timeout(2000)
-                                    # Procurar por elementos que possam conter o telefone dentro do currículo
-                                    telefone_element = curriculo.locator('text=/\\(\\d{2}\\) \\d{4,5}-\\d{4}/').first
-                                    if telefone_element.count() > 0:
-                                        telefone = telefone_element.inner_text().strip()
-                                    else:
-                                        # Tentar na página toda
-                                        telefone_element = page.locator('text=/\\(\\d{2}\\) \\d{4,5}-\\d{4}/').first
-                                        if telefone_element.count() > 0:
-                                            telefone = telefone_element.inner_text().strip()
                             except Exception as e:
-                                log(f"Erro telefone {nome}: {e}")
+                                log(f"Erro ao extrair currículo {stream.count+1}: {e}")
 
-                            # Tentar coletar email
-                            email = ""
+                        if archive is not None:
+                            # Depois das revelações, para o HTML levar também os contatos
                             try:
-                                botao_email = curriculo.locator('button:has-text("Ver e-mail")')
-                                if botao_email.count() > 0:
-                                    botao_email.click()
-                                    # Aguardar um pouco para o conteúdo aparecer
-                                    page.wait_for_timeout(2000)
-                                    # Procurar por elementos que contenham @ dentro do currículo
-                                    email_element = curriculo.locator('text=/[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\\.[a-zA-Z]{2,}/').first
-                                    if email_element.count() > 0:
-                                        email = email_element.inner_text().strip()
-                                    else:
-                                        # Tentar na página toda
-                                        email_element = page.locator('text=/[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\\.[a-zA-Z]{2,}/').first
-                                        if email_element.count() > 0:
-                                            email = email_element.inner_text().strip()
+                                with span("archive"):
+                                    archive.save(page.content(), pagina_atual, page.url, search_term)
                             except Exception as e:
-                                log(f"Erro email {nome}: {e}")
-
-                            dados_coletados.append({
-                                'nome': nome,
-                                'info_basica': info_basica,
-                                'telefone': telefone,
-                                'email': email
-                            })
-
-                            coletados_nesta_pagina += 1
-                            log(f"Currículo {len(dados_coletados)}: {nome}")
+                                log(f"Não foi possível arquivar a página {pagina_atual}: {e}")
 
-                        except Exception as e:
-                            log(f"Erro ao extrair currículo {len(dados_coletados)+1}: {e}")
-
-                    if len(dados_coletados) >= num_candidatos:
-                        break
+                        if meta_atingida():
+                            break
 
-                    if coletados_nesta_pagina == 0:
-                        log("Nenhum currículo novo coletado nesta página (possível repetição/HTML diferente)")
+                        if delta is not None and delta.passed:
+                            log("Modo delta: alcançou a marca d'água da última execução; encerrando paginação")
+                            break
 
-                    if not go_to_next_page():
-                        log("Não encontrei próxima página; encerrando paginação")
-                        break
+                        if coletados_nesta_pagina == 0:
+                            log("Nenhum currículo novo coletado nesta página (possível repetição/HTML diferente)")
+
+                        paginas_no_contexto += 1
+                        if recycler is not None and recycler.observe(pagina_atual, read_heap_bytes(page), paginas_no_contexto):
+                            if playwright_trace:
+                                # O trace é por contexto; reciclar perderia o começo dele
+                                log("Reciclagem pulada: trace do Playwright ativo", logging.DEBUG)
+                            elif not url_navigation and page.url == base_url:
+                                # Paginação por clique sem a página na URL: não há como voltar ao mesmo ponto
+                                log("Reciclagem adiada: a URL desta página não guarda a posição", logging.DEBUG)
+                            else:
+                                with span("recycle", pagina=pagina_atual):
+                                    posicao = page.url
+                                    antigo = context
+                                    context, page = open_page(context.storage_state())
+                                    if prefetch_page is not None:
+                                        # A próxima página é pedida de novo na aba de pré-carregamento do contexto novo
+                                        prefetch_page = context.new_page()
+                                        if capture is not None:
+                                            capture.attach(prefetch_page)
+                                        start_prefetch(prefetch_page, with_query_params(base_url, {page_param: pagina_atual + 1}), pacer)
+                                    else:
+                                        timed_goto(page, posicao, pacer, timeout=30000, wait_until='domcontentloaded')
+                                    antigo.close()
+                                recycler.recycled(pagina_atual)
+                                paginas_no_contexto = 0
+
+                        with span("paginate", pagina=pagina_atual + 1):
+                            if prefetch_page is not None:
+                                if not finish_prefetch(prefetch_page, pacer=pacer):
+                                    log("Próxima página sem resultados; encerrando paginação")
+                                    lista_esgotada = True
+                                    break
+                                page, prefetch_page = prefetch_page, page
+                            elif not go_to_next_page():
+                                log("Não encontrei próxima página; encerrando paginação")
+                                lista_esgotada = True
+                                break
+
+                        pagina_atual += 1
+                        stream.checkpoint(pagina_atual, page.url)
+
+                    if two_phase:
+                        # Fase 2: revelar só os melhores, voltando às páginas onde estão
+                        aprovados = rank_candidates(fase1, ranking)
+                        selecionados = aprovados[:max(num_candidatos - stream.count, 0)]
+                        log(
+                            f"Fase 1: {len(fase1)} candidatos lidos, {len(aprovados)} passaram no filtro; "
+                            f"revelando contato dos {len(selecionados)} melhores"
+                        )
+
+                        por_pagina: dict[int, list[dict]] = {}
+                        for candidato in selecionados:
+                            por_pagina.setdefault(candidato["pagina"], []).append(candidato)
+                        # Se cada página tem URL própria dá para voltar direto; senão, refaz a paginação
+                        urls_por_pagina = {c["pagina"]: c["page_url"] for c in fase1}
+                        urls_distintas = len(set(urls_por_pagina.values())) == len(urls_por_pagina)
+
+                        def ir_para_pagina(numero: int, atual: int) -> bool:
+                            if numero == atual:
+                                return True
+                            if url_navigation or urls_distintas:
+                                destino = (
+                                    with_query_params(base_url, {page_param: numero}) if url_navigation
+                                    else urls_por_pagina[numero]
+                                )
+                                timed_goto(page, destino, pacer, timeout=30000, wait_until='domcontentloaded')
+                                return True
+                            if numero < atual:
+                                timed_goto(page, base_url, pacer, timeout=30000, wait_until='domcontentloaded')
+                                if ordenar_pelo_menu:
+                                    sort_by_update_date(page)
+                                atual = primeira_pagina
+                            while atual < numero:
+                                if not go_to_next_page():
+                                    return False
+                                atual += 1
+                            return True
 
-                    pagina_atual += 1
-                
-                # Salvar dados em JSON
-                import json
-                output_dir = APP_ROOT / "output" / "candidates"
-                (output_dir / "json").mkdir(parents=True, exist_ok=True)
-                (output_dir / "csv").mkdir(parents=True, exist_ok=True)
-                (output_dir / "excel").mkdir(parents=True, exist_ok=True)
-                json_file = output_dir / "json" / 'curriculos_coletados.json'
-                with open(json_file, 'w', encoding='utf-8') as f:
-                    json.dump(dados_coletados, f, ensure_ascii=False, indent=2)
-                
-                # Também salvar em CSV para facilitar análise
-                import csv
-                csv_file = output_dir / "csv" / 'curriculos_coletados.csv'
-                with open(csv_file, 'w', newline='', encoding='utf-8') as f:
-                    if dados_coletados:
-                        fieldnames = ['nome', 'info_basica', 'telefone', 'email']
-                        writer = csv.DictWriter(f, fieldnames=fieldnames)
-                        writer.writeheader()
-                        writer.writerows(dados_coletados)
-                
-                # Salvar em Excel para melhor visualização
-                import pandas as pd
-                excel_file = output_dir / "excel" / 'curriculos_coletados.xlsx'
-                if dados_coletados:
-                    df = pd.DataFrame(dados_coletados)
-                    df.to_excel(excel_file, index=False, engine='openpyxl')
-                
-                log(f"Coletados {len(dados_coletados)} currículos e salvos em JSON, CSV e Excel")
+                        for numero in sorted(por_pagina):
+                            with span("paginate", pagina=numero):
+                                voltou = ir_para_pagina(numero, pagina_atual)
+                            if not voltou:
+                                log(f"Não consegui voltar para a página {numero}; encerrando fase 2")
+                                break
+                            pagina_atual = numero
+                            stream.checkpoint(numero, page.url)
+                            page.wait_for_selector('article', timeout=10000)
+                            posicoes = {
+                                (r.get("href") or r.get("nome")): r["idx"]
+                                for r in extract_page_records(page) if r.get("is_candidate")
+                            }
+                            alvos = por_pagina[numero]
+                            conhecidos = index.lookup_fresh(a.get("href", "") for a in alvos) if index is not None else {}
+                            for alvo in alvos:
+                                idx = posicoes.get(alvo["chave"])
+                                if idx is None:
+                                    log(f"{alvo['nome']} não está mais na página {numero}; pulando")
+                                    continue
+                                try:
+                                    with span("candidate"):
+                                        reveal_and_store(
+                                            page, page.locator('article').nth(idx), {**alvo, "idx": idx}, alvo["chave"],
+                                            conhecidos.get(alvo.get("href", "")),
+                                            stream=stream, index=index, capture=capture,
+                                            reveal_timeout_ms=reveal_timeout_ms, latencias=latencias_reveal, pacer=pacer,
+                                        )
+                                except Exception as e:
+                                    log(f"Erro ao revelar {alvo['nome']}: {e}")
+
+                    stream.finish()
+                    if delta is not None and not stream.resumed:
+                        delta.save(exhausted=lista_esgotada)
+                    log_reveal_summary(latencias_reveal)
+                    if pacer is not None:
+                        resumo = pacer.summary()
+                        log(f"Ritmo final: {pacer.rates_summary()}; {resumo['waited_s']} s de espera; penalidades {resumo['penalties'] or 'nenhuma'}")
                 
-            except Exception as e:
-                log(f"Erro ao coletar dados: {e}")
+                except Exception as e:
+                    log(f"Erro ao coletar dados: {e}")
             
-            try:
-                screenshot_dir = APP_ROOT / 'output' / 'screenshots'
-                screenshot_dir.mkdir(parents=True, exist_ok=True)
-                page.screenshot(path=str(screenshot_dir / 'search_results.png'))
-            except Exception:
-                pass
-
-        browser.close()
+                try:
+                    screenshot_dir = APP_ROOT / 'output' / 'screenshots'
+                    screenshot_dir.mkdir(parents=True, exist_ok=True)
+                    page.screenshot(path=str(screenshot_dir / 'search_results.png'))
+                except Exception:
+                    pass
+
+            log_blocking_summary(blocker)
+            if enrich and logged_in:
+                try:
+                    sessao = context.storage_state()
+                except Exception as e:
+                    log(f"Não foi possível ler a sessão para o enriquecimento: {e}")
+            if playwright_trace:
+                try:
+                    trace_file = timer.path("playwright_trace", ".zip")
+                    trace_file.parent.mkdir(parents=True, exist_ok=True)
+                    context.tracing.stop(path=str(trace_file))
+                    log(f"Trace do Playwright: {trace_file} (abrir com 'playwright show-trace')")
+                except Exception as e:
+                    log(f"Não foi possível gravar o trace do Playwright: {e}")
+            browser.close()
+
+        if enrich and stream.completed and stream.count:
+            # Fora do sync_playwright: o enriquecimento roda no seu próprio event loop
+            from catho_enrich import enrich_jsonl
+
+            enrich_jsonl({**creds, "search_url": search_url}, storage_state=sessao, pacer=pacer)
+
+    finally:
+        if index is not None:
+            if index.reused:
+                log(f"Índice de candidatos: {index.reused} revelações evitadas (contato já conhecido)")
+            index.close()
+        # Mesmo depois de uma queda, o que já foi gravado no JSONL vira CSV/JSON/Excel
+        stream.close()
+        if stream.count or stream.completed:
+            with span("export"):
+                export_results(formats=export_formats)
+        save_report(stream, mode="two_phase" if two_phase else "single", url_navigation=url_navigation, delta_mode=delta is not None)
 
 
 if __name__ == "__main__":
+    # catho_async/catho_daemon importam "catho_leads": reaproveitam este módulo (log,
+    # RunTimer) em vez de carregar uma segunda cópia
+    sys.modules.setdefault("catho_leads", sys.modules[__name__])
     main()
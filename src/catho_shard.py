@@ -0,0 +1,420 @@
+"""Sharding: divide a busca em unidades (local x termo) atendidas por vários processos.
+
+    python src/catho_leads.py --shard            # enfileira, sobe N workers locais e junta tudo
+    python src/catho_leads.py --shard-worker     # worker avulso (ex.: em outra máquina)
+    python src/catho_leads.py --shard-merge      # só junta o que já terminou
+
+A fila é um SQLite em `sharding.dir` (padrão output/shards). Workers em outras
+máquinas só precisam enxergar a mesma pasta; cada um pega uma unidade por vez
+com um "lease" e, se cair, a unidade volta para a fila quando o lease vence.
+O resultado final junta todas as unidades sem repetir candidato (href do perfil).
+O coordenador faz o login uma vez só e deixa a sessão em `sessao.json` na mesma
+pasta; as taxas de "pacing" valem para o conjunto e são divididas entre os workers.
+"""
+import asyncio
+import itertools
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from catho_leads import (
+    APP_ROOT,
+    STREAM_FILE,
+    CandidateIndex,
+    ResultStream,
+    build_search_url,
+    configure_playwright_browsers_path,
+    export_results,
+    iter_jsonl,
+    launch_options,
+    log,
+    page_recycler,
+    rate_controller,
+    resource_blocker,
+    write_storage_state,
+)
+
+
+# Filtros de local da busca da Catho, no formato estado_id[25]=25
+FACETS = ("estado_id", "regiaoId", "cidade_id")
+
+LEASE_S = 30 * 60
+MAX_ATTEMPTS = 3
+
+# Poucos processos por padrão: todos batem no mesmo site
+DEFAULT_WORKERS = 2
+
+SESSION_NAME = "sessao.json"
+
+
+def worker_count(creds: dict) -> int:
+    return max(1, int((creds.get("sharding") or {}).get("workers", DEFAULT_WORKERS)))
+
+
+def with_facets(search_url: str, location: dict) -> str:
+    """Troca os filtros de local da URL pelos de `location` (ex.: {"estado_id": 25, "cidade_id": 783}).
+
+    Todos os filtros de FACETS da URL original saem, para que um estado novo não
+    fique preso à cidade/região da busca de exemplo; os demais parâmetros ficam.
+    """
+    parts = urlsplit(search_url)
+    pairs = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k.split("[", 1)[0] not in FACETS]
+    for facet in FACETS:
+        valores = location.get(facet)
+        if valores is None:
+            continue
+        for valor in valores if isinstance(valores, list) else [valores]:
+            pairs.append((f"{facet}[{valor}]", str(valor)))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(pairs, safe="[]"), parts.fragment))
+
+
+def expand_units(creds: dict) -> list[dict]:
+    """Produto cartesiano locais x termos de `sharding`, no formato de build_queries."""
+    sharding = creds.get("sharding") or {}
+    base_url = sharding.get("search_url") or creds.get("search_url")
+    if not base_url:
+        raise ValueError("Sharding precisa de 'search_url' (no topo do config ou em 'sharding').")
+    locations = sharding.get("locations") or [None]
+    terms = sharding.get("search_terms") or [str(creds.get("search_term", "")).strip()]
+    num_candidatos = int(sharding.get("num_candidatos", creds.get("num_candidatos", 10)))
+    if num_candidatos <= 0:
+        raise ValueError("'num_candidatos' deve ser um número maior que 0.")
+
+    units = []
+    for location, term in itertools.product(locations, terms):
+        search_url = with_facets(base_url, location) if location else base_url
+        term = str(term or "").strip()
+        search_url = build_search_url(search_url, term, creds)
+        units.append({
+            "search_term": term,
+            "search_url": search_url,
+            "num_candidatos": num_candidatos,
+            "location": location or {},
+        })
+    return units
+
+
+class ShardQueue:
+    """Fila durável em SQLite; a chave de cada unidade é a search_url (enfileirar de novo não duplica).
+
+    Usa o journal padrão (não WAL) para funcionar também numa pasta de rede.
+    Cada tentativa de uma unidade grava num arquivo próprio (coluna `file`), e só
+    o worker dono do lease consegue renová-lo, concluir ou devolver a unidade.
+    """
+
+    def __init__(self, path: Path):
+        import sqlite3
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path), timeout=30, isolation_level=None)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS units (
+                id INTEGER PRIMARY KEY,
+                key TEXT UNIQUE,
+                payload TEXT,
+                status TEXT DEFAULT 'pending',
+                worker TEXT,
+                claimed_at REAL,
+                attempts INTEGER DEFAULT 0,
+                count INTEGER DEFAULT 0,
+                error TEXT,
+                file TEXT
+            )
+            """
+        )
+        # Filas criadas antes da coluna `file`
+        colunas = {row[1] for row in self.conn.execute("PRAGMA table_info(units)")}
+        if "file" not in colunas:
+            self.conn.execute("ALTER TABLE units ADD COLUMN file TEXT")
+
+    def enqueue(self, units: list[dict], reset: bool = True) -> int:
+        """Enfileira as unidades; retorna quantas ficaram pendentes agora.
+
+        Com reset (uma nova execução do coordenador), unidades já concluídas ou
+        falhas voltam para 'pending'; sem reset (--resume) elas ficam como estão.
+        """
+        antes = self.conn.total_changes
+        linhas = [(u["search_url"], json.dumps(u, ensure_ascii=False)) for u in units]
+        if reset:
+            self.conn.executemany(
+                """
+                INSERT INTO units (key, payload) VALUES (?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    payload = excluded.payload, status = 'pending', worker = NULL, claimed_at = NULL,
+                    attempts = 0, count = 0, error = NULL, file = NULL
+                WHERE status != 'running'
+                """,
+                linhas,
+            )
+        else:
+            self.conn.executemany("INSERT OR IGNORE INTO units (key, payload) VALUES (?, ?)", linhas)
+        return self.conn.total_changes - antes
+
+    def clear(self) -> int:
+        """Apaga todas as unidades da fila; retorna quantas havia."""
+        return self.conn.execute("DELETE FROM units").rowcount
+
+    def claim(self, worker: str, lease_s: float = LEASE_S) -> dict | None:
+        """Pega a próxima unidade pendente (ou com lease vencido); None se não há mais."""
+        agora = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute(
+                """
+                SELECT id, payload FROM units
+                WHERE status = 'pending' OR (status = 'running' AND claimed_at < ?)
+                ORDER BY id LIMIT 1
+                """,
+                (agora - lease_s,),
+            ).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+            attempt = self.conn.execute(
+                """
+                UPDATE units SET status = 'running', worker = ?, claimed_at = ?, attempts = attempts + 1
+                WHERE id = ? RETURNING attempts
+                """,
+                (worker, agora, row[0]),
+            ).fetchone()[0]
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return {"id": row[0], "attempt": attempt, **json.loads(row[1])}
+
+    def heartbeat(self, unit_id: int, worker: str) -> bool:
+        """Renova o lease; False se a unidade já não é deste worker."""
+        cur = self.conn.execute(
+            "UPDATE units SET claimed_at = ? WHERE id = ? AND worker = ? AND status = 'running'",
+            (time.time(), unit_id, worker),
+        )
+        return cur.rowcount == 1
+
+    def complete(self, unit_id: int, worker: str, count: int, file: str) -> bool:
+        """Marca como concluída com o arquivo desta tentativa; False se outro worker pegou a unidade."""
+        cur = self.conn.execute(
+            "UPDATE units SET status = 'done', count = ?, error = NULL, file = ? WHERE id = ? AND worker = ? AND status = 'running'",
+            (count, file, unit_id, worker),
+        )
+        return cur.rowcount == 1
+
+    def fail(self, unit_id: int, worker: str, error: str, max_attempts: int = MAX_ATTEMPTS) -> bool:
+        """Devolve a unidade para a fila, ou marca como 'failed' depois de max_attempts tentativas."""
+        cur = self.conn.execute(
+            """
+            UPDATE units SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, error = ?
+            WHERE id = ? AND worker = ? AND status = 'running'
+            """,
+            (max_attempts, error, unit_id, worker),
+        )
+        return cur.rowcount == 1
+
+    def stats(self) -> dict[str, int]:
+        return dict(self.conn.execute("SELECT status, COUNT(*) FROM units GROUP BY status").fetchall())
+
+    def done_files(self) -> list[tuple[int, str]]:
+        """(id, arquivo da tentativa que concluiu) das unidades prontas, em ordem."""
+        return self.conn.execute("SELECT id, file FROM units WHERE status = 'done' ORDER BY id").fetchall()
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def shard_dir(creds: dict) -> Path:
+    pasta = Path((creds.get("sharding") or {}).get("dir") or APP_ROOT / "output" / "shards")
+    return pasta if pasta.is_absolute() else APP_ROOT / pasta
+
+
+def unit_file(pasta: Path, unit_id: int, attempt: int = 1) -> Path:
+    """Arquivo de uma tentativa: um lease vencido não trunca o arquivo de quem ainda está gravando."""
+    return pasta / "units" / f"{unit_id}.{attempt}.jsonl"
+
+
+async def _keep_lease(queue: ShardQueue, unit_id: int, worker: str, lease_s: float) -> None:
+    while True:
+        await asyncio.sleep(max(lease_s / 3, 1))
+        if not queue.heartbeat(unit_id, worker):
+            log(f"[{worker}] Lease da unidade {unit_id} perdido para outro worker")
+            return
+
+
+async def _run_worker_async(creds: dict, queue: ShardQueue, pasta: Path, worker: str) -> int:
+    from playwright.async_api import async_playwright
+
+    from catho_async import collect_query, logged_in_state
+
+    lease_s = float((creds.get("sharding") or {}).get("lease_s", LEASE_S))
+    index = CandidateIndex(ttl_days=float(creds.get("candidate_ttl_days", 30))) if creds.get("candidate_index", True) else None
+    # Cada worker fica com 1/N do ritmo: somados, o site vê a taxa configurada
+    pacer = rate_controller(creds, share=worker_count(creds))
+    sessao = pasta / SESSION_NAME
+    recycler = page_recycler(creds)
+    unidades = 0
+    configure_playwright_browsers_path()
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(**launch_options(creds))
+        blocker = resource_blocker(creds)
+        try:
+            unit = queue.claim(worker, lease_s)
+            if unit is None:
+                return 0
+            try:
+                # Sessão do coordenador; sem ela (worker avulso) cada worker faz o próprio login
+                state = str(sessao) if sessao.exists() else await logged_in_state(browser, creds, unit["search_url"])
+            except Exception as e:
+                # Devolve a unidade já pega em vez de deixá-la 'running' até o lease vencer
+                queue.fail(unit["id"], worker, f"login: {e}")
+                raise
+            context = await browser.new_context(storage_state=state)
+            await blocker.attach_async(context)
+            if pacer is not None:
+                pacer.attach(context)
+            while unit is not None:
+                log(f"[{worker}] Unidade {unit['id']}: {unit['search_term'] or '-'} {unit['location']}")
+                # Arquivo por tentativa: uma unidade refeita (lease vencido) começa do zero
+                arquivo = unit_file(pasta, unit["id"], unit["attempt"])
+                stream = ResultStream(
+                    search_url=unit["search_url"],
+                    path=arquivo,
+                    checkpoint_file=arquivo.with_suffix(".checkpoint.json"),
+                )
+                heartbeat = asyncio.create_task(_keep_lease(queue, unit["id"], worker, lease_s))
+                try:
+                    count = await collect_query(context, unit, creds, stream, index, pacer=pacer, recycler=recycler)
+                    stream.finish()
+                    if queue.complete(unit["id"], worker, count, arquivo.name):
+                        unidades += 1
+                    else:
+                        log(f"[{worker}] Unidade {unit['id']} foi retomada por outro worker; resultado descartado")
+                except Exception as e:
+                    log(f"[{worker}] Unidade {unit['id']} falhou: {e}")
+                    queue.fail(unit["id"], worker, str(e))
+                finally:
+                    heartbeat.cancel()
+                    stream.close()
+                unit = queue.claim(worker, lease_s)
+        finally:
+            if index is not None:
+                index.close()
+            await browser.close()
+    return unidades
+
+
+def run_worker(creds: dict) -> int:
+    """Worker: atende unidades da fila até ela esvaziar. Retorna quantas concluiu."""
+    from catho_async import warn_unsupported_options
+
+    warn_unsupported_options(creds, "sharding")
+    pasta = shard_dir(creds)
+    queue = ShardQueue(pasta / "fila.sqlite3")
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    try:
+        unidades = asyncio.run(_run_worker_async(creds, queue, pasta, worker))
+    finally:
+        queue.close()
+    log(f"[{worker}] Worker terminou: {unidades} unidades")
+    return unidades
+
+
+def merge_units(creds: dict, output_file: Path = STREAM_FILE) -> int:
+    """Junta os JSONL das unidades concluídas num só, sem repetir candidato; retorna o total."""
+    pasta = shard_dir(creds)
+    queue = ShardQueue(pasta / "fila.sqlite3")
+    try:
+        prontas = queue.done_files()
+        stats = queue.stats()
+    finally:
+        queue.close()
+
+    vistos: set[str] = set()
+    total = 0
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with output_file.open("w", encoding="utf-8") as f:
+        for _, nome in prontas:
+            arquivo = pasta / "units" / (nome or "")
+            if not nome or not arquivo.exists():
+                continue
+            for registro in iter_jsonl(arquivo):
+                chave = registro.get("_chave") or registro.get("nome")
+                if chave in vistos:
+                    continue
+                vistos.add(chave)
+                f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+                total += 1
+    log(f"Sharding: {len(prontas)} unidades concluídas ({stats}); {total} currículos únicos")
+    return total
+
+
+def _worker_command(config_path: str | None) -> list[str]:
+    # No exe do PyInstaller sys.executable já é o próprio CathoLeads.exe
+    comando = [sys.executable] if getattr(sys, "frozen", False) else [sys.executable, str(Path(__file__).resolve().parent / "catho_leads.py")]
+    if config_path:
+        comando += ["--config", config_path]
+    return comando + ["--shard-worker"]
+
+
+def clear_queue(creds: dict) -> int:
+    """Esvazia a fila de sharding e apaga os arquivos das unidades."""
+    pasta = shard_dir(creds)
+    queue = ShardQueue(pasta / "fila.sqlite3")
+    try:
+        apagadas = queue.clear()
+    finally:
+        queue.close()
+    for arquivo in (pasta / "units").glob("*") if (pasta / "units").exists() else []:
+        arquivo.unlink(missing_ok=True)
+    log(f"Sharding: fila esvaziada ({apagadas} unidades)")
+    return apagadas
+
+
+async def _login_once(creds: dict, search_url: str, state_file: Path) -> None:
+    from playwright.async_api import async_playwright
+
+    from catho_async import logged_in_state
+
+    configure_playwright_browsers_path()
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(**launch_options(creds))
+        try:
+            write_storage_state(await logged_in_state(browser, creds, search_url), state_file)
+        finally:
+            await browser.close()
+    log(f"Sharding: sessão dos workers em {state_file}")
+
+
+def run_sharded(creds: dict, config_path: str | None, resume: bool = False) -> int:
+    """Coordenador: enfileira as unidades, sobe os workers locais, espera e junta o resultado.
+
+    Sem `resume` toda unidade volta a 'pending' (uma execução nova coleta de novo);
+    com `resume` as já concluídas são mantidas.
+    """
+    pasta = shard_dir(creds)
+    units = expand_units(creds)
+    queue = ShardQueue(pasta / "fila.sqlite3")
+    try:
+        pendentes = queue.enqueue(units, reset=not resume)
+        log(f"Sharding: {len(units)} unidades ({pendentes} a coletar na fila {pasta / 'fila.sqlite3'})")
+    finally:
+        queue.close()
+
+    if units:
+        # Um login só, antes dos workers: N processos logando juntos chamam atenção
+        # e disputariam o arquivo da sessão
+        asyncio.run(_login_once(creds, units[0]["search_url"], pasta / SESSION_NAME))
+
+    workers = worker_count(creds)
+    log(f"Sharding: subindo {workers} workers locais")
+    processos = [subprocess.Popen(_worker_command(config_path)) for _ in range(workers)]
+    for processo in processos:
+        processo.wait()
+
+    total = merge_units(creds)
+    export_results(formats=creds.get("export_formats") or ["json", "csv", "excel"])
+    return total
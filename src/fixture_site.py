@@ -0,0 +1,285 @@
+"""Versão local da busca da Catho, para testes e benchmarks sem rede nem credenciais.
+
+Serve um formulário de login, páginas de resultado com cards `article` / `h2 a`,
+botões "Ver telefone" / "Ver e-mail" que buscam o contato num endpoint JSON, o
+menu de ordenação "Data de Atualização" e a página de perfil de cada candidato
+(/curriculo/<id>). Latência e jitter são configuráveis.
+
+    python src/fixture_site.py --port 8765 --candidatos 200 --latency-ms 80 --jitter-ms 40
+"""
+import argparse
+import html
+import json
+import random
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+
+COOKIE_NAME = "catho_fixture_sessao"
+
+CIDADES = ["São Paulo - SP", "Campinas - SP", "Rio de Janeiro - RJ", "Belo Horizonte - MG", "Curitiba - PR"]
+CARGOS = ["Analista de Dados", "Desenvolvedor Python", "Assistente Administrativo", "Vendedor", "Engenheiro de Software"]
+
+LOGIN_HTML = """<!doctype html>
+<html lang="pt-br"><head><meta charset="utf-8"><title>Entrar</title></head>
+<body>
+<main><article>
+  <form method="post" action="/login">
+    <div><label>E-mail <input type="email" name="email"></label></div>
+    <div><label>Senha <input type="password" name="senha"></label></div>
+    <button type="submit">Entrar</button>
+  </form>
+</article></main>
+</body></html>
+"""
+
+SEARCH_SCRIPT = """
+document.querySelector('button[aria-label="open menu"]').addEventListener('click', () => {
+    document.getElementById('menu-ordenacao').hidden = false;
+});
+document.querySelectorAll('button[data-campo]').forEach((btn) => {
+    btn.addEventListener('click', async () => {
+        const resp = await fetch(`/api/contato/${btn.dataset.id}?campo=${btn.dataset.campo}`);
+        const dados = await resp.json();
+        const span = document.createElement('span');
+        span.textContent = dados[btn.dataset.campo] || '';
+        btn.replaceWith(span);
+    });
+});
+"""
+
+
+def build_candidates(total: int, seed: int = 42, hoje: date | None = None) -> list[dict]:
+    """Candidatos determinísticos; o id 1 é o atualizado mais recentemente."""
+    rng = random.Random(seed)
+    hoje = hoje or date.today()
+    candidatos = []
+    for i in range(1, total + 1):
+        candidatos.append({
+            "id": i,
+            "nome": f"Candidato {i:04d}",
+            "idade": rng.randint(18, 60),
+            "cidade": rng.choice(CIDADES),
+            "cargo": rng.choice(CARGOS),
+            "atualizado": hoje - timedelta(days=i // 10),
+            "telefone": f"(11) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}",
+            # Nem todo mundo mostra e-mail, como no site real
+            "email": f"candidato{i:04d}@example.com" if i % 4 else "",
+            "pretensao": rng.randrange(1500, 15000, 500),
+            "experiencias": [
+                f"{rng.choice(CARGOS)} na Empresa {rng.randint(1, 99)} ({ano} - {ano + rng.randint(1, 4)})"
+                for ano in sorted(rng.sample(range(2005, 2022), rng.randint(1, 3)))
+            ],
+        })
+    return candidatos
+
+
+class FixtureSite:
+    """Servidor HTTP em thread própria; `stats` conta logins, páginas de busca e revelações."""
+
+    def __init__(
+        self,
+        candidatos: int = 200,
+        per_page: int = 20,
+        latency_ms: float = 0,
+        jitter_ms: float = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: int = 42,
+    ):
+        self.candidatos = build_candidates(candidatos, seed)
+        self.by_id = {c["id"]: c for c in self.candidatos}
+        # Ordem de "Relevância": embaralhada, mas a mesma em toda execução
+        self.relevancia = list(self.candidatos)
+        random.Random(seed + 1).shuffle(self.relevancia)
+        self.per_page = per_page
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self._rng = random.Random(seed + 2)
+        self._lock = threading.Lock()
+        self.stats = {"logins": 0, "page_loads": 0, "reveals": 0, "profiles": 0, "requests": 0}
+        # time.perf_counter() do primeiro GET /login (benchmark de partida)
+        self.first_login_at: float | None = None
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FixtureSite":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self) -> "FixtureSite":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def _delay(self) -> None:
+        if not self.latency_ms and not self.jitter_ms:
+            return
+        with self._lock:
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+        time.sleep(max(0.0, self.latency_ms + jitter) / 1000)
+
+    def render_search(self, query: dict[str, str]) -> str:
+        ordem = self.candidatos if query.get("order") == "atualizacao" else self.relevancia
+        pagina = max(1, int(query.get("page") or 1))
+        inicio = (pagina - 1) * self.per_page
+        cards = []
+        for c in ordem[inicio:inicio + self.per_page]:
+            botoes = '<button data-id="{id}" data-campo="telefone">Ver telefone</button>'.format(id=c["id"])
+            if c["email"]:
+                botoes += '<button data-id="{id}" data-campo="email">Ver e-mail</button>'.format(id=c["id"])
+            cards.append(
+                "<article>"
+                f'<h2><a href="/curriculo/{c["id"]}">{html.escape(c["nome"])}</a></h2>'
+                f'<p class="sc-eZkCL">{c["idade"]} anos, {html.escape(c["cidade"])}, {html.escape(c["cargo"])}</p>'
+                f'<span>Atualizado em {c["atualizado"]:%d/%m/%Y}</span>'
+                f"<div>{botoes}</div>"
+                "</article>"
+            )
+
+        proxima = ""
+        if inicio + self.per_page < len(ordem):
+            href = "/busca?" + urlencode({**query, "page": pagina + 1})
+            proxima = f'<a rel="next" href="{html.escape(href)}">Próxima</a>'
+        ordenar = "/busca?" + urlencode({k: v for k, v in {**query, "order": "atualizacao"}.items() if k != "page"})
+
+        return f"""<!doctype html>
+<html lang="pt-br"><head><meta charset="utf-8"><title>Busca de currículos</title></head>
+<body>
+<header>
+  <button aria-label="open menu">Relevância</button>
+  <ul id="menu-ordenacao" hidden><li><a href="{html.escape(ordenar)}">Data de Atualização</a></li></ul>
+</header>
+<main>{''.join(cards)}</main>
+<nav>{proxima}</nav>
+<script>{SEARCH_SCRIPT}</script>
+</body></html>
+"""
+
+    def render_profile(self, c: dict) -> str:
+        experiencias = "".join(f"<li>{html.escape(e)}</li>" for e in c["experiencias"])
+        pretensao = f"{c['pretensao']:,}".replace(",", ".")
+        return f"""<!doctype html>
+<html lang="pt-br"><head><meta charset="utf-8"><title>{html.escape(c["nome"])}</title></head>
+<body>
+<main>
+  <h1>{html.escape(c["nome"])}</h1>
+  <p>{c["idade"]} anos, {html.escape(c["cidade"])}</p>
+  <p><strong>Pretensão salarial:</strong> R$ {pretensao},00</p>
+  <p>Atualizado em {c["atualizado"]:%d/%m/%Y}</p>
+  <section><h2>Experiência profissional</h2><ul>{experiencias}</ul></section>
+  <section><h2>Formação</h2><p>Ensino superior completo</p></section>
+</main>
+</body></html>
+"""
+
+    def _handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _logged_in(self) -> bool:
+                return f"{COOKIE_NAME}=ok" in (self.headers.get("Cookie") or "")
+
+            def _send(self, status: int, body: str = "", content_type: str = "text/html; charset=utf-8", headers=None):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _redirect(self, location: str, headers=None):
+                self._send(303, headers={"Location": location, **(headers or {})})
+
+            def do_GET(self):
+                site._count("requests")
+                site._delay()
+                parts = urlsplit(self.path)
+                query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+
+                if parts.path == "/login":
+                    if site.first_login_at is None:
+                        site.first_login_at = time.perf_counter()
+                    return self._send(200, LOGIN_HTML)
+                if parts.path == "/__stats":
+                    return self._send(200, json.dumps(site.stats), "application/json")
+                if not self._logged_in():
+                    return self._redirect("/login")
+
+                if parts.path == "/busca":
+                    site._count("page_loads")
+                    return self._send(200, site.render_search(query))
+                if parts.path.startswith("/curriculo/"):
+                    candidato = site.by_id.get(int(parts.path.rsplit("/", 1)[-1] or 0))
+                    if candidato is None:
+                        return self._send(404, "não encontrado")
+                    site._count("profiles")
+                    return self._send(200, site.render_profile(candidato))
+                if parts.path.startswith("/api/contato/"):
+                    candidato = site.by_id.get(int(parts.path.rsplit("/", 1)[-1] or 0))
+                    campo = query.get("campo", "telefone")
+                    if candidato is None or campo not in ("telefone", "email"):
+                        return self._send(404, "{}", "application/json")
+                    site._count("reveals")
+                    return self._send(200, json.dumps({campo: candidato[campo]}), "application/json")
+                return self._send(404, "não encontrado")
+
+            def do_POST(self):
+                site._count("requests")
+                site._delay()
+                length = int(self.headers.get("Content-Length") or 0)
+                form = {k: v[-1] for k, v in parse_qs(self.rfile.read(length).decode("utf-8")).items()}
+                if urlsplit(self.path).path != "/login" or not form.get("email") or not form.get("senha"):
+                    return self._send(400, "login inválido")
+                site._count("logins")
+                self._redirect("/busca", headers={"Set-Cookie": f"{COOKIE_NAME}=ok; Path=/"})
+
+        return Handler
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Site local que imita a busca da Catho.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--candidatos", type=int, default=200)
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    args = parser.parse_args(argv)
+
+    site = FixtureSite(args.candidatos, args.per_page, args.latency_ms, args.jitter_ms, port=args.port).start()
+    print(f"Fixture em {site.url} (login: {site.url}/login, busca: {site.url}/busca?q=python)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        site.stop()
+
+
+if __name__ == "__main__":
+    main()
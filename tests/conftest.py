@@ -0,0 +1,32 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+import catho_leads  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _log_to_tmp(tmp_path_factory, monkeypatch):
+    # Sem isso o log() dos testes iria para output/logs/catho_leads.log do repositório
+    monkeypatch.setattr(catho_leads, 'LOG_FILE', tmp_path_factory.mktemp('logs') / 'catho_leads.log')
+    catho_leads.setup_logging(console=False)
+    yield
+    catho_leads.shutdown_logging()
+
+
+@pytest.fixture
+def browser():
+    # Testes de navegador precisam do Chromium do Playwright (playwright install chromium)
+    from playwright.sync_api import sync_playwright
+
+    catho_leads.configure_playwright_browsers_path()
+    with sync_playwright() as p:
+        try:
+            navegador = p.chromium.launch()
+        except Exception as e:
+            pytest.skip(f'Chromium indisponível: {e}')
+        yield navegador
+        navegador.close()
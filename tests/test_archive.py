@@ -0,0 +1,50 @@
+import json
+
+from catho_archive import HtmlArchive, latest_archive, parse_results_html, reextract
+from fixture_site import FixtureSite
+
+
+def _pagina(page=1):
+    site = FixtureSite(candidatos=30, per_page=20)
+    try:
+        return site, site.render_search({'q': 'python', 'order': 'atualizacao', 'page': str(page)})
+    finally:
+        site.stop()
+
+
+def test_parse_matches_browser_extraction_fields():
+    site, html = _pagina()
+    registros = parse_results_html(html)
+    assert len(registros) == 20
+    primeiro, esperado = registros[0], site.candidatos[0]
+    assert primeiro['nome'] == esperado['nome']
+    assert primeiro['href'] == '/curriculo/1'
+    assert primeiro['info_basica'] == f"{esperado['idade']} anos, {esperado['cidade']}, {esperado['cargo']}"
+    assert primeiro['atualizado'].startswith('Atualizado em ')
+    assert primeiro['has_phone'] and primeiro['has_email']
+    # Candidato 4 não mostra e-mail no fixture
+    assert not registros[3]['has_email']
+
+
+def test_info_survives_class_rename_and_reads_revealed_contacts():
+    site, html = _pagina()
+    html = html.replace('sc-eZkCL', 'sc-novaClasse')
+    html = html.replace('<button data-id="1" data-campo="telefone">Ver telefone</button>', '<span>(11) 98888-7777</span>', 1)
+    primeiro = parse_results_html(html)[0]
+    esperado = site.candidatos[0]
+    assert primeiro['info_basica'] == f"{esperado['idade']} anos, {esperado['cidade']}, {esperado['cargo']}"
+    assert primeiro['telefone'] == '(11) 98888-7777'
+
+
+def test_archive_and_reextract_round_trip(tmp_path):
+    archive = HtmlArchive('20261017_120000', root=tmp_path / 'archive')
+    for page in (1, 2):
+        archive.save(_pagina(page)[1], page, f'http://x/busca?page={page}', 'python')
+    archive.save(_pagina(2)[1], 2, 'http://x/busca?page=2', 'python')  # página repetida não duplica
+
+    assert latest_archive(tmp_path / 'archive') == archive.dir
+    saida = tmp_path / 'reextract'
+    assert reextract(archive.dir, saida, formats=['json']) == 30
+    dados = json.loads((saida / 'json' / 'curriculos_coletados.json').read_text(encoding='utf-8'))
+    assert dados[0]['busca'] == 'python' and set(dados[0]) == {'nome', 'info_basica', 'telefone', 'email', 'href', 'busca'}
+    assert dados[0]['href'].startswith('/')
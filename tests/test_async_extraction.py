@@ -0,0 +1,48 @@
+import asyncio
+import logging
+
+import pytest
+
+import catho_leads
+from catho_async import extract_article_fallback_async, warn_unsupported_options
+from catho_leads import EXTRACT_ARTICLES_JS
+from fixture_site import FixtureSite
+
+CAMPOS = ('is_candidate', 'nome', 'href', 'info_basica', 'has_phone', 'has_email', 'atualizado')
+
+
+def test_warns_about_sync_only_options(caplog):
+    with caplog.at_level(logging.WARNING, logger='catho_leads'):
+        warn_unsupported_options({'network_capture': True, 'two_phase': False}, 'daemon')
+    assert [r.getMessage() for r in caplog.records] == [
+        "'network_capture' não é usado no modo daemon; a coleta segue pelo HTML, uma fase só"
+    ]
+
+
+def test_async_fallback_matches_batch_extraction():
+    from playwright.async_api import async_playwright
+
+    site = FixtureSite(candidatos=5)
+    html = site.render_search({})
+    site.stop()
+
+    async def run():
+        async with async_playwright() as p:
+            try:
+                navegador = await p.chromium.launch()
+            except Exception as e:
+                pytest.skip(f'Chromium indisponível: {e}')
+            try:
+                page = await navegador.new_page()
+                await page.set_content(html)
+                lote = await page.eval_on_selector_all('article', EXTRACT_ARTICLES_JS)
+                artigos = page.locator('article')
+                um_a_um = [await extract_article_fallback_async(artigos.nth(i), i) for i in range(await artigos.count())]
+                return lote, um_a_um
+            finally:
+                await navegador.close()
+
+    catho_leads.configure_playwright_browsers_path()
+    lote, um_a_um = asyncio.run(run())
+    assert len(um_a_um) == 5
+    assert [{c: r[c] for c in CAMPOS} for r in um_a_um] == [{c: r[c] for c in CAMPOS} for r in lote]
@@ -0,0 +1,47 @@
+from catho_leads import EXTRACT_ARTICLES_JS, extract_article_fallback, extract_page_records
+from fixture_site import FixtureSite
+
+CAMPOS = ('is_candidate', 'nome', 'href', 'info_basica', 'has_phone', 'has_email', 'atualizado')
+
+
+def _html(**kwargs):
+    site = FixtureSite(**kwargs)
+    try:
+        return site, site.render_search({'order': 'atualizacao'})
+    finally:
+        site.stop()
+
+
+def _compare(page):
+    lote = page.eval_on_selector_all('article', EXTRACT_ARTICLES_JS)
+    artigos = page.locator('article')
+    um_a_um = [extract_article_fallback(artigos.nth(i), i) for i in range(artigos.count())]
+    assert all(r['ok'] for r in lote)
+    assert [{c: r[c] for c in CAMPOS} for r in lote] == [{c: r[c] for c in CAMPOS} for r in um_a_um]
+    return lote
+
+
+def test_batch_matches_fallback(browser):
+    site, html = _html(candidatos=8)
+    page = browser.new_page()
+    page.set_content(html)
+
+    lote = _compare(page)
+    assert len(lote) == 8
+    primeiro = site.candidatos[0]
+    assert lote[0]['nome'] == primeiro['nome'] and lote[0]['href'] == '/curriculo/1'
+    assert lote[0]['info_basica'] == f"{primeiro['idade']} anos, {primeiro['cidade']}, {primeiro['cargo']}"
+    assert lote[0]['atualizado'] == f"Atualizado em {primeiro['atualizado']:%d/%m/%Y}"
+    # O candidato 4 não mostra e-mail
+    assert [r['has_email'] for r in lote[:4]] == [True, True, True, False]
+    assert extract_page_records(page) == lote
+
+
+def test_info_basica_heuristic_when_class_is_renamed(browser):
+    site, html = _html(candidatos=5)
+    page = browser.new_page()
+    # Nova build do styled-components: a classe muda e só sobra o texto "NN anos"
+    page.set_content(html.replace('class="sc-eZkCL"', 'class="sc-kDvujY"'))
+
+    lote = _compare(page)
+    assert [r['info_basica'].split(' anos')[0] for r in lote] == [str(c['idade']) for c in site.candidatos]
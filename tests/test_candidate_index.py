@@ -0,0 +1,31 @@
+from catho_leads import CandidateIndex
+
+
+def test_known_candidate_is_reused_within_ttl(tmp_path):
+    index = CandidateIndex(tmp_path / 'c.sqlite3', ttl_days=30)
+    index.record('/curriculos/1', {'nome': 'Ana', 'telefone': '(11) 98888-7777', 'email': 'ana@example.com'}, revealed=True)
+    index.record('/curriculos/2', {'nome': 'Bruno', 'telefone': '', 'email': ''}, revealed=False)
+
+    fresh = index.lookup_fresh(['/curriculos/1', '/curriculos/2', '/curriculos/3', ''])
+    assert list(fresh) == ['/curriculos/1']
+    assert fresh['/curriculos/1']['telefone'] == '(11) 98888-7777'
+    index.close()
+
+
+def test_sighting_without_reveal_keeps_cached_contact(tmp_path):
+    index = CandidateIndex(tmp_path / 'c.sqlite3', ttl_days=30)
+    index.record('/curriculos/1', {'nome': 'Ana', 'telefone': '(11) 98888-7777', 'email': ''}, revealed=True)
+    index.record('/curriculos/1', {'nome': 'Ana S.', 'telefone': '', 'email': ''}, revealed=False)
+
+    assert index.lookup_fresh(['/curriculos/1'])['/curriculos/1'] == {
+        'nome': 'Ana S.', 'info_basica': '', 'telefone': '(11) 98888-7777', 'email': ''
+    }
+    index.close()
+
+
+def test_expired_contact_is_revealed_again(tmp_path):
+    index = CandidateIndex(tmp_path / 'c.sqlite3', ttl_days=0)
+    index.record('/curriculos/1', {'nome': 'Ana', 'telefone': '(11) 98888-7777'}, revealed=True)
+    index.conn.execute("UPDATE candidatos SET revealed_at = '2000-01-01T00:00:00'")
+    assert index.lookup_fresh(['/curriculos/1']) == {}
+    index.close()
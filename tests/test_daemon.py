@@ -0,0 +1,111 @@
+import asyncio
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import catho_daemon
+from catho_daemon import BrowserDaemon, run_via_daemon
+
+CREDS = {
+    'search_url': 'https://www.catho.com.br/curriculos/busca/',
+    'num_candidatos': 10,
+    'candidate_index': False,
+}
+
+
+def test_submit_queues_normalized_job():
+    daemon = BrowserDaemon(CREDS)
+    status, job = daemon.route('POST', '/jobs', json.dumps({'search_term': 'motorista', 'num_candidatos': 5}).encode())
+    assert status == 202
+    assert job['status'] == 'queued' and job['num_candidatos'] == 5
+    assert 'q=motorista' in job['search_url']
+    assert daemon.queue.qsize() == 1
+
+    assert daemon.route('GET', f"/jobs/{job['id']}", b'') == (200, job)
+    assert daemon.route('GET', '/jobs/99', b'')[0] == 404
+    assert daemon.route('POST', '/jobs', b'{"num_candidatos": 0}')[0] == 400
+
+
+def test_http_roundtrip():
+    async def cenario():
+        daemon = BrowserDaemon(CREDS)
+        server = await asyncio.start_server(daemon._handle, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            body = b'{"search_term": "vendedor"}'
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(b'POST /jobs HTTP/1.1\r\nHost: x\r\nContent-Length: %d\r\n\r\n' % len(body) + body)
+            await writer.drain()
+            resposta = await reader.read()
+            writer.close()
+        return resposta
+
+    cabecalho, _, corpo = asyncio.run(cenario()).partition(b'\r\n\r\n')
+    assert cabecalho.startswith(b'HTTP/1.1 202')
+    assert json.loads(corpo)['search_term'] == 'vendedor'
+
+
+def test_client_reports_unreachable_daemon():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        porta = sock.getsockname()[1]
+    with pytest.raises(ConnectionError, match='não respondeu'):
+        run_via_daemon(f'http://127.0.0.1:{porta}', [{'search_term': 'vendedor'}])
+
+
+def test_client_gives_up_after_deadline():
+    class SempreRodando(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _job(self):
+            corpo = json.dumps({'id': '1', 'status': 'running'}).encode()
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            self._job()
+
+        do_GET = _job
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SempreRodando)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        with pytest.raises(TimeoutError, match='job 1'):
+            run_via_daemon(f'http://127.0.0.1:{server.server_address[1]}', [{'search_term': 'x'}], poll_s=0.05, timeout_s=0.3)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_job_ids_survive_restart(tmp_path, monkeypatch):
+    monkeypatch.setattr(catho_daemon, 'JOBS_DIR', tmp_path)
+    primeiro = BrowserDaemon(CREDS)
+    job = primeiro.submit({'search_term': 'vendedor'})
+    assert job['output'] == str(tmp_path / job['id'])
+    (tmp_path / job['id']).mkdir()
+
+    # Reiniciado no mesmo segundo: o id da pasta que já existe não é reaproveitado
+    reiniciado = BrowserDaemon(CREDS)
+    reiniciado._run_id = primeiro._run_id
+    assert reiniciado.submit({'search_term': 'vendedor'})['id'] != job['id']
+
+
+def test_client_does_not_fall_back_after_partial_submit(monkeypatch):
+    chamadas = []
+
+    def request(daemon_url, path, payload=None, timeout_s=10):
+        chamadas.append(path)
+        if len(chamadas) == 1:
+            return {'id': '20261017_120000_1', 'status': 'queued'}
+        raise ConnectionError('Daemon em http://x não respondeu: recusado')
+
+    monkeypatch.setattr(catho_daemon, '_request', request)
+    with pytest.raises(RuntimeError, match='20261017_120000_1'):
+        run_via_daemon('http://x', [{'search_term': 'a'}, {'search_term': 'b'}])
@@ -0,0 +1,88 @@
+from datetime import date
+
+from catho_leads import DeltaWatermark, parse_update_date
+
+
+def test_parse_update_date_formats():
+    hoje = date(2026, 10, 17)
+    assert parse_update_date('Atualizado em 05/10/2026', hoje) == '2026-10-05'
+    assert parse_update_date('Atualizado hoje', hoje) == '2026-10-17'
+    assert parse_update_date('Atualizado ontem', hoje) == '2026-10-16'
+    assert parse_update_date('Atualizado há 3 dias', hoje) == '2026-10-14'
+    assert parse_update_date('2026-09-30T12:00:00', hoje) == '2026-09-30'
+    assert parse_update_date('', hoje) == ''
+
+
+def _cards(*hrefs):
+    return [{'href': h} for h in hrefs]
+
+
+def test_stops_after_reaching_previous_top(tmp_path):
+    store = tmp_path / 'wm.json'
+    primeira = DeltaWatermark('busca', store, size=3)
+    assert all(primeira.is_new(c) for c in _cards('/c/5', '/c/4', '/c/3', '/c/2'))
+    primeira.save()
+
+    segunda = DeltaWatermark('busca', store, size=3)
+    novos = [c['href'] for c in _cards('/c/7', '/c/6', '/c/5', '/c/4', '/c/3') if segunda.is_new(c)]
+    # O primeiro href da marca pode ser um perfil atualizado: é coletado de novo
+    assert novos == ['/c/7', '/c/6', '/c/5']
+    assert segunda.passed
+
+
+def test_single_known_href_on_top_does_not_stop(tmp_path):
+    store = tmp_path / 'wm.json'
+    primeira = DeltaWatermark('busca', store, size=3)
+    for c in _cards('/c/5', '/c/4', '/c/3'):
+        primeira.is_new(c)
+    primeira.save()
+
+    # /c/3 atualizou o perfil e subiu para o topo
+    segunda = DeltaWatermark('busca', store, size=3)
+    assert [segunda.is_new(c) for c in _cards('/c/3', '/c/8')] == [True, True]
+    assert not segunda.passed
+    assert segunda.hits == 1
+
+
+def test_known_href_with_newer_date_is_collected(tmp_path):
+    store = tmp_path / 'wm.json'
+    store.write_text('{"busca": {"hrefs": ["/c/1", "/c/2", "/c/3"], "atualizado_em": "2026-10-10"}}', encoding='utf-8')
+    wm = DeltaWatermark('busca', store)
+    assert wm.is_new({'href': '/c/1', 'atualizado': 'Atualizado em 10/10/2026'})
+    # Segundo href da marca encerra a busca, mas ele mesmo foi atualizado depois da marca
+    assert wm.is_new({'href': '/c/2', 'atualizado': 'Atualizado em 12/10/2026'})
+    assert wm.passed and wm.hits == 2
+    assert not wm.is_new({'href': '/c/3', 'atualizado': 'Atualizado em 13/10/2026'})
+
+
+def test_older_update_date_passes_watermark(tmp_path):
+    store = tmp_path / 'wm.json'
+    store.write_text('{"busca": {"hrefs": ["/c/1"], "atualizado_em": "2026-10-10"}}', encoding='utf-8')
+    wm = DeltaWatermark('busca', store)
+    assert wm.is_new({'href': '/c/9', 'atualizado': 'Atualizado em 12/10/2026'})
+    assert not wm.is_new({'href': '/c/8', 'atualizado': 'Atualizado em 01/10/2026'})
+    assert wm.passed
+
+
+def test_watermark_kept_when_run_stops_before_it(tmp_path):
+    store = tmp_path / 'wm.json'
+    store.write_text('{"busca": {"hrefs": ["/c/1", "/c/2"], "atualizado_em": "2026-10-10"}}', encoding='utf-8')
+
+    # Parou em num_candidatos antes de chegar à marca: /c/9../c/5 ficariam sem coleta
+    curta = DeltaWatermark('busca', store)
+    for c in _cards('/c/9', '/c/8'):
+        curta.is_new(c)
+    curta.save()
+    assert DeltaWatermark('busca', store).previous_hrefs == {'/c/1', '/c/2'}
+
+    # Chegou ao fim da lista: a marca avança mesmo sem alcançar a anterior
+    curta.save(exhausted=True)
+    assert DeltaWatermark('busca', store).previous_hrefs == {'/c/9', '/c/8'}
+
+
+def test_sort_failure_is_reported(monkeypatch):
+    # Sem o botão de ordenação a lista não vem por data: quem chama desliga o delta
+    import catho_leads
+
+    monkeypatch.setattr(catho_leads, 'resolve_selector', lambda *a, **k: (None, None))
+    assert catho_leads.sort_by_update_date(page=None) is False
@@ -0,0 +1,89 @@
+import asyncio
+import json
+
+import catho_enrich
+from catho_enrich import enrich_jsonl, enrich_records, parse_profile_html, profile_url
+from catho_leads import RateController
+from fixture_site import COOKIE_NAME, FixtureSite
+
+
+def _state(site):
+    host = site.url.split('//', 1)[1].split(':', 1)[0]
+    return {
+        'cookies': [{
+            'name': COOKIE_NAME, 'value': 'ok', 'domain': host, 'path': '/',
+            'expires': -1, 'httpOnly': False, 'secure': False, 'sameSite': 'Lax',
+        }],
+        'origins': [],
+    }
+
+
+def test_parse_profile_fields():
+    site = FixtureSite(candidatos=3)
+    try:
+        candidato = site.candidatos[0]
+        campos = parse_profile_html(site.render_profile(candidato))
+    finally:
+        site.stop()
+
+    assert campos['pretensao_salarial'].startswith('R$ ')
+    assert campos['ultima_atualizacao'] == f"{candidato['atualizado']:%d/%m/%Y}"
+    # A seção de experiência para no título seguinte (Formação)
+    assert campos['experiencia'] == ' | '.join(candidato['experiencias'])
+
+    html = '<main><h3>Habilitação</h3><p>CNH B</p><dl><dt>Salário pretendido</dt><dd>A combinar</dd></dl></main>'
+    campos = parse_profile_html(html, labels={'cnh': ['Habilitação'], 'pretensao_salarial': ['Salário pretendido']}, sections={})
+    assert campos == {'cnh': 'CNH B', 'pretensao_salarial': 'A combinar'}
+
+
+def test_profile_url_only_for_hrefs():
+    assert profile_url({'href': '/curriculo/7'}, 'https://www.catho.com.br/curriculos/busca/') == 'https://www.catho.com.br/curriculo/7'
+    assert profile_url({'href': '', '_chave': 'Fulano de Tal'}, 'https://www.catho.com.br/') is None
+
+
+def test_enrich_records_over_http():
+    with FixtureSite(candidatos=30) as site:
+        registros = [{'nome': f'Candidato {i:04d}', 'href': f'/curriculo/{i}'} for i in range(1, 21)]
+        registros.append({'nome': 'Sem link', 'href': '', '_chave': 'Sem link'})
+        pacer = RateController(rates={'profile': 1000}, burst=1000)
+
+        stats = asyncio.run(enrich_records(registros, f'{site.url}/busca', _state(site), concurrency=4, pacer=pacer))
+
+        assert stats == {'perfis': 20, 'enriquecidos': 20, 'falhas': 0, 'login': 0}
+        assert site.stats['profiles'] == 20
+        assert all(r['pretensao_salarial'] and r['experiencia'] for r in registros[:20])
+        assert 'experiencia' not in registros[-1]
+
+        # Sem cookie o site devolve o login: conta como sessão expirada, sem campos novos
+        sem_sessao = [{'nome': 'x', 'href': '/curriculo/1'}]
+        stats = asyncio.run(enrich_records(sem_sessao, site.url, {'cookies': [], 'origins': []}))
+        assert stats['login'] == 1 and 'experiencia' not in sem_sessao[0]
+
+
+def test_enrich_jsonl_streams_in_batches(tmp_path, monkeypatch):
+    lotes = []
+    original = catho_enrich.enrich_records
+
+    async def contando(registros, *args, on_batch=None, **kwargs):
+        def gravar(lote):
+            lotes.append(len(lote))
+            on_batch(lote)
+        return await original(registros, *args, on_batch=gravar, **kwargs)
+
+    monkeypatch.setattr(catho_enrich, 'enrich_records', contando)
+    with FixtureSite(candidatos=30) as site:
+        arquivo = tmp_path / 'candidatos.jsonl'
+        arquivo.write_text(''.join(
+            json.dumps({'nome': f'Candidato {i:04d}', 'href': f'/curriculo/{i}', '_chave': f'/curriculo/{i}'}) + '\n'
+            for i in range(1, 12)
+        ), encoding='utf-8')
+        creds = {'search_url': f'{site.url}/busca', 'enrichment': {'batch_size': 5, 'concurrency': 2}}
+
+        stats = enrich_jsonl(creds, arquivo, storage_state=_state(site))
+
+    assert lotes == [5, 5, 1]
+    assert stats['enriquecidos'] == 11
+    registros = [json.loads(linha) for linha in arquivo.read_text(encoding='utf-8').splitlines()]
+    assert [r['nome'] for r in registros] == [f'Candidato {i:04d}' for i in range(1, 12)]
+    assert all(r['experiencia'] for r in registros)
+    assert not arquivo.with_suffix('.enrich.tmp').exists()
@@ -0,0 +1,82 @@
+import json
+import os
+import re
+import sys
+import urllib.request
+from http.cookiejar import CookieJar
+from urllib.parse import urlencode
+
+import pytest
+
+from bench import _run_measured, check_regression, measure_startup, run_once
+from catho_leads import PHONE_PATTERN
+from fixture_site import FixtureSite
+
+
+def _opener():
+    return urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()))
+
+
+def test_login_pagination_and_reveal():
+    with FixtureSite(candidatos=45, per_page=20) as site:
+        opener = _opener()
+        # Sem sessão a busca manda para o login
+        resp = opener.open(f'{site.url}/busca?q=python')
+        assert resp.geturl().endswith('/login')
+        assert 'type="password"' in resp.read().decode('utf-8')
+
+        resp = opener.open(f'{site.url}/login', data=urlencode({'email': 'a@b.com', 'senha': 'x'}).encode())
+        pagina = resp.read().decode('utf-8')
+        assert pagina.count('<article>') == 20
+        assert 'rel="next"' in pagina
+
+        ultima = opener.open(f'{site.url}/busca?q=python&order=atualizacao&page=3').read().decode('utf-8')
+        assert ultima.count('<article>') == 5
+        assert 'rel="next"' not in ultima
+
+        contato = json.loads(opener.open(f'{site.url}/api/contato/1?campo=telefone').read())
+        assert re.fullmatch(PHONE_PATTERN, contato['telefone'])
+        assert site.stats == {'logins': 1, 'page_loads': 2, 'reveals': 1, 'profiles': 0, 'requests': 6}
+
+
+def test_sorted_by_update_date_first():
+    with FixtureSite(candidatos=30) as site:
+        opener = _opener()
+        opener.open(f'{site.url}/login', data=urlencode({'email': 'a@b.com', 'senha': 'x'}).encode())
+        pagina = opener.open(f'{site.url}/busca?order=atualizacao').read().decode('utf-8')
+        assert re.search(r'<h2><a href="/curriculo/(\d+)"', pagina).group(1) == '1'
+
+
+def test_check_regression():
+    assert check_regression({'candidates_per_minute_median': 80}, {'candidates_per_minute_median': 100}, 0.15)
+    assert check_regression({'candidates_per_minute_median': 90}, {'candidates_per_minute_median': 100}, 0.15) is None
+
+
+def test_measure_startup_stops_at_login_page():
+    # Um "app" mínimo que lê o config e abre a página de login, como o real faria
+    app = (
+        'import json, sys, urllib.request; '
+        'url = json.load(open(sys.argv[-1], encoding="utf-8"))["url"]; '
+        'urllib.request.urlopen(url).read()'
+    )
+    tempo = measure_startup([sys.executable, '-c', app, '--'])
+    assert tempo is not None and 0 < tempo < 30
+
+
+@pytest.mark.skipif(not hasattr(os, 'wait4'), reason='os.wait4 só existe em POSIX')
+def test_peak_rss_is_measured_per_subprocess():
+    grande = [sys.executable, '-c', 'x = bytearray(200 * 1024 * 1024); x[::4096] = b"1" * len(x[::4096])']
+    pequeno = [sys.executable, '-c', 'pass']
+    rc, _, _, rss_grande = _run_measured(grande, dict(os.environ), 60)
+    assert rc == 0 and rss_grande > 150
+    # O acumulado de RUSAGE_CHILDREN repetiria os 200 MB aqui
+    rc, _, _, rss_pequeno = _run_measured(pequeno, dict(os.environ), 60)
+    assert rc == 0 and rss_pequeno < 100
+
+
+def test_main_smoke_against_fixture_site(browser):
+    # O browser só confirma que há Chromium; a coleta roda no catho_leads.py de verdade, em subprocesso
+    resultado = run_once(candidatos=30, num_candidatos=12, per_page=10, timeout_s=300)
+    assert resultado['returncode'] == 0
+    assert resultado['candidates'] == 12
+    assert resultado['page_loads'] >= 2 and resultado['reveals'] > 0
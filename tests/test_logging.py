@@ -0,0 +1,47 @@
+import json
+import logging
+
+import catho_leads
+from catho_leads import log, setup_logging, shutdown_logging
+
+
+def _setup(tmp_path, monkeypatch, **kwargs):
+    monkeypatch.setattr(catho_leads, 'LOG_FILE', tmp_path / 'catho_leads.log')
+    setup_logging(console=False, **kwargs)
+
+
+def test_debug_is_off_by_default(tmp_path, monkeypatch):
+    _setup(tmp_path, monkeypatch)
+    log('Currículo 1: Ana')
+    log('Debug - Nome: Ana', logging.DEBUG)
+    log('Erro telefone Ana: timeout', logging.WARNING)
+    shutdown_logging()
+
+    linhas = (tmp_path / 'catho_leads.log').read_text(encoding='utf-8').splitlines()
+    assert len(linhas) == 2
+    assert linhas[0].endswith('] Currículo 1: Ana')
+    assert linhas[1].endswith('] WARNING: Erro telefone Ana: timeout')
+
+
+def test_json_lines_and_size_rotation(tmp_path, monkeypatch):
+    _setup(tmp_path, monkeypatch, level='DEBUG', json_lines=True, max_bytes=200, backup_count=2)
+    for i in range(20):
+        log(f'mensagem {i}', logging.DEBUG)
+    shutdown_logging()
+
+    arquivos = sorted(p.name for p in tmp_path.iterdir())
+    assert arquivos == ['catho_leads.log', 'catho_leads.log.1', 'catho_leads.log.2']
+    ultima = json.loads((tmp_path / 'catho_leads.log').read_text(encoding='utf-8').splitlines()[-1])
+    assert ultima['level'] == 'DEBUG' and ultima['msg'] == 'mensagem 19'
+
+
+def test_unknown_level_falls_back_to_info(tmp_path, monkeypatch):
+    _setup(tmp_path, monkeypatch, level='DEBG')
+    log('Debug - Nome: Ana', logging.DEBUG)
+    log('Currículo 1: Ana')
+    shutdown_logging()
+
+    linhas = (tmp_path / 'catho_leads.log').read_text(encoding='utf-8').splitlines()
+    assert len(linhas) == 2
+    assert "WARNING: log_level 'DEBG' desconhecido" in linhas[0]
+    assert linhas[1].endswith('] Currículo 1: Ana')
@@ -0,0 +1,53 @@
+from catho_leads import find_candidate_dicts, find_contacts, merge_capture_record, NetworkCapture
+
+
+def test_find_candidate_dicts_in_nested_payload():
+    payload = {
+        'props': {
+            'pageProps': {
+                'curriculos': [
+                    {'id': 101, 'nome': 'Ana Souza', 'idade': 29, 'cidade': 'Curitiba', 'uf': 'PR'},
+                    {'id': 102, 'nome': 'Bruno Lima', 'url': 'https://www.catho.com.br/curriculos/102/'},
+                ],
+                'total': 2,
+            }
+        }
+    }
+    found = find_candidate_dicts(payload)
+    assert [c['nome'] for c in found] == ['Ana Souza', 'Bruno Lima']
+    assert found[0]['info_basica'] == '29 anos, Curitiba - PR'
+    assert found[1]['href'] == 'https://www.catho.com.br/curriculos/102/'
+
+
+def test_find_contacts_by_key_and_by_format():
+    assert find_contacts({'data': {'celular': '(11) 98888-7777'}})['telefone'] == '(11) 98888-7777'
+    assert find_contacts({'msg': 'Contato: ana@example.com'})['email'] == 'ana@example.com'
+
+
+def test_lookup_matches_relative_href_and_id():
+    capture = NetworkCapture()
+    capture.by_path['/curriculos/102'] = {'nome': 'Bruno Lima'}
+    capture.by_id['101'] = {'nome': 'Ana Souza'}
+    assert capture.lookup('/curriculos/102/')['nome'] == 'Bruno Lima'
+    assert capture.lookup('/curriculos/101/ana-souza')['nome'] == 'Ana Souza'
+    assert capture.lookup('/curriculos/999') is None
+
+
+def test_merge_prefers_network_fields():
+    registro = {'nome': 'Ana', 'info_basica': '', 'has_phone': True}
+    merged = merge_capture_record(registro, {'nome': 'Ana Souza', 'info_basica': '29 anos', 'telefone': '', 'email': ''})
+    assert merged['nome'] == 'Ana Souza' and merged['info_basica'] == '29 anos' and merged['has_phone']
+
+
+def test_kind_matches_path_segments_and_resource_type():
+    capture = NetworkCapture()
+    assert capture._kind('https://www.catho.com.br/api/curriculos/102/telefone') == 'reveal'
+    assert capture._kind('https://www.catho.com.br/api/revelar-email?id=1') == 'reveal'
+    assert capture._kind('https://www.catho.com.br/curriculos/busca/?q=contato') == 'search'
+    assert capture._kind('https://www.catho.com.br/curriculos/busca/', 'document') == 'search'
+    # Substrings e recursos estáticos não contam
+    assert capture._kind('https://www.catho.com.br/static/telefones.js', 'script') is None
+    assert capture._kind('https://cdn.catho.com.br/img/contact-icon.png', 'image') is None
+    assert capture._kind('https://www.catho.com.br/api/researcher') is None
+    # Documento nunca é a resposta da revelação
+    assert capture._kind('https://www.catho.com.br/contato', 'document') is None
@@ -0,0 +1,47 @@
+import catho_leads
+from catho_leads import PageRecycler, launch_options, page_recycler
+
+
+MB = 1_048_576
+
+
+def test_recycles_by_page_count_and_heap():
+    recycler = PageRecycler(every_pages=3, max_heap_mb=100)
+    assert not recycler.observe(1, 40 * MB, pages_since=1)
+    assert not recycler.observe(2, 50 * MB, pages_since=2)
+    assert recycler.observe(3, 60 * MB, pages_since=3)
+    recycler.recycled(3)
+
+    assert recycler.observe(4, 120 * MB, pages_since=1)
+    # Sem performance.memory só vale o limite de páginas
+    assert not recycler.observe(5, None, pages_since=1)
+
+    resumo = recycler.summary()
+    assert resumo['recycles'] == 1
+    assert resumo['pages'] == 5
+    assert (resumo['heap_mb_first'], resumo['heap_mb_last'], resumo['heap_mb_peak']) == (40.0, 120.0, 120.0)
+    assert [s['pagina'] for s in resumo['trend'] if s.get('recycled')] == [3]
+
+
+def test_trend_is_downsampled_but_keeps_recycles_and_last(monkeypatch):
+    monkeypatch.setattr(catho_leads, 'MEMORY_SAMPLES_MAX', 100)
+    recycler = PageRecycler(every_pages=0, max_heap_mb=0)
+    for pagina in range(1, 301):
+        recycler.observe(pagina, pagina * MB, pages_since=pagina, busca='python')
+        if pagina == 77:
+            recycler.recycled(pagina, 'python')
+
+    assert len(recycler.samples) <= 101
+    trend = recycler.summary()['trend']
+    assert len(trend) <= catho_leads.MEMORY_TREND_POINTS + 2
+    paginas = [s['pagina'] for s in trend]
+    assert paginas[0] == 1 and paginas[-1] == 300 and 77 in paginas
+    assert recycler.summary()['pages'] == 300
+
+
+def test_config():
+    assert page_recycler({'recycle': {'every_pages': 0, 'max_heap_mb': 0}}) is None
+    recycler = page_recycler({'recycle': {'every_pages': 10}})
+    assert (recycler.every_pages, recycler.max_heap_mb) == (10, 512.0)
+    assert launch_options({})['args'] == ['--enable-precise-memory-info']
+    assert 'args' not in launch_options({'recycle': {'max_heap_mb': 0}})
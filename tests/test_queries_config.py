@@ -0,0 +1,34 @@
+import pytest
+
+from catho_async import build_queries
+from catho_shard import expand_units
+
+BASE = 'https://www.catho.com.br/curriculos/busca/?pais_id=31'
+
+
+def test_queries_inherit_defaults():
+    creds = {
+        'search_url': BASE,
+        'num_candidatos': 20,
+        'queries': ['vendedor', {'search_term': 'motorista', 'num_candidatos': 5}],
+    }
+    queries = build_queries(creds)
+    assert [q['search_term'] for q in queries] == ['vendedor', 'motorista']
+    assert queries[0]['search_url'] == BASE + '&q=vendedor'
+    assert [q['num_candidatos'] for q in queries] == [20, 5]
+
+
+def test_query_without_url_is_rejected():
+    with pytest.raises(ValueError):
+        build_queries({'queries': [{'search_term': 'vendedor'}]})
+
+
+def test_sort_params_only_with_url_navigation():
+    # Sem url_navigation a ordenação é pelo menu, em todos os modos
+    creds = {'search_url': BASE, 'queries': ['vendedor'], 'sort_params': {'ordenacao': 'data'}}
+    assert build_queries(creds)[0]['search_url'] == BASE + '&q=vendedor'
+    assert expand_units(creds)[0]['search_url'] == BASE
+
+    creds['url_navigation'] = True
+    assert build_queries(creds)[0]['search_url'] == BASE + '&q=vendedor&ordenacao=data'
+    assert expand_units(creds)[0]['search_url'] == BASE + '&ordenacao=data'
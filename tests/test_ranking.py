@@ -0,0 +1,20 @@
+from catho_leads import rank_candidates
+
+
+CANDIDATOS = [
+    {'nome': 'Ana', 'info_basica': '25 anos, São Paulo - SP, Analista de Dados'},
+    {'nome': 'Bruno', 'info_basica': '52 anos, Campinas - SP, Gerente'},
+    {'nome': 'Carla', 'info_basica': '31 anos, Sao Paulo - SP, Engenheira de Dados Python'},
+    {'nome': 'Diego', 'info_basica': 'Sao Paulo - SP, Estagiário'},
+]
+
+
+def test_filters_by_age_and_city():
+    nomes = [c['nome'] for c in rank_candidates(CANDIDATOS, {'idade_max': 40, 'cidades': ['São Paulo']})]
+    # Diego não mostra idade e passa; Bruno é filtrado pela idade e pela cidade
+    assert nomes == ['Ana', 'Carla', 'Diego']
+
+
+def test_keywords_rank_and_ties_keep_order():
+    nomes = [c['nome'] for c in rank_candidates(CANDIDATOS, {'palavras_chave': ['dados', 'python']})]
+    assert nomes == ['Carla', 'Ana', 'Bruno', 'Diego']
@@ -0,0 +1,111 @@
+from types import SimpleNamespace
+
+import catho_leads
+from catho_leads import RateController, launch_options, looks_blocked, rate_controller, site_domain
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, segundos):
+        self.slept.append(segundos)
+        self.now += segundos
+
+
+def make(clock, **kwargs):
+    return RateController(clock=clock, sleep=clock.sleep, seed=1, **kwargs)
+
+
+def test_token_bucket_spaces_actions_after_burst(monkeypatch):
+    monkeypatch.setattr(catho_leads, '_run_timer', None)
+    clock = FakeClock()
+    pacer = make(clock, rates={'navigate': 0.5}, burst=2)
+
+    assert pacer.wait('navigate') == 0
+    assert pacer.wait('navigate') == 0
+    # Sem fichas: a 0.5/s a próxima navegação espera 2 s
+    assert pacer.wait('navigate') == 2.0
+    # Tipos têm baldes separados
+    assert pacer.wait('reveal') == 0
+
+
+def test_aimd_increase_and_decrease():
+    clock = FakeClock()
+    pacer = make(clock, rates={'reveal': 1.0}, max_rates={'reveal': 1.25}, increase=0.1, decrease=0.5, slow_ms=1000)
+
+    for _ in range(5):
+        pacer.record('reveal', 200)
+    assert pacer.buckets['reveal'].rate == 1.25
+
+    pacer.record('reveal', 3000)
+    assert pacer.buckets['reveal'].rate == 0.625
+    # Timeout conta como lento
+    pacer.record('reveal', None)
+    assert pacer.buckets['reveal'].rate == 0.3125
+    assert pacer.penalties == {'lento': 2}
+    assert pacer.paused_until == 0.0
+
+
+def test_throttling_backs_off_exponentially_with_jitter():
+    clock = FakeClock()
+    pacer = make(clock, rates={'navigate': 1.0, 'reveal': 4.0}, min_rate=0.5, backoff_base_s=2, backoff_max_s=10)
+
+    pausas = [pacer.penalize('http_429') for _ in range(5)]
+    tetos = [2, 4, 8, 10, 10]
+    assert all(teto / 2 <= pausa <= teto for pausa, teto in zip(pausas, tetos))
+    assert pacer.buckets['navigate'].rate == 0.5
+    assert pacer.buckets['reveal'].rate == 0.5
+    # A pausa vale para todos os tipos
+    assert pacer.delay('reveal') >= 5
+
+    pacer.record('navigate', status=503)
+    assert pacer.penalties == {'http_429': 5, 'http_503': 1}
+    pacer.record('navigate', 100)
+    assert pacer.strikes == 0
+
+
+def test_retry_after_and_block_detection():
+    clock = FakeClock()
+    pacer = make(clock, backoff_base_s=1, backoff_max_s=60)
+    pacer.record('navigate', 100, status=429, retry_after=30)
+    assert pacer.paused_until >= 30
+
+    pacer.record('navigate', 100, blocked=True)
+    assert pacer.penalties['bloqueio'] == 1
+    assert looks_blocked('https://www.catho.com.br/captcha?next=/busca')
+    assert looks_blocked('', 'Acesso bloqueado')
+    assert not looks_blocked('https://www.catho.com.br/curriculos/busca', 'Busca de currículos')
+
+
+def test_config_toggles_pacing_and_slow_mo():
+    assert rate_controller({'pacing': {'enabled': False}}) is None
+    pacer = rate_controller({'pacing': {'navigate_per_s': 1, 'max_reveal_per_s': 3}})
+    assert pacer.buckets['navigate'].rate == 1.0
+    assert pacer.max_rates['reveal'] == 3.0
+
+    assert launch_options({})['slow_mo'] == 0
+    assert launch_options({'pacing': {'enabled': False}})['slow_mo'] == 50
+    assert launch_options({'pacing': {'enabled': False}, 'profile': 'fast'})['slow_mo'] == 0
+
+
+def test_only_search_host_xhr_throttling_counts():
+    def resposta(url, status, tipo='xhr'):
+        return SimpleNamespace(url=url, status=status, headers={}, request=SimpleNamespace(resource_type=tipo))
+
+    pacer = rate_controller({'search_url': 'https://www.catho.com.br/curriculos/busca/?q=python'})
+    assert pacer.domain == 'catho.com.br'
+    pacer._on_response(resposta('https://ads.example.com/pixel', 503))
+    pacer._on_response(resposta('https://www.catho.com.br/static/app.js', 503, 'script'))
+    assert pacer.penalties == {}
+    pacer._on_response(resposta('https://www.catho.com.br/api/contato/1', 429))
+    assert pacer.penalties == {'http_429': 1}
+    # Subdomínio de API do mesmo site conta; domínio parecido não
+    pacer._on_response(resposta('https://api.catho.com.br/v1/busca', 503))
+    pacer._on_response(resposta('https://notcatho.com.br/x', 503))
+    assert pacer.penalties == {'http_429': 1, 'http_503': 1}
+    assert site_domain('127.0.0.1') == '127.0.0.1' and site_domain('a.b.example.com') == 'example.com'
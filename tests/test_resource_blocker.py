@@ -0,0 +1,42 @@
+from types import SimpleNamespace
+
+import catho_leads
+from catho_leads import ResourceBlocker
+
+
+def test_should_block_by_type_and_domain():
+    blocker = ResourceBlocker()
+    assert blocker.should_block('image', 'https://www.catho.com.br/avatar.png') == 'image'
+    assert blocker.should_block('script', 'https://www.googletagmanager.com/gtm.js') == 'googletagmanager.com'
+    assert blocker.should_block('script', 'https://www.catho.com.br/_next/app.js') is None
+    assert blocker.should_block('xhr', 'https://api.catho.com.br/curriculos') is None
+
+
+def test_disabled_blocker_lets_everything_through():
+    blocker = ResourceBlocker(resource_types=[], domains=[])
+    assert not blocker.enabled
+    assert blocker.should_block('image', 'https://www.google-analytics.com/x.gif') is None
+
+
+def test_summary_estimates_saved_bytes_from_learned_sizes(tmp_path, monkeypatch):
+    monkeypatch.setattr(catho_leads, 'RESOURCE_SIZE_FILE', tmp_path / 'sizes.json')
+    blocker = ResourceBlocker()
+    blocker._sizes = {'image': {'count': 2, 'bytes': 40_000}}
+    for _ in range(3):
+        blocker._count(SimpleNamespace(resource_type='image', url='https://cdn.catho.com.br/a.jpg'))
+
+    resumo = blocker.summary()
+    assert resumo['blocked_requests'] == 3
+    assert resumo['estimated_saved_bytes'] == 60_000
+
+
+def test_blocked_type_never_loaded_uses_default_size(tmp_path, monkeypatch):
+    # Com o bloqueio sempre ligado a imagem nunca carrega: vale a estimativa inicial
+    monkeypatch.setattr(catho_leads, 'RESOURCE_SIZE_FILE', tmp_path / 'sizes.json')
+    blocker = ResourceBlocker()
+    blocker._count(SimpleNamespace(resource_type='image', url='https://cdn.catho.com.br/a.jpg'))
+
+    resumo = blocker.summary()
+    padrao = catho_leads.DEFAULT_RESOURCE_SIZES['image']
+    assert resumo['estimated_saved_bytes'] == padrao
+    assert resumo['size_estimates'] == {'image': {'avg_bytes': padrao, 'source': 'default'}}
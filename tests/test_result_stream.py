@@ -0,0 +1,102 @@
+import csv
+import json
+
+from openpyxl import load_workbook
+
+from catho_leads import ResultStream, export_results
+
+URL = 'https://www.catho.com.br/curriculos/busca/?q=vendedor'
+
+
+def _stream(tmp_path, **kwargs):
+    return ResultStream(
+        search_url=URL,
+        path=tmp_path / 'jsonl' / 'curriculos.jsonl',
+        checkpoint_file=tmp_path / 'checkpoint.json',
+        **kwargs,
+    )
+
+
+def test_resume_restores_seen_keys_and_drops_truncated_line(tmp_path):
+    stream = _stream(tmp_path)
+    stream.checkpoint(3, URL + '&page=3')
+    stream.vistos.add('/c/1')
+    stream.append({'nome': 'Ana', 'info_basica': '', 'telefone': '', 'email': ''}, '/c/1')
+    stream.close()
+    with stream.path.open('a', encoding='utf-8') as f:
+        f.write('{"nome": "Bru')
+
+    resumed = _stream(tmp_path, resume=True)
+    assert resumed.resumed and resumed.pagina == 3
+    assert resumed.count == 1
+    # As chaves vêm do JSONL; o checkpoint só guarda a página
+    assert resumed.vistos == {'/c/1'}
+    assert 'vistos' not in json.loads(resumed.checkpoint_file.read_text(encoding='utf-8'))
+    resumed.append({'nome': 'Caio', 'info_basica': '', 'telefone': '', 'email': ''}, '/c/3')
+    resumed.finish()
+
+    assert [json.loads(line)['nome'] for line in resumed.path.read_text(encoding='utf-8').splitlines()] == ['Ana', 'Caio']
+    assert not resumed.checkpoint_file.exists()
+
+
+def test_resume_ignores_checkpoint_of_other_search(tmp_path):
+    stream = _stream(tmp_path)
+    stream.checkpoint(2, URL)
+    stream.close()
+    other = ResultStream(
+        search_url=URL + '&estado_id[25]=25',
+        resume=True,
+        path=stream.path,
+        checkpoint_file=stream.checkpoint_file,
+    )
+    assert not other.resumed and other.count == 0
+    other.close()
+
+
+def test_failed_resume_keeps_previous_jsonl(tmp_path):
+    stream = _stream(tmp_path)
+    stream.append({'nome': 'Ana', 'info_basica': '', 'telefone': '', 'email': ''}, '/c/1')
+    stream.close()
+
+    # Sem checkpoint (ou ilegível) o --resume começa do zero, mas sem apagar o que já foi coletado
+    novo = _stream(tmp_path, resume=True)
+    novo.close()
+    assert not novo.resumed and novo.path.read_text(encoding='utf-8') == ''
+    guardados = list(novo.path.parent.glob('curriculos.anterior_*.jsonl'))
+    assert len(guardados) == 1 and json.loads(guardados[0].read_text(encoding='utf-8'))['nome'] == 'Ana'
+
+
+def test_export_from_jsonl(tmp_path):
+    stream = _stream(tmp_path)
+    registros = [
+        {'nome': 'Ana', 'info_basica': '29 anos', 'telefone': '(11) 98888-7777', 'email': 'ana@example.com'},
+        {'nome': 'Bruno', 'info_basica': '', 'telefone': '', 'email': '', 'busca': 'motorista'},
+    ]
+    for i, registro in enumerate(registros):
+        stream.append(registro, f'/c/{i}')
+    stream.finish()
+
+    out = tmp_path / 'out'
+    export_results(stream.path, out)
+
+    json_text = (out / 'json' / 'curriculos_coletados.json').read_text(encoding='utf-8')
+    assert json_text == json.dumps(registros, ensure_ascii=False, indent=2)
+
+    with (out / 'csv' / 'curriculos_coletados.csv').open(encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == ['nome', 'info_basica', 'telefone', 'email', 'busca']
+    assert rows[1]['busca'] == 'motorista'
+
+    ws = load_workbook(out / 'excel' / 'curriculos_coletados.xlsx').active
+    assert [c.value for c in ws[1]] == ['nome', 'info_basica', 'telefone', 'email', 'busca']
+    assert ws.max_row == 3
+
+
+def test_export_only_enabled_formats(tmp_path):
+    stream = _stream(tmp_path)
+    stream.append({'nome': 'Ana', 'info_basica': '', 'telefone': '', 'email': ''}, '/c/1')
+    stream.finish()
+
+    out = tmp_path / 'out'
+    export_results(stream.path, out, formats=['csv'])
+    assert sorted(p.name for p in out.iterdir()) == ['csv']
@@ -0,0 +1,63 @@
+import pytest
+
+from catho_leads import PHONE_PATTERN, reveal_contact
+from fixture_site import COOKIE_NAME, FixtureSite
+
+# Troca o botão de um card por um clone sem o listener original
+SEM_LISTENER_JS = """(idx) => {
+    const antigo = document.querySelectorAll('article')[idx].querySelector('button[data-campo="telefone"]');
+    const novo = antigo.cloneNode(true);
+    antigo.replaceWith(novo);
+}"""
+
+# Popover: o contato aparece fora do card, no fim da página
+POPOVER_JS = """([idx, valor]) => {
+    const botao = document.querySelectorAll('article')[idx].querySelector('button[data-campo="telefone"]');
+    botao.addEventListener('click', () => setTimeout(() => {
+        const div = document.createElement('div');
+        div.textContent = valor;
+        document.body.append(div);
+    }, 100));
+}"""
+
+
+@pytest.fixture
+def search_page(browser):
+    with FixtureSite(candidatos=5) as site:
+        context = browser.new_context()
+        context.add_cookies([{'name': COOKIE_NAME, 'value': 'ok', 'url': site.url}])
+        page = context.new_page()
+        page.goto(f'{site.url}/busca?order=atualizacao')
+        yield site, page
+        context.close()
+
+
+def _card(page, idx):
+    return page.locator('article').nth(idx)
+
+
+def test_contact_revealed_inside_the_card(search_page):
+    site, page = search_page
+    valor, latencia = reveal_contact(page, _card(page, 0), 0, 'Ver telefone', PHONE_PATTERN, 5000)
+    assert valor == site.candidatos[0]['telefone']
+    assert latencia is not None and latencia > 0
+    assert site.stats['reveals'] == 1
+
+
+def test_new_match_at_page_level(search_page):
+    site, page = search_page
+    # Um contato de outro candidato já visível não pode ser confundido com o novo
+    reveal_contact(page, _card(page, 0), 0, 'Ver telefone', PHONE_PATTERN, 5000)
+    page.evaluate(SEM_LISTENER_JS, 1)
+    page.evaluate(POPOVER_JS, [1, '(21) 97777-6666'])
+
+    valor, latencia = reveal_contact(page, _card(page, 1), 1, 'Ver telefone', PHONE_PATTERN, 5000)
+    assert valor == '(21) 97777-6666'
+    assert latencia is not None
+
+
+def test_timeout_returns_empty(search_page):
+    site, page = search_page
+    page.evaluate(SEM_LISTENER_JS, 2)
+    assert reveal_contact(page, _card(page, 2), 2, 'Ver telefone', PHONE_PATTERN, 500) == ('', None)
+    assert site.stats['reveals'] == 0
@@ -0,0 +1,42 @@
+import json
+
+import catho_leads
+from catho_leads import RunTimer, _percentile
+
+
+def test_percentile_nearest_rank():
+    valores = [float(v) for v in range(1, 101)]
+    assert _percentile(valores, 50) == 50.0
+    assert _percentile(valores, 95) == 95.0
+    assert _percentile([7.0], 95) == 7.0
+    assert _percentile([], 50) == 0.0
+
+
+def test_report_and_chrome_trace(tmp_path, monkeypatch):
+    monkeypatch.setattr(catho_leads, 'REPORT_DIR', tmp_path)
+    timer = RunTimer()
+    for _ in range(3):
+        with timer.span('reveal_phone', busca='python'):
+            pass
+    with timer.span('login'):
+        pass
+
+    report = timer.save(6, chrome_trace=True, mode='single')
+    assert report['candidates'] == 6
+    assert report['mode'] == 'single'
+    assert report['phases']['reveal_phone']['count'] == 3
+    assert set(report['phases']['login']) == {'count', 'total_ms', 'p50_ms', 'p95_ms', 'max_ms'}
+
+    salvo = json.loads(timer.path('run', '.json').read_text(encoding='utf-8'))
+    assert salvo['phases'] == report['phases']
+    trace = json.loads(timer.path('trace', '.json').read_text(encoding='utf-8'))
+    eventos = trace['traceEvents']
+    assert len(eventos) == 4 and all(e['ph'] == 'X' for e in eventos)
+    # Spans de buscas diferentes ficam em linhas diferentes
+    assert len({e['tid'] for e in eventos}) == 2
+
+
+def test_span_without_timer_is_noop(monkeypatch):
+    monkeypatch.setattr(catho_leads, '_run_timer', None)
+    with catho_leads.span('sort'):
+        pass
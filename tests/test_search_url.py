@@ -0,0 +1,17 @@
+from catho_leads import query_param, with_query_params, with_search_term
+
+BASE = 'https://www.catho.com.br/curriculos/busca/?pais_id=31&estado_id[25]=25&q=antigo'
+
+
+def test_with_search_term_replaces_q_and_keeps_facets():
+    url = with_search_term(BASE, 'vendedor')
+    assert url == 'https://www.catho.com.br/curriculos/busca/?pais_id=31&estado_id[25]=25&q=vendedor'
+
+
+def test_with_query_params_appends_page_and_sort():
+    url = with_query_params(BASE, {'page': 3, 'ordenacao': 'dataAtualizacao'})
+    assert query_param(url, 'page') == '3'
+    assert query_param(url, 'ordenacao') == 'dataAtualizacao'
+    assert query_param(url, 'estado_id[25]') == '25'
+
+    assert query_param(with_query_params(url, {'page': 4}), 'page') == '4'
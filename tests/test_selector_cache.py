@@ -0,0 +1,18 @@
+import json
+
+import catho_leads
+
+
+def test_selector_cache_roundtrip(tmp_path, monkeypatch):
+    cache_file = tmp_path / 'selectors.json'
+    monkeypatch.setattr(catho_leads, 'SELECTOR_CACHE_FILE', cache_file)
+    monkeypatch.setattr(catho_leads, '_selector_cache', None)
+
+    catho_leads._remember_selector('username', 'input[type="email"]')
+    assert json.loads(cache_file.read_text(encoding='utf-8')) == {'username': 'input[type="email"]'}
+
+    monkeypatch.setattr(catho_leads, '_selector_cache', None)
+    assert catho_leads._load_selector_cache()['username'] == 'input[type="email"]'
+
+    catho_leads._remember_selector('username', None)
+    assert json.loads(cache_file.read_text(encoding='utf-8')) == {}
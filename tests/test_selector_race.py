@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+import catho_leads
+from catho_async import resolve_selector_async
+from catho_leads import resolve_selector
+
+# O primeiro match no DOM de cada seletor está oculto (menu mobile); o visível vem depois
+HTML = '''
+<nav style="display:none"><input type="email" name="email"><button class="entrar">Entrar</button></nav>
+<form><input type="email" name="email" id="visivel"><button class="entrar" id="botao">Entrar</button></form>
+'''
+
+
+@pytest.fixture(autouse=True)
+def _sem_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(catho_leads, 'SELECTOR_CACHE_FILE', tmp_path / 'selectors.json')
+    monkeypatch.setattr(catho_leads, '_selector_cache', None)
+
+
+def test_hidden_first_match_does_not_block_the_race(browser):
+    page = browser.new_page()
+    page.set_content(HTML)
+
+    locator, sel = resolve_selector(page, ['input[type="email"]', '#nao-existe'], timeout_ms=2000)
+    assert sel == 'input[type="email"]'
+    assert locator.get_attribute('id') == 'visivel'
+
+    # O seletor oculto vem antes na lista, mas só o visível pode vencer
+    locator, sel = resolve_selector(page, ['nav button', 'button.entrar'], timeout_ms=2000)
+    assert sel == 'button.entrar'
+    assert locator.get_attribute('id') == 'botao'
+
+
+def test_hidden_first_match_async():
+    from playwright.async_api import async_playwright
+
+    async def run():
+        async with async_playwright() as p:
+            try:
+                navegador = await p.chromium.launch()
+            except Exception as e:
+                pytest.skip(f'Chromium indisponível: {e}')
+            try:
+                page = await navegador.new_page()
+                await page.set_content(HTML)
+                locator, sel = await resolve_selector_async(page, ['nav button', 'button.entrar'], timeout_ms=2000)
+                return sel, await locator.get_attribute('id')
+            finally:
+                await navegador.close()
+
+    catho_leads.configure_playwright_browsers_path()
+    assert asyncio.run(run()) == ('button.entrar', 'botao')
+
+
+def test_invalid_selector_is_dropped_from_async_race():
+    from playwright.async_api import async_playwright
+
+    async def run():
+        async with async_playwright() as p:
+            try:
+                navegador = await p.chromium.launch()
+            except Exception as e:
+                pytest.skip(f'Chromium indisponível: {e}')
+            try:
+                page = await navegador.new_page()
+                await page.set_content(HTML)
+                # Seletor inválido (como um vindo do config) não derruba os outros
+                locator, sel = await resolve_selector_async(page, ['button[[', 'button.entrar'], timeout_ms=2000)
+                return sel, await locator.get_attribute('id')
+            finally:
+                await navegador.close()
+
+    catho_leads.configure_playwright_browsers_path()
+    assert asyncio.run(run()) == ('button.entrar', 'botao')
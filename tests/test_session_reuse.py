@@ -0,0 +1,44 @@
+import json
+
+import catho_leads
+from catho_leads import login, login_selectors, save_session, session_is_valid
+from fixture_site import COOKIE_NAME, FixtureSite
+
+
+def test_saved_session_skips_login(browser, tmp_path, monkeypatch):
+    monkeypatch.setattr(catho_leads, 'SELECTOR_CACHE_FILE', tmp_path / 'selectors.json')
+    monkeypatch.setattr(catho_leads, '_selector_cache', None)
+    state_file = tmp_path / 'session' / 'storage_state.json'
+
+    with FixtureSite(candidatos=5) as site:
+        busca = f'{site.url}/busca?order=atualizacao'
+
+        # Primeira execução: login completo e sessão salva
+        context = browser.new_context()
+        page = context.new_page()
+        assert login(page, f'{site.url}/login', 'a@b.com', 'segredo', *login_selectors({}))
+        save_session(context, state_file)
+        context.close()
+        assert site.stats['logins'] == 1
+        assert COOKIE_NAME in {c['name'] for c in json.loads(state_file.read_text(encoding='utf-8'))['cookies']}
+
+        # Segunda execução: o storage_state basta, sem POST de login
+        context = browser.new_context(storage_state=str(state_file))
+        page = context.new_page()
+        assert session_is_valid(page, busca)
+        assert page.locator('article').count() == 5
+        context.close()
+        assert site.stats['logins'] == 1
+
+        # Sem a sessão o site volta a pedir login
+        context = browser.new_context()
+        assert not session_is_valid(context.new_page(), busca)
+        context.close()
+
+
+def test_storage_state_is_written_atomically(tmp_path):
+    destino = tmp_path / 'session' / 'storage_state.json'
+    catho_leads.write_storage_state({'cookies': [], 'origins': []}, destino)
+    catho_leads.write_storage_state({'cookies': [{'name': COOKIE_NAME}], 'origins': []}, destino)
+    assert json.loads(destino.read_text(encoding='utf-8'))['cookies'][0]['name'] == COOKIE_NAME
+    assert [p.name for p in destino.parent.iterdir()] == ['storage_state.json']
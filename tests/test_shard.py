@@ -0,0 +1,108 @@
+import json
+
+import catho_shard
+from catho_shard import ShardQueue, expand_units, merge_units, unit_file, with_facets
+
+BASE = 'https://www.catho.com.br/curriculos/busca/?pais_id=31&estado_id[25]=25&regiaoId[14]=14&cidade_id[783]=783'
+
+
+def test_with_facets_replaces_location_filters():
+    url = with_facets(BASE, {'estado_id': 26, 'cidade_id': [10, 11]})
+    assert url == 'https://www.catho.com.br/curriculos/busca/?pais_id=31&estado_id[26]=26&cidade_id[10]=10&cidade_id[11]=11'
+
+
+def test_expand_units_is_locations_times_terms():
+    creds = {
+        'search_url': BASE,
+        'num_candidatos': 10,
+        'sharding': {'locations': [{'estado_id': 25}, {'estado_id': 26}], 'search_terms': ['vendedor', 'motorista']},
+    }
+    units = expand_units(creds)
+    assert len(units) == 4
+    assert {u['search_term'] for u in units} == {'vendedor', 'motorista'}
+    assert len({u['search_url'] for u in units}) == 4
+    assert all(u['num_candidatos'] == 10 for u in units)
+
+
+def test_queue_claim_lease_and_retry(tmp_path):
+    queue = ShardQueue(tmp_path / 'fila.sqlite3')
+    units = [{'search_url': f'u{i}', 'search_term': '', 'num_candidatos': 1} for i in range(2)]
+    assert queue.enqueue(units) == 2
+    assert queue.enqueue(units, reset=False) == 0  # mesma search_url não entra de novo
+
+    a = queue.claim('w1')
+    b = queue.claim('w2')
+    assert (a['search_url'], b['search_url']) == ('u0', 'u1')
+    assert queue.claim('w3') is None
+
+    # Enquanto w1 renova o lease a unidade continua dele
+    assert queue.heartbeat(a['id'], 'w1')
+    assert queue.claim('w3', lease_s=60) is None
+
+    # Worker w1 "caiu": com o lease vencido a unidade volta para outro worker, noutro arquivo
+    c = queue.claim('w3', lease_s=-1)
+    assert (c['id'], c['attempt']) == (a['id'], 2)
+    assert unit_file(tmp_path, a['id'], a['attempt']) != unit_file(tmp_path, c['id'], c['attempt'])
+
+    # O worker antigo já não renova, conclui nem devolve a unidade
+    assert not queue.heartbeat(a['id'], 'w1')
+    assert not queue.complete(a['id'], 'w1', 5, 'velho.jsonl')
+    assert not queue.fail(a['id'], 'w1', 'timeout')
+
+    assert queue.fail(b['id'], 'w2', 'timeout', max_attempts=1)
+    assert queue.complete(c['id'], 'w3', 5, 'novo.jsonl')
+    assert queue.stats() == {'done': 1, 'failed': 1}
+    assert queue.done_files() == [(c['id'], 'novo.jsonl')]
+    queue.close()
+
+
+def test_enqueue_resets_previous_run_unless_resuming(tmp_path):
+    queue = ShardQueue(tmp_path / 'fila.sqlite3')
+    units = [{'search_url': f'u{i}'} for i in range(3)]
+    queue.enqueue(units)
+    for worker in ('w1', 'w2'):
+        unit = queue.claim(worker)
+        queue.complete(unit['id'], worker, 1, f"{unit['id']}.1.jsonl")
+    rodando = queue.claim('w3')
+
+    # --resume mantém as concluídas
+    assert queue.enqueue(units, reset=False) == 0
+    assert queue.stats() == {'done': 2, 'running': 1}
+
+    # Uma execução nova volta tudo para 'pending', menos o que está rodando agora
+    assert queue.enqueue(units) == 2
+    assert queue.stats() == {'pending': 2, 'running': 1}
+    assert queue.done_files() == []
+    assert queue.claim('w1')['attempt'] == 1
+    assert queue.complete(rodando['id'], 'w3', 1, 'x.jsonl')
+
+    assert queue.clear() == 3
+    assert queue.stats() == {}
+    queue.close()
+
+
+def test_merge_dedups_by_href(tmp_path, monkeypatch):
+    monkeypatch.setattr(catho_shard, 'APP_ROOT', tmp_path)
+    creds = {'sharding': {'dir': 'shards'}}
+    pasta = catho_shard.shard_dir(creds)
+    queue = ShardQueue(pasta / 'fila.sqlite3')
+    queue.enqueue([{'search_url': 'a'}, {'search_url': 'b'}])
+    for linhas in (['/c/1', '/c/2'], ['/c/2', '/c/3']):
+        unit = queue.claim('w')
+        arquivo = unit_file(pasta, unit['id'], unit['attempt'])
+        arquivo.parent.mkdir(parents=True, exist_ok=True)
+        arquivo.write_text(''.join(json.dumps({'nome': h, '_chave': h}) + '\n' for h in linhas), encoding='utf-8')
+        queue.complete(unit['id'], 'w', len(linhas), arquivo.name)
+    queue.close()
+
+    saida = tmp_path / 'merged.jsonl'
+    assert merge_units(creds, saida) == 3
+    assert [json.loads(l)['_chave'] for l in saida.read_text(encoding='utf-8').splitlines()] == ['/c/1', '/c/2', '/c/3']
+
+
+def test_workers_share_the_pacing_budget():
+    creds = {'search_url': BASE, 'pacing': {'navigate_per_s': 1, 'max_reveal_per_s': 4}, 'sharding': {'workers': 4}}
+    assert catho_shard.worker_count({}) == catho_shard.DEFAULT_WORKERS
+    pacer = catho_shard.rate_controller(creds, share=catho_shard.worker_count(creds))
+    assert pacer.buckets['navigate'].rate == 0.25
+    assert pacer.max_rates['reveal'] == 1.0